@@ -0,0 +1,245 @@
+# aggregates.py — 성장서사용 일별 집계 버킷
+# append_entry가 쓸 때마다 그날 버킷만 갱신하고, 주간/월간/연간 요약은 버킷을 합쳐서 만든다.
+# 파일은 스냅숏(daily_aggregates.json) + 바뀐 날 버킷만 덧붙이는 로그(daily_aggregates.log).
+# 로그가 COMPACT_EVERY줄을 넘으면 스냅숏에 합쳐 다시 쓴다.
+
+import os
+import json
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+
+from storage import entry_date, lru_put, file_lock, atomic_write_text
+
+
+AGG_FILENAME = "daily_aggregates.json"
+AGG_LOG_FILENAME = "daily_aggregates.log"
+AGG_FORMAT = 1
+COMPACT_EVERY = 256  # 로그 줄 수
+
+# data_dir → {"source": 저장소 버전, "days": {날짜: 버킷}}
+_AGG_CACHE = OrderedDict()
+_AGG_LOCK = threading.Lock()
+
+
+# =========================
+# 버킷
+# =========================
+def _empty_bucket() -> dict:
+    return {"n": 0, "moods": {}, "activities": {}, "words": {}}
+
+def _inc(d: dict, key: str, by: int = 1):
+    d[key] = d.get(key, 0) + by
+    if d[key] <= 0:
+        del d[key]
+
+def add_to_bucket(bucket: dict, entry: dict, sign: int = 1):
+    ans = entry.get("answers", {})
+    bucket["n"] += sign
+    _inc(bucket["moods"], ans.get("mood") or "", sign)
+    for a in ans.get("activities") or []:
+        _inc(bucket["activities"], a, sign)
+    _inc(bucket["words"], ans.get("one_word") or "", sign)
+
+def build_days(entries: list[dict]) -> dict:
+    days = {}
+    for e in entries:
+        d = entry_date(e)
+        if not d:
+            continue
+        add_to_bucket(days.setdefault(d, _empty_bucket()), e)
+    return dict(sorted(days.items()))
+
+
+# =========================
+# 저장/로드
+# =========================
+def _agg_path(data_dir: str) -> str:
+    return os.path.join(data_dir, AGG_FILENAME)
+
+def _log_path(data_dir: str) -> str:
+    return os.path.join(data_dir, AGG_LOG_FILENAME)
+
+def _load_file(data_dir: str):
+    try:
+        with open(_agg_path(data_dir), "r", encoding="utf-8") as f:
+            agg = json.load(f)
+    except Exception:
+        return None
+    if agg.get("format") != AGG_FORMAT:
+        return None
+    agg["log"] = 0
+    # 로그는 "base"(쓰기 직전 버전)가 지금 source와 이어지는 줄까지만 적용한다
+    # (스냅숏보다 오래된 줄, 쓰다 만 줄에서 멈추고 나머지는 버전 검사로 재구성된다)
+    try:
+        with open(_log_path(data_dir), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    delta = json.loads(line)
+                except ValueError:
+                    break
+                if delta.get("base") != agg["source"]:
+                    break
+                for d, bucket in delta["days"].items():
+                    if bucket is None:
+                        agg["days"].pop(d, None)
+                    else:
+                        agg["days"][d] = bucket
+                agg["source"] = delta["source"]
+                agg["log"] += 1
+    except FileNotFoundError:
+        pass
+    return agg
+
+def _save_file(data_dir: str, agg: dict):
+    # 스냅숏 전체를 원자적으로 교체하고 로그를 비운다 (쓰는 쪽은 file_lock 안에서 호출)
+    snap = {"format": AGG_FORMAT, "source": agg["source"], "days": agg["days"]}
+    atomic_write_text(_agg_path(data_dir), json.dumps(snap, ensure_ascii=False))
+    try:
+        os.remove(_log_path(data_dir))
+    except FileNotFoundError:
+        pass
+    agg["log"] = 0
+
+def _append_log(data_dir: str, agg: dict, base: str, days: set[str]):
+    # 바뀐 날의 버킷만 한 줄로 (쓰는 쪽은 file_lock 안에서 호출). 넘치면 스냅숏에 합친다
+    if agg.get("log", 0) >= COMPACT_EVERY:
+        _save_file(data_dir, agg)
+        return
+    delta = {"base": base, "source": agg["source"], "days": {d: agg["days"].get(d) for d in sorted(days)}}
+    with open(_log_path(data_dir), "a", encoding="utf-8") as f:
+        f.write(json.dumps(delta, ensure_ascii=False) + "\n")
+    agg["log"] = agg.get("log", 0) + 1
+
+def rebuild(store) -> dict:
+    version = store.version()
+    agg = {"format": AGG_FORMAT, "source": version, "days": build_days(store.read_all())}
+    _save_file(store.data_dir, agg)
+    return agg
+
+def _cached(key: str):
+    with _AGG_LOCK:
+        return _AGG_CACHE.get(key)
+
+def _remember(key: str, agg: dict):
+    with _AGG_LOCK:
+        lru_put(_AGG_CACHE, key, agg)
+
+def load(store) -> dict:
+    # 메모리 → 파일 → 재구성 순서. 저장소 버전이 다르면 낡은 것으로 보고 다시 만든다.
+    version = store.version()
+    key = os.path.abspath(store.data_dir)
+    agg = _cached(key)
+    if agg is not None and agg["source"] == version:
+        return agg
+
+    # 잠금은 사용자 파티션 단위: 다른 사용자의 집계와는 서로 기다리지 않는다
+    with file_lock(_agg_path(store.data_dir)):
+        agg = _load_file(store.data_dir)
+        if agg is None or agg["source"] != store.version():
+            agg = rebuild(store)
+    _remember(key, agg)
+    return agg
+
+
+# =========================
+# 쓰기 경로
+# =========================
+def upsert_and_record(store, entry: dict) -> tuple[str, str]:
+    return upsert_many_and_record(store, [entry])
+
+def upsert_many_and_record(store, entries: list[dict], fsync: bool = False) -> tuple[str, str]:
+    # 저장 직전 버전과 집계의 source가 같을 때만 증분 갱신, 아니면 재구성.
+    # (저장 직전 버전, 직후 버전)을 돌려준다: 같은 잠금 안이라 그 사이에는 이 기록들만 들어갔다 (검색 색인 증분용)
+    entries = _last_by_id(entries)
+    key = os.path.abspath(store.data_dir)
+    with file_lock(_agg_path(store.data_dir)):
+        before = store.version()
+        olds = [store.get(e["id"]) if e.get("id") else None for e in entries]
+        if len(entries) == 1 and not fsync:
+            store.upsert(entries[0])
+        else:
+            store.upsert_many(entries, fsync=fsync)
+        after = store.version()
+
+        agg = _cached(key)
+        if agg is None or agg["source"] != before:
+            agg = _load_file(store.data_dir)  # 다른 프로세스가 덧붙인 로그까지 따라잡는다
+        if agg is None or agg["source"] != before:
+            agg = rebuild(store)
+        else:
+            agg = {**agg, "days": dict(agg["days"])}
+            touched = set()
+            for old, entry in zip(olds, entries):
+                # 같은 id를 다시 쓰면 예전 내용을 빼고 새 내용을 더한다
+                if old and entry_date(old):
+                    _update_day(agg, entry_date(old), old, sign=-1)
+                    touched.add(entry_date(old))
+                if entry_date(entry):
+                    _update_day(agg, entry_date(entry), entry)
+                    touched.add(entry_date(entry))
+            agg["source"] = after
+            # 파일에는 바뀐 날만 덧붙인다 (배치 하나에 한 줄)
+            _append_log(store.data_dir, agg, before, touched)
+    _remember(key, agg)
+    return before, after
+
+def _last_by_id(entries: list[dict]) -> list[dict]:
+    # 한 배치에 같은 id가 여러 번 있으면 마지막 것만 (예전 내용은 저장된 것 하나만 빼야 하므로)
+    latest = {}
+    for n, e in enumerate(entries):
+        k = e.get("id") or n
+        latest.pop(k, None)
+        latest[k] = e
+    return list(latest.values()) if len(latest) < len(entries) else entries
+
+def bulk_upsert_and_rebuild(store, entries, fsync: bool = True):
+    # 대량 가져오기: 커밋 한 번(SQLite 트랜잭션 하나 / JSONL 잠금 한 번) 뒤에 집계를 한 번만 다시 만든다.
+    key = os.path.abspath(store.data_dir)
+    with file_lock(_agg_path(store.data_dir)):
+        store.upsert_many(entries, fsync=fsync)
+        agg = rebuild(store)
+    _remember(key, agg)
+
+def _update_day(agg: dict, d: str, entry: dict, sign: int = 1):
+    # 다른 세션이 읽고 있을 수 있으니 버킷은 복사해서 고친다
+    old = agg["days"].get(d) or _empty_bucket()
+    bucket = {"n": old["n"], "moods": dict(old["moods"]),
+              "activities": dict(old["activities"]), "words": dict(old["words"])}
+    add_to_bucket(bucket, entry, sign)
+    agg["days"][d] = bucket
+
+
+# =========================
+# 요약
+# =========================
+def summarize_window(store, today: str, days: int) -> dict:
+    agg = load(store)
+    today_ = datetime.fromisoformat(today).date()
+
+    n = 0
+    moods, activities, words = Counter(), Counter(), Counter()
+    # 최대 days개(≤365)의 작은 버킷만 합친다
+    for i in range(days - 1, -1, -1):
+        b = agg["days"].get((today_ - timedelta(days=i)).isoformat())
+        if not b:
+            continue
+        n += b["n"]
+        moods.update(b["moods"])
+        activities.update(b["activities"])
+        words.update(b["words"])
+
+    return {"n": n, "moods": moods, "activities": activities, "words": words}
+
+def add_pending(summary: dict, pending: list[dict], today: str, days: int) -> dict:
+    # 아직 디스크에 안 내려간(write-behind) 기록도 요약에 포함
+    start = (datetime.fromisoformat(today).date() - timedelta(days=days - 1)).isoformat()
+    for e in pending:
+        if start <= entry_date(e) <= today:
+            b = _empty_bucket()
+            add_to_bucket(b, e)
+            summary["n"] += b["n"]
+            summary["moods"].update(b["moods"])
+            summary["activities"].update(b["activities"])
+            summary["words"].update(b["words"])
+    return summary
@@ -2,14 +2,30 @@
 # 실행: streamlit run app.py
 
 import os
-import json
-import random
-from datetime import date, datetime, timedelta
-from urllib.parse import quote
-from collections import Counter
+import uuid
+from collections import deque
+from datetime import date, datetime
 
 import streamlit as st
 
+import writer
+import aggregates
+from storage import open_store, user_data_dir, merge_entries, entry_date
+from questions import question_for
+from tagger import infer_tag
+from catalog import CATALOG_FILENAME
+import core
+from core import STYLE_MODES, STYLE_EMOJI, EMOJI_OPTIONS, ACTIVITIES, closing_message, spotify_search_url
+import recommend
+from thumbs import cover_src
+import llm
+import highlights
+import search
+import export
+import importer
+import profiling
+import metrics
+
 
 # =========================
 # 기본 설정 / 경로
@@ -17,121 +33,27 @@ import streamlit as st
 APP_TITLE = "Daily Weaver"
 
 DATA_DIR = "data"
-PROFILE_PATH = os.path.join(DATA_DIR, "profile.json")
-ENTRIES_PATH = os.path.join(DATA_DIR, "entries.jsonl")
-SPECIAL_HISTORY_PATH = os.path.join(DATA_DIR, "special_history.json")
 
-ASSET_LOGO = None
+# 여러 사용자를 한 서버에서: 사용자별로 data/users/ab/cd/<해시>/ 아래에 나눠 저장
+MULTI_TENANT = os.environ.get("DW_MULTI_TENANT", "0") == "1"
+
+# 기록 저장소: "sqlite"(기본, 날짜 인덱스) 또는 "jsonl"
+STORAGE_BACKEND = os.environ.get("DW_STORAGE_BACKEND", "sqlite")
+
+# 노래 카탈로그 (python catalog.py build 로 만든 파일). 없으면 core.SONGS만 쓴다
+SONG_CATALOG = os.environ.get("DW_SONG_CATALOG", os.path.join(DATA_DIR, CATALOG_FILENAME))
 
 
 # =========================
-# 고정 데이터
+# 고정 데이터 (선택지·노래 목록은 core.py)
 # =========================
-STYLE_MODES = ["친한친구", "반려동물", "차분한 비서", "인생의 멘토", "감성 에디터"]
-STYLE_EMOJI = {
-    "친한친구": "💬",
-    "반려동물": "🐾",
-    "차분한 비서": "🗂️",
-    "인생의 멘토": "🧭",
-    "감성 에디터": "📝",
-}
 STYLE_OPTIONS = [f"{STYLE_EMOJI[s]} {s}" for s in STYLE_MODES]
 
-EMOJI_OPTIONS = [
-    ("😀", "기쁨"), ("🙂", "평온"), ("😐", "무덤덤"), ("😔", "우울"), ("😢", "슬픔"),
-    ("😭", "벅참"), ("😡", "분노"), ("😤", "답답"), ("😴", "피곤"), ("😬", "불안"),
-    ("☀️", "맑음"), ("🌙", "감성"), ("🌧️", "침잠"), ("🌿", "안정"), ("🔥", "열정"),
-    ("⚡", "긴장"), ("🧊", "냉정"), ("🌊", "출렁임"), ("🫧", "가벼움"), ("🌸", "따뜻함"),
-]
-
-ACTIVITIES = ["공부", "업무", "운동", "휴식", "약속", "창작", "정리", "이동", "소비", "회복"]
-
-SPECIAL_QUESTIONS = [
-    "오늘 하루를 색으로 표현한다면 어떤 색인가요?",
-    "오늘 하루가 영화라면 제목은 무엇인가요?",
-    "오늘 하루를 이모지 세 개로 표현한다면 무엇인가요?",
-    "오늘 기분을 음식으로 표현한다면 무엇인가요?",
-    "오늘 하루가 카페라면 분위기는 어떤가요?",
-    "오늘 하루를 광고 문구로 만든다면 무엇인가요?",
-    "오늘 하루가 선물이라면 포장지는 어떤 모습인가요?",
-    "오늘 하루를 한 컷 만화로 그린다면 어떤 장면인가요?",
-    "오늘 하루에 제목을 붙인다면 어떤 제목이 어울리나요?",
-    "오늘 가장 마음에 남은 말 한마디가 있다면 무엇인가요?",
-    "오늘 나를 가장 지탱해준 것은 무엇이었나요?",
-    "오늘 가장 나답다고 느낀 순간은 언제였나요?",
-    "오늘의 나에게 점수를 준다면 몇 점인가요?",
-    "오늘은 어떤 감정이 가장 오래 머물렀나요?",
-    "오늘 내가 가장 잘한 선택은 무엇이었나요?",
-    "오늘 하루가 한 장의 사진이라면 어떤 장면인가요?",
-    "오늘의 나는 어떤 날씨 같았나요?",
-    "오늘 내 마음을 가장 잘 표현하는 노래 제목은 무엇인가요?",
-    "오늘 가장 후회되는 순간이 있다면 무엇인가요?",
-    "오늘 가장 감사했던 순간은 무엇이었나요?",
-    "오늘 하루를 한 문장으로 요약한다면?",
-    "오늘 내가 나를 칭찬해주고 싶은 이유는 무엇인가요?",
-    "오늘 내가 놓치고 싶지 않은 순간은 무엇인가요?",
-    "오늘은 어떤 사람으로 기억되고 싶나요?",
-    "오늘 나를 가장 흔든 사건은 무엇이었나요?",
-    "오늘은 어떤 색감의 하루였나요? (파스텔/모노톤/네온 등)",
-    "오늘 내 마음에 가장 가까운 단어는 무엇인가요?",
-    "오늘 하루를 물건 하나로 표현한다면 무엇인가요?",
-    "오늘 하루가 여행지라면 어디일까요?",
-    "오늘 하루를 만약 그림으로 그린다면 어떤 스타일일까요?",
-    "오늘 내가 더 잘하고 싶었던 것은 무엇인가요?",
-    "오늘 내가 가장 많이 했던 생각은 무엇인가요?",
-    "오늘 나를 웃게 만든 건 무엇이었나요?",
-    "오늘 하루는 어떤 향이 날까요?",
-    "오늘의 나에게 필요한 한마디는 무엇인가요?",
-    "오늘 하루를 만약 일기 제목으로 붙이면?",
-    "오늘은 어떤 순간이 가장 뿌듯했나요?",
-    "오늘 하루는 어떤 감정으로 시작했고 어떤 감정으로 끝났나요?",
-    "오늘은 어떤 순간이 가장 나를 위로했나요?",
-    "오늘 하루를 다시 산다면 가장 먼저 바꾸고 싶은 건 무엇인가요?",
-]
-
-SONGS = {
-    "comfort": [
-        {"title": "Love Poem", "artist": "아이유",
-         "cover_url": "https://images.unsplash.com/photo-1511379938547-c1f69419868d?auto=format&fit=crop&w=900&q=60"},
-        {"title": "Breathe", "artist": "이하이",
-         "cover_url": "https://images.unsplash.com/photo-1511671782779-c97d3d27a1d4?auto=format&fit=crop&w=900&q=60"},
-    ],
-    "chill": [
-        {"title": "Sunday Morning", "artist": "Maroon 5",
-         "cover_url": "https://images.unsplash.com/photo-1506157786151-b8491531f063?auto=format&fit=crop&w=900&q=60"},
-        {"title": "Some", "artist": "소유 & 정기고",
-         "cover_url": "https://images.unsplash.com/photo-1521337581100-8ca9a73a5f79?auto=format&fit=crop&w=900&q=60"},
-    ],
-    "energetic": [
-        {"title": "Dynamite", "artist": "BTS",
-         "cover_url": "https://images.unsplash.com/photo-1524678606370-a47ad25cb82a?auto=format&fit=crop&w=900&q=60"},
-        {"title": "New Rules", "artist": "Dua Lipa",
-         "cover_url": "https://images.unsplash.com/photo-1520975661595-6453be3f7070?auto=format&fit=crop&w=900&q=60"},
-    ],
-    "focus": [
-        {"title": "Experience", "artist": "Ludovico Einaudi",
-         "cover_url": "https://images.unsplash.com/photo-1507838153414-b4b713384a76?auto=format&fit=crop&w=900&q=60"},
-        {"title": "Time", "artist": "Hans Zimmer",
-         "cover_url": "https://images.unsplash.com/photo-1470225620780-dba8ba36b745?auto=format&fit=crop&w=900&q=60"},
-    ],
-    "reset": [
-        {"title": "Good Days", "artist": "SZA",
-         "cover_url": "https://images.unsplash.com/photo-1499415479124-43c32433a620?auto=format&fit=crop&w=900&q=60"},
-        {"title": "On The Ground", "artist": "ROSÉ",
-         "cover_url": "https://images.unsplash.com/photo-1521337706264-a414f153a5f5?auto=format&fit=crop&w=900&q=60"},
-    ],
-    "sentimental": [
-        {"title": "밤편지", "artist": "아이유",
-         "cover_url": "https://images.unsplash.com/photo-1521337706264-a414f153a5f5?auto=format&fit=crop&w=900&q=60"},
-        {"title": "Someone Like You", "artist": "Adele",
-         "cover_url": "https://images.unsplash.com/photo-1514119412350-e174d90d280e?auto=format&fit=crop&w=900&q=60"},
-    ],
-}
-
 
 # =========================
 # CSS (iMessage + Apple Music)
 # =========================
+@profiling.timed("inject_css")
 def inject_css():
     st.markdown(
         """
@@ -486,187 +408,126 @@ div[data-testid="stFormSubmitButton"] button{
 # =========================
 # 저장/로드
 # =========================
-def ensure_data_dir():
-    os.makedirs(DATA_DIR, exist_ok=True)
+def current_user_id() -> str:
+    # 로그인(st.user) > ?user= 쿼리 파라미터 > 새로 발급해서 주소에 남겨둔다
+    try:
+        if st.user.is_logged_in:
+            return f"auth:{st.user.email}"
+    except Exception:
+        pass
 
-def load_profile():
-    if os.path.exists(PROFILE_PATH):
-        with open(PROFILE_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return None
+    uid = st.query_params.get("user")
+    if not uid:
+        uid = uuid.uuid4().hex
+        st.query_params["user"] = uid
+    return f"q:{uid}"
 
-def save_profile(p: dict):
-    ensure_data_dir()
-    with open(PROFILE_PATH, "w", encoding="utf-8") as f:
-        json.dump(p, f, ensure_ascii=False, indent=2)
+def user_dir() -> str:
+    if not MULTI_TENANT:
+        return DATA_DIR
+    if "data_dir" not in st.session_state:
+        st.session_state.data_dir = user_data_dir(DATA_DIR, current_user_id())
+    return st.session_state.data_dir
 
-def append_entry(entry: dict):
-    ensure_data_dir()
-    with open(ENTRIES_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+def ensure_data_dir():
+    os.makedirs(user_dir(), exist_ok=True)
 
-def read_entries() -> list[dict]:
-    if not os.path.exists(ENTRIES_PATH):
-        return []
-    out = []
-    with open(ENTRIES_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                out.append(json.loads(line))
-    return out
+def load_profile():
+    return core.load_profile(user_dir())
 
+@profiling.timed("save_profile")
+def save_profile(p: dict):
+    core.save_profile(user_dir(), p)
 
-# =========================
-# 스페셜 질문 중복 방지
-# =========================
-def load_special_history():
-    if os.path.exists(SPECIAL_HISTORY_PATH):
-        try:
-            with open(SPECIAL_HISTORY_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+def entry_store():
+    return open_store(user_dir(), STORAGE_BACKEND)
 
-def save_special_history(history: dict):
+@profiling.timed("append_entry")
+@metrics.timed("dw_append_entry_seconds", "append_entry 시간(초)")
+def append_entry(entry: dict):
     ensure_data_dir()
-    with open(SPECIAL_HISTORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
-
-def pick_special_question_unique(today_str: str, avoid_days: int = 14) -> str:
-    history = load_special_history()
-
-    if today_str in history:
-        return history[today_str]
-
-    today_date = datetime.fromisoformat(today_str).date()
-    recent_dates = [(today_date - timedelta(days=i)).isoformat() for i in range(1, avoid_days + 1)]
-
-    recent_used = set()
-    for d in recent_dates:
-        if d in history:
-            recent_used.add(history[d])
-
-    pool = [q for q in SPECIAL_QUESTIONS if q not in recent_used]
-    if not pool:
-        pool = SPECIAL_QUESTIONS[:]
-
-    seed_val = int(today_str.replace("-", ""))
-    random.seed(seed_val)
-    chosen = random.choice(pool)
-
-    history[today_str] = chosen
-
-    cleaned = {}
-    for k, v in history.items():
-        try:
-            kd = datetime.fromisoformat(k).date()
-            if (today_date - kd).days <= 60:
-                cleaned[k] = v
-        except Exception:
-            continue
-
-    save_special_history(cleaned)
-    return chosen
+    if writer.WRITE_BEHIND:
+        # 쓰기 스레드가 모아서 커밋 (디스크 지연이 rerun에 걸리지 않음)
+        writer.get_queue().submit(entry_store(), entry)
+        return
+    # 같은 id면 업서트 + 그날의 집계 버킷도 갱신, 검색 색인에는 이 기록만 더한다
+    store = entry_store()
+    before, after = aggregates.upsert_and_record(store, entry)
+    search.record(store, before, after, [entry])
+
+@profiling.timed("read_entries_last_days")
+@metrics.timed("dw_read_entries_seconds", "기록 읽기 시간(초)", fn="read_entries_last_days")
+def read_entries_last_days(days: int) -> list[dict]:
+    # 날짜 인덱스로 해당 구간만 읽는다
+    start, end = core.window(st.session_state.today, days)
+    store = entry_store()
+    if not writer.WRITE_BEHIND:
+        return store.read_range(start, end)
+    entries, pending = writer.get_queue().consistent_read(store, lambda: store.read_range(start, end))
+    return merge_entries(entries, [e for e in pending if start <= (e.get("date") or "")[:10] <= end])
 
 
 # =========================
 # 유틸
 # =========================
-def spotify_search_url(title: str, artist: str) -> str:
-    q = quote(f"{title} {artist}".strip())
-    return f"https://open.spotify.com/search/{q}"
-
-def shorten(text: str, n=40) -> str:
-    t = (text or "").strip().replace("\n", " ")
-    return t if len(t) <= n else t[:n] + "…"
-
-def infer_tag(mood_text: str, activities: list[str], one_word: str) -> str:
-    text = f"{mood_text} {one_word}".lower()
-
-    if any(k in text for k in ["우울", "슬픔", "침잠", "벅참"]):
-        return "comfort"
-    if any(k in text for k in ["감성", "따뜻함", "출렁임", "밤"]):
-        return "sentimental"
-    if any(k in text for k in ["열정", "긴장", "맑음"]):
-        return "energetic"
-    if any(k in text for k in ["냉정", "무덤덤", "리셋"]):
-        return "reset"
-    if ("공부" in activities) or ("업무" in activities):
-        return "focus"
-    if ("휴식" in activities) or ("회복" in activities):
-        return "chill"
-    return "chill"
-
-def pick_song(tag: str) -> dict:
-    pool = SONGS.get(tag, SONGS["chill"])
-    random.seed(st.session_state.today + tag)
-    return random.choice(pool)
-
-def closing_message(style_mode: str, name: str, one_word: str, best: str, growth: str) -> str:
-    best_s = shorten(best, 36)
-    growth_s = shorten(growth, 36)
-
-    random.seed(st.session_state.today + (one_word or "") + best_s)
-
-    cheers = [
-        "오늘도 정말 수고했어요.",
-        "오늘 하루를 기록한 것만으로도 충분히 잘한 일이에요.",
-        "내일은 조금 더 편안한 하루가 되길 바라요.",
-        "오늘의 당신에게 박수를 보내요.",
-        "오늘도 잘 버텼어요.",
-    ]
-    cheer = random.choice(cheers)
-
-    if style_mode == "친한친구":
-        return f"오늘은 **{one_word}**라는 단어가 딱 어울리는 하루였어. 특히 {best_s} 그 장면이 오래 남을 것 같아. {cheer}"
-    if style_mode == "반려동물":
-        return f"{name}님, 오늘 기록 남겨줘서 고마워요 🐾 오늘은 **{one_word}** 같은 하루였네요. {growth_s} 이 마음을 남긴 게 멋져요. {cheer}"
-    if style_mode == "차분한 비서":
-        return f"{name}님, 오늘의 기록을 정리했습니다. 핵심 단어는 **{one_word}**이며, 기억에 남는 순간은 {best_s}입니다. 성장 포인트는 {growth_s}로 요약됩니다. {cheer}"
-    if style_mode == "인생의 멘토":
-        return f"오늘을 **{one_word}**로 정리한 감각이 정확해요. {growth_s}을 발견한 것은 앞으로의 방향을 바꿀 수 있어요. {cheer}"
-    return f"오늘은 **{one_word}**라는 단어가 하루를 조용히 감싸고 있었어요. {best_s} 그 장면이 한 장의 사진처럼 남아 있네요. {cheer}"
-
-def parse_entry_date(e: dict):
-    d = e.get("date")
-    if not d:
-        return None
-    try:
-        return datetime.fromisoformat(d).date()
-    except Exception:
-        return None
+def song_catalog():
+    return core.song_catalog(SONG_CATALOG)
 
-def filter_entries_last_days(entries: list[dict], days: int) -> list[dict]:
-    today_ = datetime.fromisoformat(st.session_state.today).date()
-    start = today_ - timedelta(days=days - 1)
-    out = []
-    for e in entries:
-        ed = parse_entry_date(e)
-        if ed and start <= ed <= today_:
-            out.append(e)
-    return out
+def recent_song_keys(days: int) -> set[int]:
+    return core.recent_song_keys(read_entries_last_days(days))
+
+@profiling.timed("pick_song")
+def pick_song(mood: str, activities: list[str], one_word: str) -> dict:
+    # 오늘 답변의 태그 구성 + 최근 기분 흐름 + 최근에 나온 곡 빼기.
+    # 시드는 이미 있는 기록 파티션 (사용자 id를 새로 만들거나 주소를 바꾸지 않는다)
+    trend = growth_summary_last_days(recommend.TREND_DAYS)["moods"]
+    recent = recent_song_keys(recommend.NO_REPEAT_DAYS)
+    return core.pick_song(song_catalog(), mood, activities, one_word, trend, recent,
+                          user_dir(), st.session_state.today)
 
 
 # =========================
 # 성장서사 (+ 포트폴리오 소재 후보 복구!)
 # =========================
-def show_growth_summary(entries: list[dict], title: str):
-    if not entries:
+GROWTH_PERIODS = {
+    "주간": (7, "이번 주 성장서사"),
+    "월간": (30, "이번 달 성장서사"),
+    "연간": (365, "올해 성장서사"),
+}
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def cached_growth_summary(data_dir: str, backend: str, version: str, today: str, days: int) -> dict:
+    # 저장소 버전이 키에 들어 있어서 새 기록이 저장되면 자연스럽게 다시 계산된다
+    return aggregates.summarize_window(open_store(data_dir, backend), today, days)
+
+def growth_summary_last_days(days: int) -> dict:
+    store = entry_store()
+    today = st.session_state.today
+
+    def compute():
+        return cached_growth_summary(store.data_dir, store.backend, store.version(), today, days)
+
+    if not writer.WRITE_BEHIND:
+        return compute()
+    summary, pending = writer.get_queue().consistent_read(store, compute)
+    return aggregates.add_pending(summary, pending, today, days)
+
+def choose_growth_period():
+    # 고르기 전에는 아무것도 계산하지 않는다
+    options = list(GROWTH_PERIODS)
+    if hasattr(st, "segmented_control"):
+        return st.segmented_control("기간", options, default=None, key="growth_period", label_visibility="collapsed")
+    return st.radio("기간", options, index=None, horizontal=True, key="growth_period", label_visibility="collapsed")
+
+@profiling.timed("show_growth_summary")
+def show_growth_summary(summary: dict, title: str, days: int):
+    if not summary["n"]:
         st.info("아직 기록이 없어요. 오늘의 기록을 먼저 남겨보세요.", icon="🧶")
         return
 
-    moods, activities, words = [], [], []
-    for e in entries:
-        ans = e.get("answers", {})
-        moods.append(ans.get("mood", ""))
-        activities.extend(ans.get("activities", []))
-        words.append(ans.get("one_word", ""))
-
-    mood_top = [m for m, _ in Counter(moods).most_common(1)]
-    act_top = [a for a, _ in Counter(activities).most_common(3)]
-    word_top = [w for w, _ in Counter(words).most_common(3)]
+    mood_top = [m for m, _ in summary["moods"].most_common(1)]
+    act_top = [a for a, _ in summary["activities"].most_common(3)]
+    word_top = [w for w, _ in summary["words"].most_common(3)]
 
     theme_emoji = "🌿"
     theme_line = "이번 기간은 기록이 ‘정리’로 연결되는 흐름이 보여요."
@@ -683,7 +544,7 @@ def show_growth_summary(entries: list[dict], title: str):
     table = {
         "항목": ["기록일수", "대표 활동", "핵심 단어", "대표 기분"],
         "내용": [
-            f"{len(entries)}일",
+            f"{summary['n']}일",
             ", ".join(act_top) if act_top else "-",
             ", ".join([x for x in word_top if x]) if word_top else "-",
             mood_top[0] if mood_top else "-",
@@ -698,17 +559,156 @@ def show_growth_summary(entries: list[dict], title: str):
     if word_top and any(word_top):
         st.write(f"- 자주 등장한 단어는 **{', '.join([x for x in word_top if x])}**였어요.")
 
-    # ✅ 이전 버전: 포트폴리오 소재 후보 복구
-    st.markdown("**자소서·포트폴리오 소재 후보**")
-    st.write("**소재 1**")
-    st.write("- 상황: ")
-    st.write("- 행동: ")
-    st.write("- 결과/변화: ")
+    # 포트폴리오 소재 후보: 펼쳤을 때만 기록을 읽고, 뒤에서 만들어 다 되면 다음 실행에서 보여준다
+    toggle = st.toggle if hasattr(st, "toggle") else st.checkbox
+    if toggle("자소서·포트폴리오 소재 후보", key=f"show_highlights_{days}"):
+        show_highlights(days)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def cached_highlight_entries(data_dir: str, backend: str, version: str, today: str, days: int) -> list[dict]:
+    # cached_growth_summary처럼 저장소 버전이 키: 새 기록이 저장될 때만 다시 읽는다 (소재가 될 기록만 남겨서 캐시)
+    return highlights.contributing(core.read_last_days(open_store(data_dir, backend), days, today))
+
+def highlight_entries(days: int) -> list[dict]:
+    store = entry_store()
+    today = st.session_state.today
+
+    def compute():
+        return cached_highlight_entries(store.data_dir, store.backend, store.version(), today, days)
+
+    if not writer.WRITE_BEHIND:
+        return compute()
+    entries, pending = writer.get_queue().consistent_read(store, compute)
+    start, end = core.window(today, days)
+    return merge_entries(entries, [e for e in pending if start <= entry_date(e) <= end])
+
+def show_highlights(days: int):
+    state, key, items = highlights.request(user_dir(), highlight_entries(days))
+    if state == highlights.PENDING:
+        highlight_poller(key)
+        return
+    if not items:
+        st.caption("‘가장 좋았던 순간’이나 ‘성장’ 답변이 쌓이면 소재 후보를 정리해 드려요.")
+        return
+    for i, it in enumerate(items, 1):
+        st.write(f"**소재 {i}**")
+        st.write(f"- 상황: {it['situation']}")
+        st.write(f"- 행동: {it['action']}")
+        st.write(f"- 결과/변화: {it['result']}")
+
+# 작업이 끝났는지 1초마다 이 조각만 확인하고, 끝나면 한 번 전체를 다시 그린다
+poll_fragment = (lambda f: st.fragment(run_every=1.0)(f)) if hasattr(st, "fragment") else (lambda f: f)
+
+@poll_fragment
+def highlight_poller(key: str):
+    if not highlights.pending(key):
+        st.rerun()
+    st.caption("소재 후보를 정리하는 중이에요…")
+
+
+# =========================
+# 기록 검색
+# =========================
+def search_entries(query: str, limit: int = 20) -> list[tuple[dict, str]]:
+    store = entry_store()
+    if not writer.WRITE_BEHIND:
+        return search.search(store, query, limit)
+    # 대기 중 기록을 먼저 읽는다: 그 사이 커밋되면 색인에도 잡히고, 겹치는 건 search가 한 번만 돌려준다
+    pending = writer.get_queue().pending(store)
+    return search.search(store, query, limit, extra=pending)
+
+@profiling.timed("search")
+def show_search_results(query: str):
+    results = search_entries(query)
+    if not results:
+        st.caption("검색 결과가 없어요.")
+        return
+    for e, field in results:
+        text = (e.get("answers") or {}).get(field) or ""
+        st.markdown(f"**{entry_date(e)}** · {search.FIELD_LABELS[field]}  \n{search.snippet(text, query)}")
+
 
-    st.write("**소재 2**")
-    st.write("- 상황: ")
-    st.write("- 행동: ")
-    st.write("- 결과/변화: ")
+# =========================
+# 기록 내보내기
+# =========================
+EXPORT_LABELS = {"csv": "CSV", "md": "Markdown (날짜별)", "parquet": "Parquet"}
+
+def show_export_panel():
+    fmt = st.selectbox("형식", export.FORMATS, format_func=EXPORT_LABELS.get, key="export_format")
+    rng = st.date_input("기간 (비워 두면 전체)", value=(), key="export_range")
+    start = rng[0].isoformat() if len(rng) >= 1 else None
+    end = rng[1].isoformat() if len(rng) == 2 else start
+
+    # 버튼을 누를 때만 파일을 만든다 (저장소를 한 건씩 흘려 읽어 파일로 바로 씀)
+    if st.button("파일 만들기", key="export_btn"):
+        if writer.WRITE_BEHIND:
+            writer.get_queue().flush()
+        path = os.path.join(user_dir(), "exports", f"daily_weaver{export.EXTENSIONS[fmt]}")
+        try:
+            n = export.export(entry_store(), fmt, path, start, end)
+        except RuntimeError as e:
+            st.error(str(e))
+        else:
+            st.session_state.export_file = (path, fmt, n)
+
+    if st.session_state.get("export_file"):
+        path, fmt_, n = st.session_state.export_file
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                st.download_button(f"{n}개 기록 받기", f, file_name=os.path.basename(path),
+                                   mime=export.MIME_TYPES[fmt_], key="export_download")
+
+
+# =========================
+# 기록 가져오기
+# =========================
+def show_import_panel():
+    files = st.file_uploader("JSONL / JSON / CSV 파일", type=list(importer.FORMATS) + ["ndjson"],
+                             accept_multiple_files=True, key="import_files")
+    if st.button("가져오기", key="import_btn", disabled=not files):
+        # 대기 중 기록부터 커밋해 두고, 파일 전체를 커밋 한 번으로 (집계/검색 색인은 끝에 한 번만 다시 만든다)
+        if writer.WRITE_BEHIND:
+            writer.get_queue().flush()
+        # 읽지 못한 파일/줄은 예외 대신 보고서의 오류로 돌아온다
+        with st.spinner("기록을 가져오는 중…"):
+            st.session_state.import_report = importer.import_entries(entry_store(), [(f, f.name) for f in files])
+
+    report = st.session_state.get("import_report")
+    if report:
+        st.success(f"{report['imported']}개 기록을 가져왔어요 ({report['seconds']:.1f}초)")
+        if report["skipped"]:
+            with st.expander(f"건너뛴 기록 {report['skipped']}개"):
+                for where, msg in report["errors"]:
+                    st.caption(f"{where}: {msg}")
+
+
+# =========================
+# 성능 패널 (DW_PROFILE=1) / 지표
+# =========================
+def session_id() -> str:
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex[:8]
+    return st.session_state.session_id
+
+def remember_run(record):
+    # 이 세션의 최근 rerun들 (트레이스 파일에는 모든 세션이 쌓인다)
+    if record is None:
+        return
+    if "perf_runs" not in st.session_state:
+        st.session_state.perf_runs = deque(maxlen=profiling.HISTORY)
+    st.session_state.perf_runs.append(record)
+
+def show_perf_panel():
+    runs = list(st.session_state.get("perf_runs") or [])
+    if not runs:
+        st.caption("아직 잰 rerun이 없어요.")
+        return
+    st.caption(f"최근 {len(runs)}번 rerun의 구간별 시간 (구간은 겹칠 수 있어요)")
+    st.dataframe(profiling.summarize(runs), hide_index=True, use_container_width=True)
+    with st.expander("rerun별 보기"):
+        rows = [{"종류": r["kind"], "전체 ms": r["total_ms"], **r["phases"]} for r in reversed(runs)]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+    st.caption(f"트레이스: {profiling.TRACE_PATH}")
 
 
 # =========================
@@ -728,7 +728,8 @@ def init_state():
         st.session_state.today = date.today().isoformat()
 
     if "special_q" not in st.session_state:
-        st.session_state.special_q = pick_special_question_unique(st.session_state.today, avoid_days=14)
+        # 질문 일정은 날짜로만 정해지므로 사용자 파티션이 아니라 data/ 에 하나만 둔다
+        st.session_state.special_q = question_for(DATA_DIR, st.session_state.today)
 
     if "step" not in st.session_state:
         st.session_state.step = 0
@@ -742,15 +743,35 @@ def init_state():
     if "final_pushed" not in st.session_state:
         st.session_state.final_pushed = False
 
+    # 한 번의 기록(세션)마다 고정된 id, 저장은 정확히 한 번
+    if "entry_id" not in st.session_state:
+        st.session_state.entry_id = uuid.uuid4().hex
+
+    if "entry_committed" not in st.session_state:
+        st.session_state.entry_committed = False
+
     if "answers" not in st.session_state:
-        st.session_state.answers = {
-            "mood": None,
-            "activities": [],
-            "one_word": "",
-            "best_moment": "",
-            "growth": "",
-            "special_answer": "",
-        }
+        st.session_state.answers = empty_answers()
+
+    # 스크립트 실행 횟수 (기록 1건에 몇 번 돌았는지 보기 위한 카운터)
+    if "script_runs" not in st.session_state:
+        st.session_state.script_runs = 0
+
+    if "journal_run_start" not in st.session_state:
+        st.session_state.journal_run_start = 0
+
+    if "last_journal_runs" not in st.session_state:
+        st.session_state.last_journal_runs = None
+
+def empty_answers() -> dict:
+    return {
+        "mood": None,
+        "activities": [],
+        "one_word": "",
+        "best_moment": "",
+        "growth": "",
+        "special_answer": "",
+    }
 
 def push_app(msg: str):
     st.session_state.chat_log.append({"role": "app", "content": msg})
@@ -762,21 +783,21 @@ def push_user(msg: str):
 # =========================
 # iMessage-style renderer
 # =========================
+def bubble_html(role: str, content: str) -> str:
+    content = (content or "").replace("\n", "<br/>")
+    return f"""
+<div class="dw-row {role}">
+  <div class="dw-bubble {role}">{content}</div>
+</div>
+            """
+
+@profiling.timed("render_chat")
 def render_chat():
     st.markdown('<div class="dw-chat">', unsafe_allow_html=True)
 
     for m in st.session_state.chat_log:
         role = "them" if m["role"] == "app" else "you"
-        content = (m.get("content") or "").replace("\n", "<br/>")
-
-        st.markdown(
-            f"""
-<div class="dw-row {role}">
-  <div class="dw-bubble {role}">{content}</div>
-</div>
-            """,
-            unsafe_allow_html=True,
-        )
+        st.markdown(bubble_html(role, m.get("content")), unsafe_allow_html=True)
 
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -796,17 +817,208 @@ def choose_multi_pills(label: str, options: list[str], key: str):
     else:
         return st.multiselect(label, options, default=st.session_state.get(key, []), key=key, label_visibility="collapsed")
 
-def next_step():
-    st.session_state.step += 1
-    st.rerun()
+
+# =========================
+# 대화 흐름 (선언형)
+# =========================
+# 각 단계: 어떤 입력을 받아 answers의 어디에 넣고, 무엇을 되돌려 말하고, 다음에 무엇을 물을지.
+# 상태 전이는 전부 버튼 콜백(on_click)에서 일어나므로 메시지 하나 = 스크립트 실행 한 번.
+FLOW = {
+    1: {
+        "field": "mood", "input": "single", "options": [f"{e} {t}" for e, t in EMOJI_OPTIONS],
+        "key": "mood_choice", "button": "전송",
+        "next": "오늘 하루는 무엇으로 채워졌나요? 오늘 한 일을 모두 선택해 주세요.",
+    },
+    2: {
+        "field": "activities", "input": "multi", "options": ACTIVITIES,
+        "key": "activity_choice", "button": "전송",
+        "echo": lambda v: ", ".join(v) if v else "(선택 없음)",
+        "next": "한 단어로 오늘을 표현한다면 무엇인가요? 딱 떠오르는 단어 하나만 적어주세요.",
+    },
+    3: {
+        "field": "one_word", "input": "text", "placeholder": "한 단어를 입력해 주세요…",
+        "key": "msg_step3", "button": "➤", "required": True,
+        "next": "가장 기억에 남는 순간은 무엇인가요? 떠오르는 장면을 자유롭게 적어주세요.",
+    },
+    4: {
+        "field": "best_moment", "input": "text", "placeholder": "기억에 남는 순간을 적어 주세요…",
+        "key": "msg_step4", "button": "➤", "required": True,
+        "next": "새롭게 배우거나 성장한 점이 있나요? 작은 깨달음도 충분히 의미 있어요.",
+    },
+    5: {
+        "field": "growth", "input": "text", "placeholder": "오늘 성장한 점을 적어 주세요…",
+        "key": "msg_step5", "button": "➤", "required": True,
+        "next": lambda: f"오늘의 스페셜 질문이에요.\n{st.session_state.special_q}",
+    },
+    6: {
+        "field": "special_answer", "input": "text", "placeholder": "답을 적어 주세요…",
+        "key": "msg_step6", "button": "완료",
+        "echo": lambda v: v if v else "(빈 값)",
+    },
+}
+FINAL_STEP = 7
+
+def start_journal():
+    profile = st.session_state.profile or {}
+    name = profile.get("name", "사용자")
+    mode = st.session_state.style_mode
+
+    if mode == "차분한 비서":
+        push_app(f"{name}님, 오늘의 기록을 시작하겠습니다.")
+    elif mode == "반려동물":
+        push_app(f"{name}님, 반가워요 🐾 오늘 기록을 시작해볼까요.")
+    elif mode == "인생의 멘토":
+        push_app(f"{name}님, 오늘도 한 걸음 나아가 봅시다. 기록을 시작할게요.")
+    elif mode == "감성 에디터":
+        push_app(f"{name}님, 오늘의 장면들을 조용히 엮어볼까요.")
+    else:
+        push_app(f"{name}님, 오늘도 수고 많았어요. 천천히 기록해볼까요.")
+
+    push_app("오늘의 기분은 어떤가요? 지금 마음과 가장 가까운 걸 골라주세요.")
+    st.session_state.chat_started = True
+    st.session_state.step = 1
+    st.session_state.journal_run_start = st.session_state.script_runs
+
+def submit_step(step: int):
+    # 버튼 콜백: 스크립트가 다시 돌기 전에 실행되므로 st.rerun()이 필요 없다
+    spec = FLOW[step]
+    value = st.session_state.get(spec["key"])
+    if spec["input"] == "text":
+        value = (value or "").strip()
+        if spec.get("required") and not value:
+            return
+
+    st.session_state.answers[spec["field"]] = value
+    echo = spec.get("echo")
+    push_user(echo(value) if echo else value)
+
+    nxt = spec.get("next")
+    if nxt:
+        push_app(nxt() if callable(nxt) else nxt)
+    st.session_state.step = step + 1
+
+def reset_journal():
+    st.session_state.step = 0
+    st.session_state.chat_started = False
+    st.session_state.chat_log = []
+    st.session_state.final_pushed = False
+    st.session_state.entry_id = uuid.uuid4().hex
+    st.session_state.entry_committed = False
+    st.session_state.answers = empty_answers()
+
+    if "special_q" in st.session_state:
+        del st.session_state.special_q
+
+def render_step_input(step: int):
+    spec = FLOW[step]
+    if spec["input"] == "single":
+        choose_single_pills(spec["field"], spec["options"], key=spec["key"])
+    elif spec["input"] == "multi":
+        choose_multi_pills(spec["field"], spec["options"], key=spec["key"])
+    else:
+        st.text_area("", placeholder=spec["placeholder"], key=spec["key"], label_visibility="collapsed")
+
+    st.button(spec["button"], key=f"send_step{step}", type="primary", on_click=submit_step, args=(step,))
+
+def stream_closing(slot, name: str, mood: str, one_word: str, best: str, growth: str) -> str:
+    # LLM이 켜져 있으면 받는 대로 말풍선에 흘려 넣고, 아니면/실패하면 템플릿 문장
+    fallback = closing_message(st.session_state.style_mode, name, one_word, best, growth, st.session_state.today)
+    answers = {"mood": mood, "activities": st.session_state.answers["activities"],
+               "one_word": one_word, "best_moment": best, "growth": growth}
+    closing = fallback
+    for closing in llm.stream_closing(user_dir(), st.session_state.style_mode, name, answers, fallback):
+        if slot is not None:
+            slot.markdown(bubble_html("them", f"<b>{closing}</b> ▍"), unsafe_allow_html=True)
+    return closing
+
+@profiling.timed("finalize_journal")
+def finalize_journal(slot=None):
+    a = st.session_state.answers
+    profile = st.session_state.profile or {}
+    name = profile.get("name", "사용자")
+
+    mood = a["mood"] or ""
+    one_word = a["one_word"] or "기록"
+    best = a["best_moment"]
+    growth = a["growth"]
+
+    closing = stream_closing(slot, name, mood, one_word, best, growth)
+    tag = infer_tag(mood, a["activities"], one_word)
+    song = pick_song(mood, a["activities"], one_word)
+    link = spotify_search_url(song["title"], song["artist"])
+    # 말풍선에는 커버 자리에 맞게 줄인 썸네일 (한 번 만들면 static/thumbs/에서 바로)
+    cover = cover_src(song["cover_url"])
+
+    entry = {
+        "id": st.session_state.entry_id,
+        "date": st.session_state.today,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "profile": profile,
+        "style_mode": st.session_state.style_mode,
+        "answers": {
+            "mood": mood,
+            "activities": a["activities"],
+            "one_word": one_word,
+            "best_moment": best,
+            "growth": growth,
+            "special_q": st.session_state.special_q,
+            "special_answer": a["special_answer"],
+        },
+        "closing_message": closing,
+        "song": {
+            "tag": tag,
+            "title": song["title"],
+            "artist": song["artist"],
+            "cover_url": song["cover_url"],
+            "spotify_url": link,
+        },
+    }
+
+    if not st.session_state.entry_committed:
+        append_entry(entry)
+        st.session_state.entry_committed = True
+        metrics.JOURNALS.inc()
+
+    music_html = f"""
+<b>{closing}</b><br/><br/>
+<div class="dw-music-wrap">
+  <div class="dw-music-card">
+    <div class="dw-cover-wrap">
+      <img class="dw-cover" src="{cover}" />
+    </div>
+    <div style="flex:1;">
+      <p class="dw-music-title">{song["title"]}</p>
+      <p class="dw-music-artist">{song["artist"]}</p>
+      <div class="dw-open-row">
+        <div class="dw-open-text">Spotify에서 바로 감상하기</div>
+        <a class="dw-open-btn" href="{link}" target="_blank" title="Spotify 열기">🎧</a>
+      </div>
+    </div>
+  </div>
+</div>
+    """.strip()
+
+    push_app(music_html)
+    if slot is not None:
+        slot.markdown(bubble_html("them", music_html), unsafe_allow_html=True)
+    st.session_state.final_pushed = True
+    st.session_state.last_journal_runs = st.session_state.script_runs - st.session_state.journal_run_start + 1
+
+# 구버전 Streamlit(fragment 없음)에서는 그냥 일반 함수로 실행
+chat_fragment = getattr(st, "fragment", lambda f: f)
 
 
 # =========================
 # 앱 시작
 # =========================
 st.set_page_config(page_title=APP_TITLE, page_icon="🧶", layout="wide")
+profiling.start_run("script", session_id())
+metrics.start(DATA_DIR)
+metrics.touch_session(session_id())
+st.session_state.full_run = True
 inject_css()
 init_state()
+llm.prewarm()
 
 
 # =========================
@@ -860,16 +1072,28 @@ with st.sidebar:
         st.session_state.show_onboarding = True
         st.rerun()
 
+    st.divider()
+    st.subheader("기록 검색")
+    query = st.text_input("기록 검색", placeholder="예: 발표, 산책", key="search_query", label_visibility="collapsed")
+    if query.strip():
+        show_search_results(query)
+
+    st.divider()
+    st.subheader("기록 내보내기")
+    show_export_panel()
+
+    st.divider()
+    st.subheader("기록 가져오기")
+    show_import_panel()
+
     st.divider()
     st.subheader("성장서사 보기")
-    all_entries = read_entries()
-    wtab, mtab, ytab = st.tabs(["주간", "월간", "연간"])
-    with wtab:
-        show_growth_summary(filter_entries_last_days(all_entries, 7), "이번 주 성장서사")
-    with mtab:
-        show_growth_summary(filter_entries_last_days(all_entries, 30), "이번 달 성장서사")
-    with ytab:
-        show_growth_summary(filter_entries_last_days(all_entries, 365), "올해 성장서사")
+    period = choose_growth_period()
+    if period:
+        days, title = GROWTH_PERIODS[period]
+        show_growth_summary(growth_summary_last_days(days), title, days)
+    else:
+        st.caption("기간을 고르면 그때 성장서사를 불러와요.")
 
 
 # =========================
@@ -929,216 +1153,57 @@ if st.session_state.show_onboarding:
 
 
 # =========================
-# Chat Area
-# =========================
-render_chat()
-
-
-# =========================
-# 첫 시작
+# Chat Area (fragment)
 # =========================
-if not st.session_state.chat_started and st.session_state.step == 0:
-    st.session_state.chat_started = True
-    profile = st.session_state.profile or {}
-    name = profile.get("name", "사용자")
-    mode = st.session_state.style_mode
-
-    if mode == "차분한 비서":
-        push_app(f"{name}님, 오늘의 기록을 시작하겠습니다.")
-    elif mode == "반려동물":
-        push_app(f"{name}님, 반가워요 🐾 오늘 기록을 시작해볼까요.")
-    elif mode == "인생의 멘토":
-        push_app(f"{name}님, 오늘도 한 걸음 나아가 봅시다. 기록을 시작할게요.")
-    elif mode == "감성 에디터":
-        push_app(f"{name}님, 오늘의 장면들을 조용히 엮어볼까요.")
-    else:
-        push_app(f"{name}님, 오늘도 수고 많았어요. 천천히 기록해볼까요.")
-
-    push_app("오늘의 기분은 어떤가요? 지금 마음과 가장 가까운 걸 골라주세요.")
-    st.session_state.step = 1
-    st.rerun()
-
-
-# =========================
-# Step UI
-# =========================
-step = st.session_state.step
-a = st.session_state.answers
-
-
-# =========================
-# Fixed Composer (iMessage)
-# =========================
-st.markdown('<div class="dw-fixed-composer">', unsafe_allow_html=True)
-st.markdown('<div class="dw-fixed-inner">', unsafe_allow_html=True)
-
-if step == 1:
-    options = [f"{e} {t}" for e, t in EMOJI_OPTIONS]
-    chosen = choose_single_pills("mood", options, key="mood_choice")
+# 대화 영역만 따로 rerun된다: 전송 버튼을 눌러도 CSS/사이드바(기록 읽기)는 다시 돌지 않는다.
+@chat_fragment
+@profiling.timed("chat_area")
+def chat_area():
+    # fragment rerun이면 이 함수 하나가 run 하나 (전체 rerun 안에서는 이미 run이 있다)
+    owned = profiling.start_run("fragment", session_id())
+    if not st.session_state.pop("full_run", False):
+        metrics.touch_session(session_id())
+    # fragment rerun에서는 스크립트 위쪽이 돌지 않으므로 여기서도 상태를 챙긴다
+    init_state()
+    st.session_state.script_runs += 1
+
+    # 첫 시작 / 마지막 단계는 같은 실행 안에서 바로 채워 넣는다 (추가 rerun 없음)
+    if not st.session_state.chat_started and st.session_state.step == 0:
+        start_journal()
+    finalizing = st.session_state.step == FINAL_STEP and not st.session_state.final_pushed
+
+    render_chat()
+    # 마무리 말풍선은 지금까지의 대화 아래 빈 자리에 받아 오는 대로 그린다
+    if finalizing:
+        finalize_journal(st.empty())
+
+    # =========================
+    # Fixed Composer (iMessage)
+    # =========================
+    step = st.session_state.step
+
+    st.markdown('<div class="dw-fixed-composer">', unsafe_allow_html=True)
+    st.markdown('<div class="dw-fixed-inner">', unsafe_allow_html=True)
+
+    if step in FLOW:
+        render_step_input(step)
+    elif step == FINAL_STEP:
+        st.button("다시 하기", key="reset_btn", type="primary", on_click=reset_journal)
+        if st.session_state.last_journal_runs:
+            st.caption(f"이번 기록은 스크립트 {st.session_state.last_journal_runs}번 실행으로 완성됐어요.")
 
     st.markdown("</div>", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
-    if st.button("전송", key="send_step1", type="primary"):
-        a["mood"] = chosen
-        push_user(chosen)
-        push_app("오늘 하루는 무엇으로 채워졌나요? 오늘 한 일을 모두 선택해 주세요.")
-        next_step()
-
-elif step == 2:
-    selected = choose_multi_pills("activities", ACTIVITIES, key="activity_choice")
+    if owned:
+        remember_run(profiling.finish_run())
 
-    st.markdown("</div>", unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
 
-    if st.button("전송", key="send_step2", type="primary"):
-        a["activities"] = selected
-        text = ", ".join(selected) if selected else "(선택 없음)"
-        push_user(text)
-        push_app("한 단어로 오늘을 표현한다면 무엇인가요? 딱 떠오르는 단어 하나만 적어주세요.")
-        next_step()
+chat_area()
 
-elif step == 3:
-    msg = st.text_area("", placeholder="한 단어를 입력해 주세요…", key="msg_step3", label_visibility="collapsed")
-    st.markdown("</div>", unsafe_allow_html=True)
-
-    if st.button("➤", key="send_step3", type="primary"):
-        if msg.strip():
-            a["one_word"] = msg.strip()
-            push_user(a["one_word"])
-            push_app("가장 기억에 남는 순간은 무엇인가요? 떠오르는 장면을 자유롭게 적어주세요.")
-            next_step()
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-elif step == 4:
-    msg = st.text_area("", placeholder="기억에 남는 순간을 적어 주세요…", key="msg_step4", label_visibility="collapsed")
-    st.markdown("</div>", unsafe_allow_html=True)
-
-    if st.button("➤", key="send_step4", type="primary"):
-        if msg.strip():
-            a["best_moment"] = msg.strip()
-            push_user(a["best_moment"])
-            push_app("새롭게 배우거나 성장한 점이 있나요? 작은 깨달음도 충분히 의미 있어요.")
-            next_step()
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-elif step == 5:
-    msg = st.text_area("", placeholder="오늘 성장한 점을 적어 주세요…", key="msg_step5", label_visibility="collapsed")
-    st.markdown("</div>", unsafe_allow_html=True)
-
-    if st.button("➤", key="send_step5", type="primary"):
-        if msg.strip():
-            a["growth"] = msg.strip()
-            push_user(a["growth"])
-            push_app(f"오늘의 스페셜 질문이에요.\n{st.session_state.special_q}")
-            next_step()
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-elif step == 6:
-    msg = st.text_area("", placeholder="답을 적어 주세요…", key="msg_step6", label_visibility="collapsed")
-    st.markdown("</div>", unsafe_allow_html=True)
-
-    if st.button("완료", key="send_step6", type="primary"):
-        a["special_answer"] = msg.strip()
-        push_user(a["special_answer"] if a["special_answer"] else "(빈 값)")
-        next_step()
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-elif step == 7:
-    st.markdown("</div>", unsafe_allow_html=True)
-
-    if st.button("다시 하기", key="reset_btn", type="primary"):
-        st.session_state.step = 0
-        st.session_state.chat_log = []
-        st.session_state.final_pushed = False
-
-        st.session_state.answers = {
-            "mood": None,
-            "activities": [],
-            "one_word": "",
-            "best_moment": "",
-            "growth": "",
-            "special_answer": "",
-        }
-
-        if "special_q" in st.session_state:
-            del st.session_state.special_q
-
-        st.rerun()
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-else:
-    st.markdown("</div>", unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-
-# =========================
-# Final step: Music bubble push
-# =========================
-if step == 7:
-    profile = st.session_state.profile or {}
-    name = profile.get("name", "사용자")
-
-    mood = a["mood"] or ""
-    one_word = a["one_word"] or "기록"
-    best = a["best_moment"]
-    growth = a["growth"]
-
-    closing = closing_message(st.session_state.style_mode, name, one_word, best, growth)
-    tag = infer_tag(mood, a["activities"], one_word)
-    song = pick_song(tag)
-    link = spotify_search_url(song["title"], song["artist"])
-
-    entry = {
-        "date": st.session_state.today,
-        "created_at": datetime.now().isoformat(timespec="seconds"),
-        "profile": profile,
-        "style_mode": st.session_state.style_mode,
-        "answers": {
-            "mood": mood,
-            "activities": a["activities"],
-            "one_word": one_word,
-            "best_moment": best,
-            "growth": growth,
-            "special_q": st.session_state.special_q,
-            "special_answer": a["special_answer"],
-        },
-        "closing_message": closing,
-        "song": {
-            "tag": tag,
-            "title": song["title"],
-            "artist": song["artist"],
-            "cover_url": song["cover_url"],
-            "spotify_url": link,
-        },
-    }
-    append_entry(entry)
-
-    if not st.session_state.final_pushed:
-        music_html = f"""
-<b>{closing}</b><br/><br/>
-<div class="dw-music-wrap">
-  <div class="dw-music-card">
-    <div class="dw-cover-wrap">
-      <img class="dw-cover" src="{song["cover_url"]}" />
-    </div>
-    <div style="flex:1;">
-      <p class="dw-music-title">{song["title"]}</p>
-      <p class="dw-music-artist">{song["artist"]}</p>
-      <div class="dw-open-row">
-        <div class="dw-open-text">Spotify에서 바로 감상하기</div>
-        <a class="dw-open-btn" href="{link}" target="_blank" title="Spotify 열기">🎧</a>
-      </div>
-    </div>
-  </div>
-</div>
-        """.strip()
-
-        push_app(music_html)
-        st.session_state.final_pushed = True
-        st.rerun()
+remember_run(profiling.finish_run())
+if profiling.ENABLED:
+    with st.sidebar:
+        st.divider()
+        st.subheader("성능")
+        show_perf_panel()
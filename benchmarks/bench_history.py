@@ -0,0 +1,221 @@
+# bench_history.py — 기록이 쌓일수록 느려지는 경로 벤치마크 (합성 기록 1k ~ 1M)
+# 실행: python benchmarks/bench_history.py [--scales 1000,10000,100000] [--backend sqlite] [--save-baseline]
+#
+# 1) synth.py로 규모별 기록을 만든다 (--work-dir에 남겨 두고 다음 실행에서 다시 쓴다)
+# 2) 경로마다 중앙값 시간, 처리량(기록/초), tracemalloc 최대 메모리를 잰다 (+ 새 인터프리터에서 core 가져오기 시간)
+# 3) baseline.json과 비교해서 TOLERANCE배보다 느려지거나 메모리가 늘어난 경로를 표시하고 종료 코드 1
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import subprocess
+import argparse
+import tempfile
+import tracemalloc
+from statistics import median
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+import aggregates  # noqa: E402
+import questions  # noqa: E402
+import search  # noqa: E402
+from core import filter_entries_last_days, window  # noqa: E402
+from synth import populate  # noqa: E402
+
+
+END = date(2025, 12, 31)  # 합성 기록의 마지막 날 = 벤치마크의 "오늘" (기준선과 같은 데이터를 쓰려고 고정)
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TOLERANCE = 1.3           # 기준선보다 이 배수 넘게 느리거나 무거우면 회귀
+MIN_TIME = 0.5            # 경로마다 적어도 이만큼(초) 반복
+MAX_REPEAT = 50
+
+
+# =========================
+# 잴 경로
+# =========================
+def _drop_caches(store):
+    # 프로세스 캐시와 파생 파일을 지워서 앱을 새로 띄운 직후처럼
+    with storage._TAIL_LOCK:
+        storage._TAIL_CACHE.clear()
+    with aggregates._AGG_LOCK:
+        aggregates._AGG_CACHE.clear()
+    with questions._SCHEDULES_LOCK:
+        questions._SCHEDULES.clear()
+    for name in (aggregates.AGG_FILENAME, aggregates.AGG_LOG_FILENAME, questions.SCHEDULE_FILENAME):
+        try:
+            os.remove(os.path.join(store.data_dir, name))
+        except FileNotFoundError:
+            pass
+
+def _drop_search(store):
+    # 메모리 색인만 내린다 (재시작 직후처럼: 저장소 옆 색인 파일에서 읽어 온다)
+    with search._LOCK:
+        search._INDEXES.clear()
+
+
+def cases(store, today: str) -> list[tuple]:
+    # (이름, 준비 함수 또는 None, 잴 함수 → 다룬 기록 수)
+    everything = store.read_all()
+    return [
+        ("read_entries", None, lambda: len(store.read_all())),
+        ("read_entries_cold", lambda: _drop_caches(store), lambda: len(store.read_all())),
+        ("read_entries_last_days_30", None, lambda: len(store.read_range(*window(today, 30)))),
+        ("filter_entries_last_days_365", None, lambda: len(filter_entries_last_days(everything, 365, today))),
+        ("growth_summary_7", None, lambda: aggregates.summarize_window(store, today, 7)["n"]),
+        ("growth_summary_365", None, lambda: aggregates.summarize_window(store, today, 365)["n"]),
+        ("growth_summary_365_cold", lambda: _drop_caches(store),
+         lambda: aggregates.summarize_window(store, today, 365)["n"]),
+        ("special_question", None, lambda: bool(questions.question_for(store.data_dir, today))),
+        ("special_question_cold", lambda: _drop_caches(store),
+         lambda: bool(questions.question_for(store.data_dir, today))),
+        ("search", None, lambda: len(search.search(store, "발표"))),
+        ("search_restart", lambda: _drop_search(store), lambda: len(search.search(store, "발표"))),
+    ]
+
+
+# =========================
+# 재기
+# =========================
+def measure(setup, fn) -> dict:
+    if setup is None:
+        fn()  # 한 번 데워 둔다
+    times, items = [], 0
+    started = time.perf_counter()
+    while len(times) < 3 or (time.perf_counter() - started < MIN_TIME and len(times) < MAX_REPEAT):
+        if setup:
+            setup()
+        t = time.perf_counter()
+        items = fn()
+        times.append(time.perf_counter() - t)
+
+    # 메모리는 따로 한 번 (tracemalloc이 켜져 있으면 느려지므로 시간과 섞지 않는다)
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t = median(times)
+    return {
+        "median_ms": round(t * 1000, 3),
+        "items": int(items),
+        "items_per_s": round(items / t) if t > 0 and items > 1 else None,
+        "peak_kb": round(peak / 1024),
+        "repeat": len(times),
+    }
+
+
+def import_time(module: str = "core", repeat: int = 5) -> dict:
+    # 새 프로세스에서 가져오기만 (목표: core는 50ms 미만, streamlit을 불러오지 않음)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (f"import sys, time; t = time.perf_counter(); import {module}; "
+            "print((time.perf_counter() - t) * 1000, 'streamlit' in sys.modules)")
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        ms, has_st = out.stdout.split()
+        if has_st == "True":
+            raise RuntimeError(f"{module}가 streamlit을 불러와요")
+        times.append(float(ms))
+    return {"median_ms": round(median(times), 3), "items": 1, "items_per_s": None, "peak_kb": 0, "repeat": repeat}
+
+
+def dataset(work_dir: str, backend: str, n: int, seed: int):
+    # 같은 규모/시드/백엔드면 만들어 둔 것을 다시 쓴다
+    d = os.path.join(work_dir, f"{backend}-{n}-{seed}")
+    marker = os.path.join(d, "synth.done")
+    if not os.path.exists(marker):
+        shutil.rmtree(d, ignore_errors=True)
+        t = time.perf_counter()
+        populate(d, backend, n, END, seed=seed)
+        print(f"  합성 기록 {n:,}개 생성 {time.perf_counter() - t:.1f}초")
+        with open(marker, "w") as f:
+            f.write(str(n))
+    return storage.open_store(d, backend)
+
+
+# =========================
+# 기준선
+# =========================
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("results", {})
+    except FileNotFoundError:
+        return {}
+
+def save_baseline(path: str, results: dict):
+    merged = {**load_baseline(path), **results}
+    meta = {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system(),
+            "saved_at": datetime.now().isoformat(timespec="seconds")}
+    storage.atomic_write_json(path, {"meta": meta, "results": dict(sorted(merged.items()))})
+
+def compare(now: dict, base: dict, tolerance: float) -> list[str]:
+    notes = []
+    if not base:
+        return notes
+    t_ratio = now["median_ms"] / base["median_ms"] if base.get("median_ms") else 1.0
+    m_ratio = now["peak_kb"] / base["peak_kb"] if base.get("peak_kb") else 1.0
+    # 아주 짧은 경로(1ms 미만)나 작은 메모리(64KB 미만)는 잡음이 커서 절대량도 함께 본다
+    if t_ratio > tolerance and now["median_ms"] - base["median_ms"] > 1.0:
+        notes.append(f"시간 {t_ratio:.2f}배")
+    if m_ratio > tolerance and now["peak_kb"] - base["peak_kb"] > 64:
+        notes.append(f"메모리 {m_ratio:.2f}배")
+    return notes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기록 규모별 벤치마크")
+    parser.add_argument("--scales", default="1000,10000,100000", help="쉼표로 구분한 기록 수 (1000000까지)")
+    parser.add_argument("--backend", choices=storage.BACKENDS, default="sqlite")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "dw-bench"))
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준선으로 저장합니다")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--only", help="이름에 이 글자가 들어간 경로만")
+    args = parser.parse_args(argv)
+
+    base = load_baseline(args.baseline)
+    results, regressions = {}, []
+    today = END.isoformat()
+
+    if not args.only or args.only in "import_core":
+        key = "import_core"
+        r = results[key] = import_time()
+        notes = compare(r, base.get(key) or {}, args.tolerance)
+        if notes:
+            regressions.append(key)
+        print(f"  {'import_core':<30} {r['median_ms']:>10.2f} ms" + (f"  ← 회귀: {', '.join(notes)}" if notes else ""))
+
+    for n in (int(s) for s in args.scales.split(",") if s.strip()):
+        print(f"[{args.backend}] 기록 {n:,}개")
+        store = dataset(args.work_dir, args.backend, n, args.seed)
+        for name, setup, fn in cases(store, today):
+            if args.only and args.only not in name:
+                continue
+            key = f"{args.backend}/{n}/{name}"
+            r = results[key] = measure(setup, fn)
+            notes = compare(r, base.get(key) or {}, args.tolerance)
+            if notes:
+                regressions.append(key)
+            rate = f"{r['items_per_s']:>12,}/s" if r["items_per_s"] else " " * 14
+            print(f"  {name:<30} {r['median_ms']:>10.2f} ms {rate} {r['peak_kb']:>9,} KB"
+                  + (f"  ← 회귀: {', '.join(notes)}" if notes else ""))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"기준선을 저장했어요: {args.baseline}")
+    if regressions:
+        print(f"기준선보다 나빠진 경로 {len(regressions)}개")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
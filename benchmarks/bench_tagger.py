@@ -0,0 +1,94 @@
+# bench_tagger.py — infer_tag 처리량 (texts/sec)
+# 실행: python benchmarks/bench_tagger.py [--texts 20000] [--lexicon-size 5000]
+#
+# 1) 지금 사전으로 예전 if 사슬(tests/legacy_tagger_fixture.py에 얼려 둔 비교 기준)과 결과가 같은지 확인
+# 2) 예전 규칙 / 컴파일된 분류기(기본 사전) / 컴파일된 분류기(큰 사전)의 처리량 비교
+
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from core import EMOJI_OPTIONS, ACTIVITIES  # noqa: E402
+from tagger import Tagger, DEFAULT_LEXICON, TAGS, infer_tag  # noqa: E402
+from selection import stable_choice, stable_index  # noqa: E402
+from synth import WORDS as SYNTH_WORDS  # noqa: E402
+from legacy_tagger_fixture import frozen_legacy_infer_tag  # noqa: E402
+
+
+# 입력은 앱의 선택지 그대로 + 합성 기록의 단어와 사전 키워드
+EMOJI_MOODS = [f"{emoji} {mood}" for emoji, mood in EMOJI_OPTIONS]
+WORDS = list(dict.fromkeys(SYNTH_WORDS + [kw for kw, _, _ in DEFAULT_LEXICON]))
+
+
+def make_inputs(n: int) -> list[tuple[str, list[str], str]]:
+    out = []
+    for i in range(n):
+        mood = stable_choice(EMOJI_MOODS, "mood", i)
+        acts = [a for a in ACTIVITIES if stable_index(4, "act", i, a) == 0]
+        word = " ".join(stable_choice(WORDS, "word", i, k) for k in range(1 + stable_index(3, "len", i)))
+        out.append((mood, acts, word))
+    return out
+
+
+def big_lexicon(size: int) -> list[tuple[str, str, float]]:
+    # 한글 음절 조합으로 만든 합성 키워드 (실제 사전 규모를 흉내)
+    lex = list(DEFAULT_LEXICON)
+    for i in range(size):
+        kw = "".join(chr(0xAC00 + stable_index(11172, "kw", i, k)) for k in range(2 + stable_index(3, "kwlen", i)))
+        lex.append((kw, stable_choice(TAGS, "tag", i), 1 + stable_index(9, "w", i)))
+    return lex
+
+
+def throughput(fn, inputs) -> float:
+    t = time.perf_counter()
+    for mood, acts, word in inputs:
+        fn(mood, acts, word)
+    return len(inputs) / (time.perf_counter() - t)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="infer_tag 처리량 벤치마크")
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--lexicon-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    inputs = make_inputs(args.texts)
+
+    diff = sum(1 for x in inputs if frozen_legacy_infer_tag(*x) != infer_tag(*x))
+    print(f"결과 일치: {len(inputs) - diff}/{len(inputs)}")
+    if diff:
+        sys.exit(1)
+
+    t = time.perf_counter()
+    big = Tagger(big_lexicon(args.lexicon_size))
+    build_ms = (time.perf_counter() - t) * 1000
+
+    def big_infer(mood, acts, word):
+        ranked = big.rank(f"{mood} {word}", acts)
+        return ranked[0][0] if ranked else "chill"
+
+    # 같은 큰 사전을 예전 방식(키워드마다 `in` 검사)으로 훑는 경우
+    lex = [(kw.lower(), tag, w) for kw, tag, w in big_lexicon(args.lexicon_size)]
+
+    def scan_infer(mood, acts, word):
+        text = f"{mood} {word}".lower()
+        scores = {}
+        for kw, tag, w in lex:
+            if kw in text:
+                scores[tag] = scores.get(tag, 0) + w
+        return max(scores, key=scores.get) if scores else "chill"
+
+    print(f"예전 if 사슬 (14 키워드)        : {throughput(frozen_legacy_infer_tag, inputs):>12,.0f} texts/s")
+    print(f"컴파일 분류기 (14 키워드)       : {throughput(infer_tag, inputs):>12,.0f} texts/s")
+    print(f"키워드별 스캔 ({len(lex):,} 키워드)   : {throughput(scan_infer, inputs[:2000]):>12,.0f} texts/s")
+    print(f"컴파일 분류기 ({len(big.keywords):,} 키워드)  : {throughput(big_infer, inputs):>12,.0f} texts/s"
+          f"  (컴파일 {build_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# synth.py — 벤치마크용 합성 기록 생성기
+# core.py의 EMOJI_OPTIONS / ACTIVITIES로, 1k ~ 1M개 기록을 같은 시드면 항상 같게 만든다.
+# 실행: python benchmarks/synth.py --entries 100000 --data-dir /tmp/dw-bench --backend sqlite
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aggregates  # noqa: E402
+from core import EMOJI_OPTIONS, ACTIVITIES, STYLE_MODES  # noqa: E402
+from storage import open_store, BACKENDS  # noqa: E402
+
+
+WORDS = ["리셋", "밤", "설렘", "버팀", "몰입", "산책", "회복", "정리", "성장", "긴장", "평범", "따뜻함", "커피", "발표"]
+
+# 자유 답변 조각 (장소 + 일 + 느낌을 이어 붙인다)
+PLACES = ["도서관에서", "회사에서", "카페에서", "집 앞 공원에서", "지하철에서", "동아리방에서", "헬스장에서", "친구 집에서"]
+DOINGS = ["발표 자료를 끝까지 정리했다", "오래 미뤄 둔 보고서를 마무리했다", "30분 동안 천천히 산책했다",
+          "새로운 레시피로 저녁을 만들었다", "팀원들과 회의를 이끌었다", "코딩 테스트 문제를 세 개 풀었다",
+          "엄마랑 오랜만에 통화했다", "방 정리를 하고 책상을 바꿨다", "처음으로 5km를 쉬지 않고 달렸다"]
+FEELINGS = ["생각보다 뿌듯했다.", "조금 지쳤지만 괜찮았다.", "마음이 한결 가벼워졌다.", "덕분에 하루가 달라졌다.",
+            "작은 일인데도 오래 기억에 남을 것 같다.", "다음에는 더 잘할 수 있을 것 같다."]
+LESSONS = ["완벽하지 않아도 시작하는 게 중요하다는 걸 배웠다.", "도움을 요청하는 것도 실력이라는 걸 깨달았다.",
+           "쉬는 시간도 계획에 넣어야 한다는 걸 알게 됐다.", "숫자로 기록하니 변화가 보여서 좋았다.",
+           "남과 비교하지 않으니 마음이 편해졌다.", "작은 습관이 쌓이면 결과가 달라진다고 느꼈다."]
+SPECIAL_QS = ["오늘 하루를 색으로 표현한다면 어떤 색인가요?", "오늘의 나는 어떤 날씨 같았나요?",
+              "오늘 가장 감사했던 순간은 무엇이었나요?"]
+SPECIAL_AS = ["연한 하늘색", "맑다가 흐림", "친구가 건넨 커피 한 잔", "노을빛 주황", "비 온 뒤 맑음"]
+SONGS = [("comfort", "Love Poem", "아이유"), ("chill", "Sunday Morning", "Maroon 5"), ("energetic", "Dynamite", "BTS"),
+         ("focus", "Experience", "Ludovico Einaudi"), ("reset", "Good Days", "SZA"), ("sentimental", "밤편지", "아이유")]
+
+
+def make_entry(rng: random.Random, i: int, day: date) -> dict:
+    emoji, mood = rng.choice(EMOJI_OPTIONS)
+    tag, title, artist = rng.choice(SONGS)
+    sentences = rng.randint(1, 3)
+    best = " ".join(f"{rng.choice(PLACES)} {rng.choice(DOINGS)}. {rng.choice(FEELINGS)}" for _ in range(sentences))
+    return {
+        "id": f"syn-{i:07d}",
+        "date": day.isoformat(),
+        "created_at": f"{day.isoformat()}T{rng.randint(18, 23):02d}:{rng.randint(0, 59):02d}:00",
+        "style_mode": rng.choice(STYLE_MODES),
+        "answers": {
+            "mood": f"{emoji} {mood}",
+            "activities": rng.sample(ACTIVITIES, rng.randint(1, 3)),
+            "one_word": rng.choice(WORDS),
+            "best_moment": best,
+            "growth": rng.choice(LESSONS),
+            "special_q": rng.choice(SPECIAL_QS),
+            "special_answer": rng.choice(SPECIAL_AS),
+        },
+        "closing_message": f"오늘은 **{rng.choice(WORDS)}**라는 단어가 어울리는 하루였어요.",
+        "song": {"tag": tag, "title": title, "artist": artist, "cover_url": "", "spotify_url": ""},
+    }
+
+
+def generate(n: int, end: date, days: int = 3 * 365, seed: int = 0):
+    # end까지 days일에 n개를 고르게 펼친다 (n > days면 하루에 여러 개). 날짜 순으로 흘려 보낸다.
+    rng = random.Random(seed)
+    start = end - timedelta(days=days - 1)
+    for i in range(n):
+        yield make_entry(rng, i, start + timedelta(days=i * days // n))
+
+
+def populate(data_dir: str, backend: str, n: int, end: date, days: int = 3 * 365, seed: int = 0):
+    # 대량 가져오기와 같은 경로: 커밋 한 번 + 집계 한 번
+    store = open_store(data_dir, backend)
+    aggregates.bulk_upsert_and_rebuild(store, generate(n, end, days, seed), fsync=False)
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 기록 생성기")
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--backend", choices=BACKENDS, default="sqlite")
+    parser.add_argument("--days", type=int, default=3 * 365, help="기록을 펼칠 기간(일)")
+    parser.add_argument("--end", default=date.today().isoformat(), help="마지막 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    t = time.perf_counter()
+    populate(args.data_dir, args.backend, args.entries, date.fromisoformat(args.end), args.days, args.seed)
+    print(f"{args.entries:,}개 기록을 {args.data_dir}에 만들었어요 ({time.perf_counter() - t:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
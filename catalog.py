@@ -0,0 +1,237 @@
+# catalog.py — 노래 카탈로그 (열 단위 파일 + mmap)
+# 수십만 곡을 프로세스마다 통째로 올리지 않도록, 파일을 mmap으로 열고 고른 행만 그때그때 디코딩한다.
+# 만들기: python catalog.py build songs.csv -o data/songs.dwcat
+#
+# 파일 구조 (리틀엔디언)
+#   헤더    MAGIC(8) | 행 수 u32 | 열 수 u32 | 색인 길이 u32 | 예약 u32
+#   색인    JSON {"columns": [...], "tags": {태그: [시작 행, 끝 행)}}  ← 행은 태그별로 모여 있다 (8바이트 정렬)
+#   곡 키   행마다 u64: stable_hash(title, artist) — 디코딩 없이 배열로 바로 읽는다
+#   오프셋  열마다 (행 수 + 1)개의 u64: 그 열 문자열 힙 안에서 각 행의 시작 위치
+#   힙      열마다 UTF-8 문자열을 이어 붙인 것
+
+import os
+import csv
+import mmap
+import json
+import struct
+import argparse
+import threading
+from collections import OrderedDict
+
+from storage import atomic_write_bytes, lru_put
+from selection import stable_hash, stable_index
+
+
+CATALOG_FILENAME = "songs.dwcat"
+MAGIC = b"DWCAT\x00\x00\x02"
+HEADER = struct.Struct("<8sIIII")
+OFFSET = struct.Struct("<Q")
+COLUMNS = ("title", "artist", "cover_url")
+FALLBACK_TAG = "chill"
+
+
+def track_key(title: str, artist: str) -> int:
+    return stable_hash(title, artist)
+
+
+# =========================
+# 만들기
+# =========================
+def build_bytes(tracks: list[dict]) -> bytes:
+    # 태그 순서대로 행을 모아야 태그 → 행 범위 색인이 된다 (태그 안에서는 입력 순서 유지)
+    by_tag = OrderedDict()
+    for t in tracks:
+        by_tag.setdefault(t["tag"], []).append(t)
+
+    rows, tags = [], {}
+    for tag, group in sorted(by_tag.items()):
+        tags[tag] = [len(rows), len(rows) + len(group)]
+        rows.extend(group)
+
+    index = json.dumps({"columns": list(COLUMNS), "tags": tags}, ensure_ascii=False).encode("utf-8")
+    index += b" " * (-(HEADER.size + len(index)) % OFFSET.size)
+    keys = b"".join(OFFSET.pack(track_key(r["title"], r.get("artist") or "")) for r in rows)
+    offsets, heaps = [], []
+    for col in COLUMNS:
+        heap = bytearray()
+        offs = [0]
+        for r in rows:
+            heap += (r.get(col) or "").encode("utf-8")
+            offs.append(len(heap))
+        offsets.append(b"".join(OFFSET.pack(o) for o in offs))
+        heaps.append(bytes(heap))
+
+    header = HEADER.pack(MAGIC, len(rows), len(COLUMNS), len(index), 0)
+    return b"".join([header, index, keys, *offsets, *heaps])
+
+
+def build(tracks: list[dict], path: str) -> int:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    atomic_write_bytes(path, build_bytes(tracks))
+    return len(tracks)
+
+
+def _normalize(row: dict, tag: str | None = None) -> dict | None:
+    t = {k: (row.get(k) or "").strip() for k in COLUMNS}
+    t["tag"] = (tag or row.get("tag") or "").strip()
+    if not t["title"] or not t["tag"]:
+        return None
+    return t
+
+
+def tracks_from_dict(data: dict) -> list[dict]:
+    # {태그: [곡, ...]} 모양 (app.SONGS와 같은 모양)
+    return [r for r in (_normalize(r, tag) for tag, group in data.items() for r in group) if r]
+
+
+def load_tracks(path: str) -> list[dict]:
+    # CSV: title,artist,cover_url,tag 헤더
+    # JSON: [{"title", "artist", "cover_url", "tag"}, ...] 또는 app.SONGS 모양의 {태그: [곡, ...]}
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = [_normalize(r) for r in csv.DictReader(f)]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return tracks_from_dict(data)
+        rows = [_normalize(r) for r in data]
+    return [r for r in rows if r]
+
+
+# =========================
+# 읽기
+# =========================
+class Catalog:
+    def __init__(self, path: str, data: bytes | None = None):
+        self.path = path
+        if data is not None:
+            # 메모리 카탈로그 (파일이 없을 때 기본 곡 목록용)
+            self.stamp = None
+            self._mm = data
+        else:
+            with open(path, "rb") as f:
+                st_ = os.fstat(f.fileno())
+                self.stamp = (st_.st_ino, st_.st_size, st_.st_mtime_ns)
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.n_rows, n_cols, index_len, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"노래 카탈로그 파일이 아니거나 예전 형식이에요 (다시 만들어 주세요): {path}")
+        pos = HEADER.size
+        index = json.loads(self._mm[pos:pos + index_len].decode("utf-8"))
+        pos += index_len
+        self.keys_offset = pos
+        pos += OFFSET.size * self.n_rows
+
+        self.columns = tuple(index["columns"])
+        self.tags = {tag: tuple(r) for tag, r in index["tags"].items()}
+        # 열마다 오프셋 표 위치와 힙 위치만 기억해 둔다 (문자열은 읽을 때 디코딩)
+        self._offsets = []
+        for _ in range(n_cols):
+            self._offsets.append(pos)
+            pos += OFFSET.size * (self.n_rows + 1)
+        self._heaps = []
+        for i in range(n_cols):
+            self._heaps.append(pos)
+            pos += OFFSET.unpack_from(self._mm, self._offsets[i] + OFFSET.size * self.n_rows)[0]
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def _cell(self, col: int, row: int) -> str:
+        off = self._offsets[col] + OFFSET.size * row
+        a = OFFSET.unpack_from(self._mm, off)[0]
+        b = OFFSET.unpack_from(self._mm, off + OFFSET.size)[0]
+        heap = self._heaps[col]
+        return self._mm[heap + a:heap + b].decode("utf-8")
+
+    @property
+    def buffer(self):
+        return self._mm
+
+    def row(self, i: int) -> dict:
+        if not 0 <= i < self.n_rows:
+            raise IndexError(i)
+        return {c: self._cell(k, i) for k, c in enumerate(self.columns)}
+
+    def rows_for(self, tag: str) -> range:
+        start, end = self.tags.get(tag, (0, 0))
+        return range(start, end)
+
+    def pick(self, tag: str, *key) -> dict | None:
+        # 태그 행 범위 안에서 키 해시로 한 행: 카탈로그 크기와 상관없이 O(1)
+        rows = self.rows_for(tag) or self.rows_for(FALLBACK_TAG)
+        if not rows:
+            return None
+        return self.row(rows[stable_index(len(rows), *key)])
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+
+def from_tracks(tracks: list[dict]) -> Catalog:
+    return Catalog("<memory>", build_bytes(tracks))
+
+
+# =========================
+# 프로세스 전체 공유 핸들
+# =========================
+# 경로 → Catalog. 파일이 다시 만들어지면(inode/크기/mtime이 바뀌면) 새로 연다.
+_CATALOGS = OrderedDict()
+_CATALOGS_LOCK = threading.Lock()
+
+
+def open_catalog(path: str) -> Catalog | None:
+    try:
+        st_ = os.stat(path)
+    except FileNotFoundError:
+        return None
+    stamp = (st_.st_ino, st_.st_size, st_.st_mtime_ns)
+    key = os.path.abspath(path)
+
+    with _CATALOGS_LOCK:
+        cat = _CATALOGS.get(key)
+        if cat is not None and cat.stamp == stamp:
+            return cat
+        # 예전 mmap은 닫지 않는다: 다른 세션이 아직 읽고 있을 수 있고, 참조가 없어지면 GC가 닫는다
+        cat = Catalog(path)
+        lru_put(_CATALOGS, key, cat)
+        return cat
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="catalog.py", description="Daily Weaver 노래 카탈로그 도구")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_build = sub.add_parser("build", help="CSV/JSON 곡 목록을 카탈로그 파일로 만듭니다")
+    p_build.add_argument("inputs", nargs="+", help="title,artist,cover_url,tag 열이 있는 CSV 또는 JSON")
+    p_build.add_argument("-o", "--output", default=os.path.join("data", CATALOG_FILENAME))
+
+    p_info = sub.add_parser("info", help="카탈로그의 태그별 곡 수를 보여 줍니다")
+    p_info.add_argument("path", nargs="?", default=os.path.join("data", CATALOG_FILENAME))
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        tracks = []
+        for p in args.inputs:
+            tracks.extend(load_tracks(p))
+        n = build(tracks, args.output)
+        print(f"{n}곡을 {args.output}에 담았어요.")
+
+    if args.cmd == "info":
+        cat = open_catalog(args.path)
+        if cat is None:
+            parser.error(f"파일이 없어요: {args.path}")
+        print(f"{args.path}: {len(cat)}곡")
+        for tag, (start, end) in cat.tags.items():
+            print(f"  {tag}: {end - start}곡 (행 {start}–{end - 1})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# core.py — Daily Weaver 핵심 로직 (Streamlit 없이)
+# app.py와 배치 작업이 함께 쓰는 부분: 고정 데이터, 기간 필터, 마무리 메시지, 노래 고르기, 성장 요약.
+# 날짜는 session_state 대신 today("YYYY-MM-DD")로 받는다. numpy를 쓰는 추천 모듈은 노래를 고를 때만 불러온다.
+# 실행: python core.py summary --days 30 --today 2026-01-31
+
+import os
+import json
+import argparse
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from urllib.parse import quote
+
+import aggregates
+from storage import open_store, merge_entries, atomic_write_json, BACKENDS, DEFAULT_BACKEND, PROFILE_FILENAME
+from questions import question_for
+from selection import stable_choice
+from tagger import rank_tags
+
+
+# =========================
+# 고정 데이터
+# =========================
+STYLE_MODES = ["친한친구", "반려동물", "차분한 비서", "인생의 멘토", "감성 에디터"]
+STYLE_EMOJI = {
+    "친한친구": "💬",
+    "반려동물": "🐾",
+    "차분한 비서": "🗂️",
+    "인생의 멘토": "🧭",
+    "감성 에디터": "📝",
+}
+EMOJI_OPTIONS = [
+    ("😀", "기쁨"), ("🙂", "평온"), ("😐", "무덤덤"), ("😔", "우울"), ("😢", "슬픔"),
+    ("😭", "벅참"), ("😡", "분노"), ("😤", "답답"), ("😴", "피곤"), ("😬", "불안"),
+    ("☀️", "맑음"), ("🌙", "감성"), ("🌧️", "침잠"), ("🌿", "안정"), ("🔥", "열정"),
+    ("⚡", "긴장"), ("🧊", "냉정"), ("🌊", "출렁임"), ("🫧", "가벼움"), ("🌸", "따뜻함"),
+]
+
+ACTIVITIES = ["공부", "업무", "운동", "휴식", "약속", "창작", "정리", "이동", "소비", "회복"]
+
+SONGS = {
+    "comfort": [
+        {"title": "Love Poem", "artist": "아이유",
+         "cover_url": "https://images.unsplash.com/photo-1511379938547-c1f69419868d?auto=format&fit=crop&w=900&q=60"},
+        {"title": "Breathe", "artist": "이하이",
+         "cover_url": "https://images.unsplash.com/photo-1511671782779-c97d3d27a1d4?auto=format&fit=crop&w=900&q=60"},
+    ],
+    "chill": [
+        {"title": "Sunday Morning", "artist": "Maroon 5",
+         "cover_url": "https://images.unsplash.com/photo-1506157786151-b8491531f063?auto=format&fit=crop&w=900&q=60"},
+        {"title": "Some", "artist": "소유 & 정기고",
+         "cover_url": "https://images.unsplash.com/photo-1521337581100-8ca9a73a5f79?auto=format&fit=crop&w=900&q=60"},
+    ],
+    "energetic": [
+        {"title": "Dynamite", "artist": "BTS",
+         "cover_url": "https://images.unsplash.com/photo-1524678606370-a47ad25cb82a?auto=format&fit=crop&w=900&q=60"},
+        {"title": "New Rules", "artist": "Dua Lipa",
+         "cover_url": "https://images.unsplash.com/photo-1520975661595-6453be3f7070?auto=format&fit=crop&w=900&q=60"},
+    ],
+    "focus": [
+        {"title": "Experience", "artist": "Ludovico Einaudi",
+         "cover_url": "https://images.unsplash.com/photo-1507838153414-b4b713384a76?auto=format&fit=crop&w=900&q=60"},
+        {"title": "Time", "artist": "Hans Zimmer",
+         "cover_url": "https://images.unsplash.com/photo-1470225620780-dba8ba36b745?auto=format&fit=crop&w=900&q=60"},
+    ],
+    "reset": [
+        {"title": "Good Days", "artist": "SZA",
+         "cover_url": "https://images.unsplash.com/photo-1499415479124-43c32433a620?auto=format&fit=crop&w=900&q=60"},
+        {"title": "On The Ground", "artist": "ROSÉ",
+         "cover_url": "https://images.unsplash.com/photo-1521337706264-a414f153a5f5?auto=format&fit=crop&w=900&q=60"},
+    ],
+    "sentimental": [
+        {"title": "밤편지", "artist": "아이유",
+         "cover_url": "https://images.unsplash.com/photo-1521337706264-a414f153a5f5?auto=format&fit=crop&w=900&q=60"},
+        {"title": "Someone Like You", "artist": "Adele",
+         "cover_url": "https://images.unsplash.com/photo-1514119412350-e174d90d280e?auto=format&fit=crop&w=900&q=60"},
+    ],
+}
+
+
+# =========================
+# 유틸
+# =========================
+def spotify_search_url(title: str, artist: str) -> str:
+    q = quote(f"{title} {artist}".strip())
+    return f"https://open.spotify.com/search/{q}"
+
+def shorten(text: str, n=40) -> str:
+    t = (text or "").strip().replace("\n", " ")
+    return t if len(t) <= n else t[:n] + "…"
+
+def window(today: str, days: int) -> tuple[str, str]:
+    # today를 포함한 최근 days일 (시작, 끝)
+    end = date.fromisoformat(today)
+    return (end - timedelta(days=days - 1)).isoformat(), end.isoformat()
+
+def parse_entry_date(e: dict):
+    d = e.get("date")
+    if not d:
+        return None
+    try:
+        return datetime.fromisoformat(d).date()
+    except Exception:
+        return None
+
+def filter_entries_last_days(entries: list[dict], days: int, today: str) -> list[dict]:
+    today_ = datetime.fromisoformat(today).date()
+    start = today_ - timedelta(days=days - 1)
+    out = []
+    for e in entries:
+        ed = parse_entry_date(e)
+        if ed and start <= ed <= today_:
+            out.append(e)
+    return out
+
+
+# =========================
+# 프로필
+# =========================
+def load_profile(data_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(data_dir, PROFILE_FILENAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_profile(data_dir: str, p: dict):
+    os.makedirs(data_dir, exist_ok=True)
+    atomic_write_json(os.path.join(data_dir, PROFILE_FILENAME), p)
+
+
+# =========================
+# 기간 읽기 / 성장 요약
+# =========================
+def read_last_days(store, days: int, today: str, pending: list[dict] = ()) -> list[dict]:
+    # 날짜 인덱스로 해당 구간만 읽는다. pending: 아직 저장 안 된(write-behind) 기록
+    start, end = window(today, days)
+    entries = store.read_range(start, end)
+    if not pending:
+        return entries
+    return merge_entries(entries, [e for e in pending if start <= (e.get("date") or "")[:10] <= end])
+
+def growth_summary(store, days: int, today: str, pending: list[dict] = ()) -> dict:
+    summary = aggregates.summarize_window(store, today, days)
+    if pending:
+        summary = aggregates.add_pending(summary, pending, today, days)
+    return summary
+
+
+# =========================
+# 마무리 메시지
+# =========================
+def closing_message(style_mode: str, name: str, one_word: str, best: str, growth: str, today: str) -> str:
+    best_s = shorten(best, 36)
+    growth_s = shorten(growth, 36)
+
+    cheers = [
+        "오늘도 정말 수고했어요.",
+        "오늘 하루를 기록한 것만으로도 충분히 잘한 일이에요.",
+        "내일은 조금 더 편안한 하루가 되길 바라요.",
+        "오늘의 당신에게 박수를 보내요.",
+        "오늘도 잘 버텼어요.",
+    ]
+    cheer = stable_choice(cheers, today, one_word or "", best_s)
+
+    if style_mode == "친한친구":
+        return f"오늘은 **{one_word}**라는 단어가 딱 어울리는 하루였어. 특히 {best_s} 그 장면이 오래 남을 것 같아. {cheer}"
+    if style_mode == "반려동물":
+        return f"{name}님, 오늘 기록 남겨줘서 고마워요 🐾 오늘은 **{one_word}** 같은 하루였네요. {growth_s} 이 마음을 남긴 게 멋져요. {cheer}"
+    if style_mode == "차분한 비서":
+        return f"{name}님, 오늘의 기록을 정리했습니다. 핵심 단어는 **{one_word}**이며, 기억에 남는 순간은 {best_s}입니다. 성장 포인트는 {growth_s}로 요약됩니다. {cheer}"
+    if style_mode == "인생의 멘토":
+        return f"오늘을 **{one_word}**로 정리한 감각이 정확해요. {growth_s}을 발견한 것은 앞으로의 방향을 바꿀 수 있어요. {cheer}"
+    return f"오늘은 **{one_word}**라는 단어가 하루를 조용히 감싸고 있었어요. {best_s} 그 장면이 한 장의 사진처럼 남아 있네요. {cheer}"
+
+
+# =========================
+# 노래
+# =========================
+@lru_cache(maxsize=1)
+def inline_catalog():
+    from catalog import from_tracks, tracks_from_dict
+    return from_tracks(tracks_from_dict(SONGS))
+
+def song_catalog(path: str | None = None):
+    from catalog import open_catalog
+    return (open_catalog(path) if path else None) or inline_catalog()
+
+def recent_song_keys(entries: list[dict]) -> set[int]:
+    from catalog import track_key
+    keys = set()
+    for e in entries:
+        s = e.get("song") or {}
+        if s.get("title"):
+            keys.add(track_key(s["title"], s.get("artist", "")))
+    return keys
+
+def pick_song(cat, mood: str, activities: list[str], one_word: str,
+              trend: dict, recent: set[int], user: str, today: str) -> dict:
+    # 오늘 답변의 태그 구성 + 최근 기분 흐름(trend) + 최근에 나온 곡(recent) 빼기
+    import recommend
+    ranked = rank_tags(mood, activities, one_word)
+    song = recommend.recommend(cat, ranked, trend, recent, user, today)
+    if song is not None:
+        return song
+    tag = ranked[0][0] if ranked else "chill"
+    return stable_choice(SONGS.get(tag, SONGS["chill"]), today, tag)
+
+def pick_song_for(store, mood: str, activities: list[str], one_word: str, user: str, today: str,
+                  catalog_path: str | None = None) -> dict:
+    # 저장소에서 흐름과 최근 곡을 직접 읽는 버전 (배치 작업 / CLI)
+    import recommend
+    trend = growth_summary(store, recommend.TREND_DAYS, today)["moods"]
+    recent = recent_song_keys(read_last_days(store, recommend.NO_REPEAT_DAYS, today))
+    return pick_song(song_catalog(catalog_path), mood, activities, one_word, trend, recent, user, today)
+
+
+# =========================
+# CLI
+# =========================
+def _top(counter, n: int = 5) -> str:
+    return ", ".join(f"{k} {v}" for k, v in counter.most_common(n) if k) or "-"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="core.py", description="Daily Weaver 핵심 로직 (UI 없이)")
+    parser.add_argument("--data-dir", default="data", help="기록이 있는 폴더 (사용자 파티션이면 그 폴더)")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument("--today", default=date.today().isoformat(), help="기준 날짜 (YYYY-MM-DD)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_sum = sub.add_parser("summary", help="최근 며칠의 성장 요약")
+    p_sum.add_argument("--days", type=int, default=7)
+
+    sub.add_parser("question", help="오늘의 스페셜 질문")
+
+    p_close = sub.add_parser("closing", help="템플릿 마무리 메시지")
+    p_close.add_argument("--style", default="감성 에디터", choices=STYLE_MODES)
+    p_close.add_argument("--name", default="사용자")
+    p_close.add_argument("--one-word", default="기록")
+    p_close.add_argument("--best", default="")
+    p_close.add_argument("--growth", default="")
+
+    p_song = sub.add_parser("song", help="오늘의 노래")
+    p_song.add_argument("--mood", default="")
+    p_song.add_argument("--activities", default="", help="쉼표로 구분")
+    p_song.add_argument("--one-word", default="")
+    p_song.add_argument("--user", help="추천 시드 (기본: --data-dir, 앱에서 같은 파티션이 받는 곡과 같다)")
+    p_song.add_argument("--catalog", help="노래 카탈로그 파일 (없으면 기본 목록)")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "summary":
+        s = growth_summary(open_store(args.data_dir, args.backend), args.days, args.today)
+        print(f"{args.today}까지 {args.days}일: 기록 {s['n']}개")
+        print(f"  기분: {_top(s['moods'])}")
+        print(f"  활동: {_top(s['activities'])}")
+        print(f"  단어: {_top(s['words'])}")
+
+    if args.cmd == "question":
+        print(question_for(args.data_dir, args.today))
+
+    if args.cmd == "closing":
+        print(closing_message(args.style, args.name, args.one_word, args.best, args.growth, args.today))
+
+    if args.cmd == "song":
+        acts = [a.strip() for a in args.activities.split(",") if a.strip()]
+        song = pick_song_for(open_store(args.data_dir, args.backend), args.mood, acts, args.one_word,
+                             args.user or args.data_dir, args.today, args.catalog)
+        print(f"{song['title']} — {song['artist']}  {spotify_search_url(song['title'], song['artist'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# export.py — 기록 내보내기 (CSV / Markdown / Parquet)
+# 저장소에서 한 건씩 흘려 읽어 바로 파일에 쓴다: 기록이 몇 년 치여도 메모리는 일정하다.
+# 실행: python export.py --format md --start 2026-01-01 -o diary.md
+
+import os
+import csv
+import argparse
+
+from storage import open_store, entry_date, BACKENDS, DEFAULT_BACKEND
+
+
+FORMATS = ("csv", "md", "parquet")
+EXTENSIONS = {"csv": ".csv", "md": ".md", "parquet": ".parquet"}
+MIME_TYPES = {"csv": "text/csv", "md": "text/markdown", "parquet": "application/vnd.apache.parquet"}
+PARQUET_BATCH = 2000
+
+COLUMNS = [
+    "date", "created_at", "id", "style_mode",
+    "mood", "activities", "one_word", "best_moment", "growth", "special_q", "special_answer",
+    "closing_message", "song_tag", "song_title", "song_artist", "spotify_url",
+]
+
+
+# =========================
+# 파이프라인
+# =========================
+def flatten(entry: dict) -> dict:
+    a = entry.get("answers") or {}
+    s = entry.get("song") or {}
+    return {
+        "date": entry_date(entry),
+        "created_at": entry.get("created_at") or "",
+        "id": entry.get("id") or "",
+        "style_mode": entry.get("style_mode") or "",
+        "mood": a.get("mood") or "",
+        "activities": ", ".join(a.get("activities") or []),
+        "one_word": a.get("one_word") or "",
+        "best_moment": a.get("best_moment") or "",
+        "growth": a.get("growth") or "",
+        "special_q": a.get("special_q") or "",
+        "special_answer": a.get("special_answer") or "",
+        "closing_message": entry.get("closing_message") or "",
+        "song_tag": s.get("tag") or "",
+        "song_title": s.get("title") or "",
+        "song_artist": s.get("artist") or "",
+        "spotify_url": s.get("spotify_url") or "",
+    }
+
+def rows(store, start: str | None = None, end: str | None = None):
+    # 날짜 범위는 저장소 읽기로 내려 보낸다 (SQLite는 date 인덱스)
+    for e in store.iter_range(start, end):
+        yield flatten(e)
+
+
+# =========================
+# 형식별 쓰기
+# =========================
+def write_csv(rows_, f) -> int:
+    w = csv.DictWriter(f, fieldnames=COLUMNS)
+    w.writeheader()
+    n = 0
+    for r in rows_:
+        w.writerow(r)
+        n += 1
+    return n
+
+def markdown_entry(r: dict) -> str:
+    lines = ["\n"]
+    if r["one_word"]:
+        lines.append(f"### {r['one_word']}\n\n")
+    for label, key in (("기분", "mood"), ("활동", "activities"), ("가장 좋았던 순간", "best_moment"), ("성장", "growth")):
+        if r[key]:
+            lines.append(f"- **{label}**: {r[key]}\n")
+    if r["special_q"]:
+        lines.append(f"- **{r['special_q']}** {r['special_answer']}\n")
+    if r["song_title"]:
+        lines.append(f"- **오늘의 노래**: {r['song_title']} — {r['song_artist']}\n")
+    if r["closing_message"]:
+        lines.append(f"\n> {r['closing_message']}\n")
+    return "".join(lines)
+
+def write_markdown(rows_, f) -> int:
+    # 날짜마다 섹션 하나 (같은 날 기록이 여러 개면 같은 섹션 아래)
+    f.write("# Daily Weaver 기록\n")
+    day, n = None, 0
+    for r in rows_:
+        if n == 0 or r["date"] != day:
+            day = r["date"]
+            f.write(f"\n## {day or '날짜 없음'}\n")
+        f.write(markdown_entry(r))
+        n += 1
+    return n
+
+def write_parquet(rows_, path: str) -> int:
+    # pyarrow는 이 형식을 고를 때만 필요하다. PARQUET_BATCH 행씩 row group으로 쓴다.
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요해요: pip install pyarrow")
+
+    schema = pa.schema([(c, pa.string()) for c in COLUMNS])
+    n = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as w:
+        batch = []
+        for r in rows_:
+            batch.append(r)
+            if len(batch) >= PARQUET_BATCH:
+                w.write_table(pa.Table.from_pylist(batch, schema=schema))
+                n += len(batch)
+                batch = []
+        if batch or not n:
+            w.write_table(pa.Table.from_pylist(batch, schema=schema))
+            n += len(batch)
+    return n
+
+
+def export(store, fmt: str, path: str, start: str | None = None, end: str | None = None) -> int:
+    if fmt not in FORMATS:
+        raise ValueError(f"알 수 없는 형식: {fmt} (가능: {', '.join(FORMATS)})")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        if fmt == "parquet":
+            n = write_parquet(rows(store, start, end), tmp)
+        else:
+            with open(tmp, "w", encoding="utf-8-sig" if fmt == "csv" else "utf-8", newline="") as f:
+                write = write_csv if fmt == "csv" else write_markdown
+                n = write(rows(store, start, end), f)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return n
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="export.py", description="Daily Weaver 기록 내보내기")
+    parser.add_argument("--data-dir", default="data", help="기록이 있는 폴더 (사용자 파티션이면 그 폴더)")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--start", help="이 날짜부터 (YYYY-MM-DD)")
+    parser.add_argument("--end", help="이 날짜까지 (YYYY-MM-DD)")
+    parser.add_argument("-o", "--output", help="출력 파일 (기본: daily_weaver.<형식>)")
+    args = parser.parse_args(argv)
+
+    out = args.output or f"daily_weaver{EXTENSIONS[args.format]}"
+    n = export(open_store(args.data_dir, args.backend), args.format, out, args.start, args.end)
+    print(f"{n}개 기록을 {out}로 내보냈어요.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# highlights.py — 자소서·포트폴리오 소재 후보 (상황/행동/결과)
+# 기간의 best_moment/growth 답변에서 소재 후보를 뽑는다. 계산은 뒤쪽 작업자 풀에서 돌고,
+# 결과는 기여한 기록들의 내용 해시로 캐시해서 입력이 바뀔 때만 다시 만든다. 사이드바는 기다리지 않는다.
+# DW_HIGHLIGHT_MODE: extractive(기본, 오프라인 규칙) / llm (OPENAI_API_KEY가 있을 때, 실패하면 extractive)
+
+import os
+import re
+import json
+import hashlib
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import llm
+from storage import atomic_write_json, entry_date, lru_put
+
+
+MODE = os.environ.get("DW_HIGHLIGHT_MODE", "extractive")
+WORKERS = int(os.environ.get("DW_HIGHLIGHT_WORKERS", "2"))
+CACHE_DIRNAME = "highlights"
+HIGHLIGHT_VERSION = 1  # 뽑는 규칙을 바꾸면 올려서 예전 캐시를 버린다
+N_ITEMS = 2
+MAX_FILES = 24  # 사용자마다 남겨 둘 캐시 파일 수
+
+READY, PENDING, FAILED = "ready", "pending", "failed"
+
+# 행동/결과 문장을 고를 때 쓰는 단서
+ACTION_CUES = ("했", "해냈", "시작", "만들", "정리", "준비", "도전", "맡", "발표", "해결", "완성", "도왔", "이끌")
+RESULT_CUES = ("배웠", "깨달", "알게", "느꼈", "성장", "개선", "달라", "늘었", "줄었", "덕분", "결과", "성공", "변화")
+_SENTENCE = re.compile(r"(?<=[.!?。])\s+|\n+|(?<=다)\s+")
+_NUMBER = re.compile(r"\d")
+
+
+# =========================
+# 입력 / 캐시 키
+# =========================
+def contributing(entries: list[dict]) -> list[dict]:
+    # 소재가 될 만한 답변이 있는 기록만, 날짜 순
+    out = []
+    for e in entries:
+        a = e.get("answers") or {}
+        if (a.get("best_moment") or "").strip() or (a.get("growth") or "").strip():
+            out.append(e)
+    return sorted(out, key=lambda e: (entry_date(e), e.get("created_at") or ""))
+
+def content_key(entries: list[dict], mode: str = MODE) -> str:
+    parts = []
+    for e in entries:
+        a = e.get("answers") or {}
+        parts.append([e.get("id") or "", entry_date(e), a.get("best_moment") or "", a.get("growth") or "",
+                      a.get("activities") or [], a.get("one_word") or ""])
+    raw = json.dumps([HIGHLIGHT_VERSION, mode, parts], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# =========================
+# 규칙 기반 추출 (오프라인)
+# =========================
+def _sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE.split(text or "") if s and s.strip()]
+
+def _cue_score(s: str, cues: tuple) -> int:
+    return sum(s.count(c) for c in cues) * 2 + len(_NUMBER.findall(s)) + min(len(s), 80) // 20
+
+def _best_sentence(text: str, cues: tuple) -> str:
+    sents = _sentences(text)
+    if not sents:
+        return ""
+    return max(sents, key=lambda s: _cue_score(s, cues))
+
+def _shorten(text: str, n: int = 60) -> str:
+    t = (text or "").strip().replace("\n", " ")
+    return t if len(t) <= n else t[:n] + "…"
+
+def extract(entries: list[dict], n: int = N_ITEMS) -> list[dict]:
+    scored = []
+    for e in entries:
+        a = e.get("answers") or {}
+        action = _best_sentence(a.get("best_moment"), ACTION_CUES)
+        result = _best_sentence(a.get("growth"), RESULT_CUES)
+        score = _cue_score(action, ACTION_CUES) + _cue_score(result, RESULT_CUES) + (3 if action and result else 0)
+        acts = ", ".join(a.get("activities") or [])
+        word = a.get("one_word") or ""
+        situation = " · ".join(x for x in (entry_date(e), acts, f"‘{word}’인 하루" if word else "") if x)
+        scored.append((score, entry_date(e), {
+            "situation": situation,
+            "action": _shorten(action),
+            "result": _shorten(result),
+        }, tuple(a.get("activities") or ())))
+
+    # 점수 순으로 고르되, 같은 활동 조합은 한 번만 (소재가 서로 다르게)
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    out, seen = [], set()
+    for _, _, item, acts in scored:
+        if acts in seen and len(scored) > n:
+            continue
+        seen.add(acts)
+        out.append(item)
+        if len(out) == n:
+            break
+    return out
+
+
+# =========================
+# LLM 요약 (선택)
+# =========================
+def summarize_llm(entries: list[dict], n: int = N_ITEMS) -> list[dict]:
+    rows = []
+    for e in entries:
+        a = e.get("answers") or {}
+        rows.append({"date": entry_date(e), "activities": a.get("activities") or [],
+                     "best_moment": a.get("best_moment") or "", "growth": a.get("growth") or ""})
+    messages = [
+        {"role": "system", "content": (
+            f"하루 기록들에서 자기소개서·포트폴리오에 쓸 소재 {n}개를 골라 "
+            '{"items": [{"situation": "...", "action": "...", "result": "..."}]} JSON으로만 답해. '
+            "각 항목은 한국어 한 문장, 기록에 없는 사실은 지어내지 마."
+        )},
+        {"role": "user", "content": json.dumps(rows, ensure_ascii=False)},
+    ]
+    items = json.loads(llm.complete(messages))["items"][:n]
+    return [{k: _shorten(str(it.get(k) or ""), 80) for k in ("situation", "action", "result")} for it in items]
+
+
+def summarize(entries: list[dict], mode: str = MODE) -> list[dict]:
+    if mode == "llm" and llm.enabled():
+        try:
+            return summarize_llm(entries)
+        except Exception:
+            traceback.print_exc()
+    return extract(entries)
+
+
+# =========================
+# 작업자 풀 + 캐시
+# =========================
+# 내용 해시 → 결과. 디스크(사용자 파티션/highlights/)에도 남겨서 재시작 뒤에도 다시 만들지 않는다.
+_RESULTS = OrderedDict()
+_INFLIGHT = {}
+_LOCK = threading.Lock()
+_POOL = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="dw-highlights")
+        return _POOL
+
+def _cache_path(data_dir: str, key: str) -> str:
+    return os.path.join(data_dir, CACHE_DIRNAME, f"{key}.json")
+
+def _load(data_dir: str, key: str):
+    try:
+        with open(_cache_path(data_dir, key), "r", encoding="utf-8") as f:
+            return json.load(f)["items"]
+    except Exception:
+        return None
+
+def _prune_files(data_dir: str):
+    # 입력이 바뀔 때마다 파일이 하나씩 생기므로 최근 것만 남긴다
+    d = os.path.join(data_dir, CACHE_DIRNAME)
+    files = []
+    for n in os.listdir(d):
+        if n.endswith(".json"):
+            try:
+                files.append((os.path.getmtime(os.path.join(d, n)), n))
+            except FileNotFoundError:
+                pass
+    for _, n in sorted(files)[:-MAX_FILES]:
+        for p in (os.path.join(d, n), os.path.join(d, n + ".lock")):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+def _job(data_dir: str, key: str, entries: list[dict], mode: str):
+    try:
+        items = summarize(entries, mode)
+        atomic_write_json(_cache_path(data_dir, key), {"items": items, "mode": mode}, indent=None)
+        _prune_files(data_dir)
+        result = (READY, items)
+    except Exception:
+        traceback.print_exc()
+        result = (FAILED, None)
+    with _LOCK:
+        lru_put(_RESULTS, key, result)
+        _INFLIGHT.pop(key, None)
+
+
+def request(data_dir: str, entries: list[dict], mode: str = MODE) -> tuple[str, str, list[dict] | None]:
+    # (상태, 내용 해시, 소재 목록). 없으면 작업만 걸어 두고 바로 PENDING으로 돌아온다.
+    entries = contributing(entries)
+    key = content_key(entries, mode)
+    if not entries:
+        return READY, key, []
+
+    with _LOCK:
+        hit = _RESULTS.get(key)
+        if hit is not None:
+            return hit[0], key, hit[1]
+        if key in _INFLIGHT:
+            return PENDING, key, None
+
+    items = _load(data_dir, key)
+    with _LOCK:
+        if items is not None:
+            lru_put(_RESULTS, key, (READY, items))
+            return READY, key, items
+        if key in _INFLIGHT:
+            return PENDING, key, None
+        _INFLIGHT[key] = True
+    _pool().submit(_job, data_dir, key, entries, mode)
+    return PENDING, key, None
+
+def pending(key: str) -> bool:
+    with _LOCK:
+        return key in _INFLIGHT
@@ -0,0 +1,242 @@
+# importer.py — 예전 기록 한꺼번에 가져오기 (JSONL / JSON / CSV)
+# 한 건씩 읽어 기록 형식으로 맞추고(검사 + 정규화), 저장소에 커밋 한 번으로 흘려 넣는다.
+# 집계와 검색 색인은 건마다 고치지 않고 끝에 한 번만 다시 만든다. export.py의 CSV는 그대로 다시 가져올 수 있다.
+# 실행: python importer.py old_diary.csv --data-dir data
+
+import io
+import os
+import re
+import csv
+import json
+import time
+import hashlib
+import argparse
+from datetime import date
+from itertools import chain
+
+import search
+import aggregates
+from storage import open_store, BACKENDS, DEFAULT_BACKEND
+
+
+FORMATS = ("jsonl", "json", "csv")
+MAX_ERRORS = 50  # 보고서에 남길 오류 수 (건너뛴 개수는 모두 센다)
+
+ANSWER_FIELDS = ("mood", "activities", "one_word", "best_moment", "growth", "special_q", "special_answer")
+TEXT_FIELDS = ("one_word", "best_moment", "growth", "special_answer")
+
+# 다른 일기 앱에서 내보낸 열 이름 → 기록 필드
+ALIASES = {
+    "date": ("date", "day", "날짜"),
+    "created_at": ("created_at", "created", "timestamp", "datetime", "작성시각"),
+    "mood": ("mood", "emotion", "feeling", "기분"),
+    "activities": ("activities", "activity", "tags", "활동"),
+    "one_word": ("one_word", "title", "word", "한 단어"),
+    "best_moment": ("best_moment", "content", "text", "body", "entry", "내용"),
+    "growth": ("growth", "lesson", "성장"),
+}
+# 2024-03-05 / 2024/3/5 / 2024.03.05 / 20240305, 뒤에 시각이 붙어 있어도 된다 (strptime보다 훨씬 빠르다)
+_DATE = re.compile(r"(\d{4})[-/.]?(\d{1,2})[-/.]?(\d{1,2})(?:$|[T ])")
+
+
+# =========================
+# 읽기
+# =========================
+def detect_format(name: str) -> str:
+    ext = os.path.splitext(name or "")[1].lower().lstrip(".")
+    if ext in ("jsonl", "ndjson"):
+        return "jsonl"
+    if ext in FORMATS:
+        return ext
+    raise ValueError(f"형식을 알 수 없어요: {name} (가능: {', '.join(FORMATS)})")
+
+def _text_stream(src):
+    # 경로 또는 바이너리 파일 객체 (Streamlit 업로드)
+    if isinstance(src, str):
+        return open(src, "r", encoding="utf-8-sig", newline="")
+    return io.TextIOWrapper(src, encoding="utf-8-sig", newline="")
+
+def read_records(src, fmt: str, name: str):
+    # (위치, 원본 dict) 를 흘려 보낸다. 읽지 못한 줄은 dict 대신 예외를 보낸다 (그 줄만 건너뛰도록).
+    # 파일 자체를 읽지 못하면(UTF-8이 아님 / 깨진 JSON / CSV 오류) 그 파일은 거기서 멈추고 오류 하나로 보고한다
+    try:
+        with _text_stream(src) as f:
+            if fmt == "csv":
+                for n, row in enumerate(csv.DictReader(f), start=2):
+                    yield f"{name}:{n}", row
+            elif fmt == "jsonl":
+                for n, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield f"{name}:{n}", json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield f"{name}:{n}", ValueError(f"JSON이 아니에요 ({e.msg})")
+            else:
+                # JSON 배열 또는 {"entries": [...]} (한 파일 전체를 읽는 형식)
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"JSON이 아니에요 ({e.msg}, {e.lineno}번째 줄)") from None
+                if isinstance(data, dict):
+                    data = data.get("entries")
+                if not isinstance(data, list):
+                    raise ValueError("기록 배열을 찾지 못했어요")
+                for n, raw in enumerate(data):
+                    yield f"{name}[{n}]", raw
+    except UnicodeDecodeError:
+        yield name, ValueError("UTF-8 글자가 아니에요 (UTF-8로 저장해서 다시 올려 주세요)")
+    except csv.Error as e:
+        yield name, ValueError(f"CSV를 읽지 못했어요 ({e})")
+    except ValueError as e:
+        yield name, e
+
+def read_source(src, name: str):
+    # 확장자로 형식을 고른다. 모르는 형식이면 그 파일만 오류로 보고
+    try:
+        fmt = detect_format(name)
+    except ValueError as e:
+        yield name, e
+        return
+    yield from read_records(src, fmt, name)
+
+
+# =========================
+# 검사 / 정규화
+# =========================
+def _pick(flat: dict, field: str):
+    for k in ALIASES.get(field, (field,)):
+        v = flat.get(k)
+        if v not in (None, ""):
+            return v
+    return None
+
+def _text(v) -> str:
+    return "" if v is None else str(v).strip()
+
+def parse_date(value) -> str:
+    s = _text(value)
+    if not s:
+        raise ValueError("날짜가 없어요")
+    m = _DATE.match(s)
+    try:
+        return date(*map(int, m.groups())).isoformat()
+    except (AttributeError, ValueError):
+        raise ValueError(f"날짜 형식이 이상해요: {s}") from None
+
+def parse_activities(value) -> list[str]:
+    if isinstance(value, list):
+        items = value
+    else:
+        items = _text(value).replace("·", ",").split(",")
+    return [a for a in (_text(x) for x in items) if a]
+
+def normalize(raw) -> dict:
+    # 원본 한 건 → 저장소 기록. 쓸 수 없으면 ValueError
+    if not isinstance(raw, dict):
+        raise ValueError("기록이 객체가 아니에요")
+    nested = raw.get("answers") or {}
+    song = raw.get("song") or {}
+    if not isinstance(nested, dict):
+        raise ValueError("answers가 객체가 아니에요")
+    if not isinstance(song, dict):
+        raise ValueError("song이 객체가 아니에요")
+    flat = {**raw, **nested}
+
+    created = _text(_pick(flat, "created_at"))
+    d = parse_date(_pick(flat, "date") or created)
+    if not created:
+        created = f"{d}T00:00:00"
+
+    answers = {f: _text(_pick(flat, f)) for f in ANSWER_FIELDS if f != "activities"}
+    answers["activities"] = parse_activities(_pick(flat, "activities"))
+    answers = {f: answers[f] for f in ANSWER_FIELDS}
+    if not answers["mood"] and not any(answers[f] for f in TEXT_FIELDS):
+        raise ValueError("내용이 비어 있어요")
+
+    entry = {
+        "id": _text(raw.get("id")),
+        "date": d,
+        "created_at": created,
+        "style_mode": _text(raw.get("style_mode")),
+        "answers": answers,
+        "closing_message": _text(raw.get("closing_message")),
+    }
+    title = _text(song.get("title") or flat.get("song_title"))
+    if title:
+        entry["song"] = {
+            "tag": _text(song.get("tag") or flat.get("song_tag")),
+            "title": title,
+            "artist": _text(song.get("artist") or flat.get("song_artist")),
+            "cover_url": _text(song.get("cover_url")),
+            "spotify_url": _text(song.get("spotify_url") or flat.get("spotify_url")),
+        }
+    if not entry["id"]:
+        # 같은 파일을 두 번 가져와도 겹치지 않도록 내용으로 id를 정한다
+        parts = [d, created, *(answers[f] for f in ANSWER_FIELDS if f != "activities"), *answers["activities"]]
+        entry["id"] = "imp-" + hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:20]
+    return entry
+
+
+def _valid(records, report: dict):
+    for where, raw in records:
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            entry = normalize(raw)
+        except ValueError as e:
+            report["skipped"] += 1
+            if len(report["errors"]) < MAX_ERRORS:
+                report["errors"].append((where, str(e)))
+            continue
+        report["imported"] += 1
+        yield entry
+
+
+# =========================
+# 가져오기
+# =========================
+def import_entries(store, sources, dry_run: bool = False, fsync: bool = True) -> dict:
+    # sources: [(경로 또는 바이너리 파일 객체, 이름)]. 보고서: 가져온 수 / 건너뛴 수 / 오류 (위치, 이유) / 걸린 시간
+    t0 = time.perf_counter()
+    report = {"imported": 0, "skipped": 0, "errors": [], "seconds": 0.0}
+    records = chain.from_iterable(read_source(src, name) for src, name in sources)
+    entries = _valid(records, report)
+
+    first = next(entries, None)
+    if first is not None:
+        entries = chain([first], entries)
+        if dry_run:
+            for _ in entries:
+                pass
+        else:
+            aggregates.bulk_upsert_and_rebuild(store, entries, fsync=fsync)
+            # 검색 색인은 메모리에서 내려 두면 다음 검색 때 한 번 다시 만든다
+            search.invalidate(store)
+    report["seconds"] = time.perf_counter() - t0
+    return report
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="importer.py", description="Daily Weaver 예전 기록 가져오기")
+    parser.add_argument("files", nargs="+", help="JSONL / JSON / CSV 파일")
+    parser.add_argument("--data-dir", default="data", help="기록을 넣을 폴더 (사용자 파티션이면 그 폴더)")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument("--dry-run", action="store_true", help="검사만 하고 저장하지 않습니다")
+    parser.add_argument("--no-fsync", action="store_true", help="커밋을 디스크까지 내리지 않습니다 (더 빠름)")
+    args = parser.parse_args(argv)
+
+    store = open_store(args.data_dir, args.backend)
+    report = import_entries(store, [(p, os.path.basename(p)) for p in args.files],
+                            dry_run=args.dry_run, fsync=not args.no_fsync)
+    for where, msg in report["errors"]:
+        print(f"건너뜀 {where}: {msg}")
+    verb = "검사했어요" if args.dry_run else "가져왔어요"
+    print(f"{report['imported']}개 기록을 {verb}. 건너뜀 {report['skipped']}개 ({report['seconds']:.2f}초)")
+
+
+if __name__ == "__main__":
+    main()
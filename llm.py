@@ -0,0 +1,250 @@
+# llm.py — LLM 마무리 메시지 (선택 기능)
+# OPENAI_API_KEY가 있으면 페르소나 말투로 마무리 메시지를 받아 말풍선에 토큰 단위로 흘려 넣는다.
+# 같은 페르소나 + 답변이면 디스크 캐시에서 바로, 실패/시간 초과면 기존 템플릿 문장으로.
+# 로컬 스텁으로 시험: python llm.py stub --port 8787 후 OPENAI_BASE_URL=http://127.0.0.1:8787/v1
+
+import os
+import json
+import time
+import html
+import queue
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+
+from storage import atomic_write_json
+
+
+LLM_MODE = os.environ.get("DW_LLM", "auto")  # auto: API 키가 있으면 사용 / 0: 끔
+MODEL = os.environ.get("DW_LLM_MODEL", "gpt-4o-mini")
+TIMEOUT = float(os.environ.get("DW_LLM_TIMEOUT", "8"))  # 초, 요청부터 마지막 토큰까지 전체
+MAX_TOKENS = 220
+CACHE_DIRNAME = "llm_cache"
+PROMPT_VERSION = 1  # 프롬프트를 바꾸면 올려서 예전 캐시를 버린다
+
+PERSONAS = {
+    "친한친구": "오래된 친한 친구처럼 반말로, 다정하고 솔직하게",
+    "반려동물": "주인을 좋아하는 반려동물처럼 귀엽고 순하게, 존댓말로",
+    "차분한 비서": "차분한 비서처럼 정돈된 존댓말로, 요점을 짚어서",
+    "인생의 멘토": "인생 선배 멘토처럼 따뜻하지만 방향을 제시하는 존댓말로",
+    "감성 에디터": "감성 에세이 에디터처럼 서정적인 존댓말로",
+}
+
+
+def enabled() -> bool:
+    return LLM_MODE != "0" and bool(os.environ.get("OPENAI_API_KEY"))
+
+
+# =========================
+# 프롬프트 / 캐시 키
+# =========================
+def build_messages(style_mode: str, name: str, answers: dict) -> list[dict]:
+    persona = PERSONAS.get(style_mode, PERSONAS["감성 에디터"])
+    system = (
+        "너는 하루 기록 앱 Daily Weaver의 마무리 메시지 작가야. "
+        f"말투: {persona}. "
+        "사용자의 오늘 답변을 읽고 한국어 2~3문장으로 하루를 정리하고 응원해 줘. "
+        "오늘의 한 단어는 **굵게** 한 번만 넣고, 답변에 없는 사실은 지어내지 마."
+    )
+    user = json.dumps({"name": name, **answers}, ensure_ascii=False)
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+def cache_key(style_mode: str, name: str, answers: dict) -> str:
+    raw = json.dumps([PROMPT_VERSION, MODEL, style_mode, name, answers], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _cache_path(data_dir: str, key: str) -> str:
+    return os.path.join(data_dir, CACHE_DIRNAME, key[:2], f"{key}.json")
+
+def cached(data_dir: str, key: str) -> str | None:
+    try:
+        with open(_cache_path(data_dir, key), "r", encoding="utf-8") as f:
+            return json.load(f)["text"]
+    except Exception:
+        return None
+
+def remember(data_dir: str, key: str, text: str):
+    atomic_write_json(_cache_path(data_dir, key), {
+        "text": text,
+        "model": MODEL,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }, indent=None)
+
+
+# =========================
+# 스트리밍
+# =========================
+# 클라이언트(연결 풀)는 프로세스 전체에서 하나
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+_WARMING = False
+
+
+def _client():
+    # openai는 쓸 때만 불러온다 (없거나 꺼져 있으면 앱 시작에 영향 없음)
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            from openai import OpenAI
+            _CLIENT = OpenAI(base_url=os.environ.get("OPENAI_BASE_URL") or None, timeout=TIMEOUT, max_retries=0)
+        return _CLIENT
+
+def prewarm():
+    # openai 가져오기가 1초 가까이 걸려서, 켜져 있으면 앱 시작 때 뒤에서 미리 만들어 둔다
+    global _WARMING
+    if _WARMING or not enabled():
+        return
+    _WARMING = True
+    threading.Thread(target=lambda: _safe(_client), name="dw-llm-warm", daemon=True).start()
+
+def _safe(fn):
+    try:
+        fn()
+    except Exception:
+        pass
+
+def _tokens(messages: list[dict], deadline: float):
+    # 스트림은 뒤쪽 스레드에서 읽고 여기서는 deadline까지만 기다린다.
+    # (청크가 올 때만 시간을 보면, 중간에 멈춘 서버는 읽기마다 클라이언트 timeout만큼 붙잡는다)
+    out = queue.Queue()
+    state = {"stream": None, "stop": False}
+
+    def pump():
+        try:
+            stream = state["stream"] = _client().chat.completions.create(
+                model=MODEL, messages=messages, stream=True, max_tokens=MAX_TOKENS, temperature=0.8,
+            )
+            with stream:
+                for chunk in stream:
+                    if state["stop"]:
+                        return
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        out.put(("token", chunk.choices[0].delta.content))
+            out.put(("done", None))
+        except Exception as e:
+            out.put(("error", e))
+
+    threading.Thread(target=pump, name="dw-llm-stream", daemon=True).start()
+    try:
+        while True:
+            try:
+                kind, value = out.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError("LLM 응답 시간 초과") from None
+            if kind == "token":
+                yield value
+            elif kind == "error":
+                raise value
+            else:
+                return
+    finally:
+        # 시간 초과 / 받는 쪽이 그만둔 경우: 연결을 닫아 뒤쪽 스레드도 끝나게 한다
+        state["stop"] = True
+        if state["stream"] is not None:
+            _safe(state["stream"].close)
+
+def complete(messages: list[dict], max_tokens: int = 600) -> str:
+    # 스트리밍 없이 한 번에 (뒤쪽 작업자에서 쓰는 용도, JSON 응답)
+    resp = _client().chat.completions.create(
+        model=MODEL, messages=messages, max_tokens=max_tokens, temperature=0.4,
+        response_format={"type": "json_object"},
+    )
+    return resp.choices[0].message.content or ""
+
+def stream_closing(data_dir: str, style_mode: str, name: str, answers: dict, fallback: str):
+    # 지금까지 받은 글자 전체를 계속 내보낸다. 마지막으로 내보낸 것이 최종 문장.
+    # (말풍선에 그대로 들어가므로 LLM 글자는 HTML 이스케이프해서 내보낸다)
+    if not enabled():
+        yield fallback
+        return
+
+    key = cache_key(style_mode, name, answers)
+    hit = cached(data_dir, key)
+    if hit:
+        yield html.escape(hit)
+        return
+
+    text = ""
+    try:
+        for tok in _tokens(build_messages(style_mode, name, answers), time.monotonic() + TIMEOUT):
+            text += tok
+            yield html.escape(text)
+    except Exception:
+        # 받다 만 글은 버리고 템플릿으로 (다음에 다시 시도할 수 있게 캐시는 남기지 않는다)
+        yield fallback
+        return
+
+    text = text.strip()
+    if not text:
+        yield fallback
+        return
+    remember(data_dir, key, text)
+    yield html.escape(text)
+
+
+# =========================
+# 로컬 스텁 (OpenAI 호환 스트리밍 응답)
+# =========================
+def serve_stub(port: int, reply: str, delay: float):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for ch in reply:
+                chunk = {
+                    "id": "stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": "stub",
+                    "choices": [{"index": 0, "delta": {"content": ch}, "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+
+        def log_message(self, *args):
+            pass
+
+    print(f"스텁 서버: OPENAI_BASE_URL=http://127.0.0.1:{port}/v1 OPENAI_API_KEY=stub")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="llm.py", description="Daily Weaver LLM 마무리 메시지 도구")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_stub = sub.add_parser("stub", help="로컬 OpenAI 호환 스텁 서버를 띄웁니다")
+    p_stub.add_argument("--port", type=int, default=8787)
+    p_stub.add_argument("--reply", default="오늘은 **기록**이 빛난 하루였어요. 내일도 천천히 걸어가요.")
+    p_stub.add_argument("--delay", type=float, default=0.02, help="글자 사이 지연(초)")
+
+    p_try = sub.add_parser("try", help="마무리 메시지를 한 번 받아 출력합니다")
+    p_try.add_argument("--data-dir", default="data")
+    p_try.add_argument("--style", default="감성 에디터", choices=list(PERSONAS))
+    p_try.add_argument("--name", default="사용자")
+    p_try.add_argument("--one-word", default="기록")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "stub":
+        serve_stub(args.port, args.reply, args.delay)
+
+    if args.cmd == "try":
+        answers = {"one_word": args.one_word}
+        t0 = time.monotonic()
+        first = None
+        text = ""
+        for text in stream_closing(args.data_dir, args.style, args.name, answers, fallback="(템플릿)"):
+            first = first or time.monotonic() - t0
+        print(text)
+        print(f"첫 글자 {first * 1000:.0f}ms / 전체 {(time.monotonic() - t0) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
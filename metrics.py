@@ -0,0 +1,273 @@
+# metrics.py — 서버 전체 지표 (카운터 / 게이지 / 히스토그램)
+# 모든 세션이 한 프로세스에서 돌기 때문에 지표도 프로세스에 하나. 쓰는 쪽은 잠금 한 번 + 덧셈뿐이고,
+# 글로 바꾸는 일(Prometheus 텍스트)은 긁어 갈 때나 덤프할 때만 한다.
+# DW_METRICS_PORT=9464 → http://127.0.0.1:9464/metrics / DW_METRICS_DUMP=data/metrics.prom → 주기적으로 파일에 쓴다
+
+import os
+import time
+import threading
+from bisect import bisect_left
+from functools import wraps
+
+from storage import atomic_write_text, iter_user_dirs, ENTRIES_FILENAME, DB_FILENAME
+
+
+PORT = int(os.environ.get("DW_METRICS_PORT", "0") or 0)          # 0: HTTP 끔
+HOST = os.environ.get("DW_METRICS_HOST", "127.0.0.1")
+DUMP_PATH = os.environ.get("DW_METRICS_DUMP", "")                   # 비우면 파일 덤프 끔
+DUMP_INTERVAL = float(os.environ.get("DW_METRICS_INTERVAL", "15"))  # 초
+SESSION_TTL = float(os.environ.get("DW_METRICS_SESSION_TTL", "300"))  # 이 시간 안에 rerun한 세션을 "활성"으로
+DISK_TTL = 60.0  # 저장소 파일 크기는 모든 파티션을 훑으므로 이 시간(초)만큼 재사용
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# =========================
+# 지표
+# =========================
+class Counter:
+    kind = "counter"
+
+    def __init__(self, window: int = 0):
+        self.value = 0
+        self._lock = threading.Lock()
+        # window > 0이면 초 단위 칸에 나눠 세어 두고 "최근 N초" 합을 낼 수 있게 한다
+        self._window = window
+        self._slots = []  # [초, 개수] 오래된 것부터
+
+    def inc(self, n: int = 1):
+        with self._lock:
+            self.value += n
+            if self._window:
+                now = int(time.monotonic())
+                if self._slots and self._slots[-1][0] == now:
+                    self._slots[-1][1] += n
+                else:
+                    self._slots.append([now, n])
+                    if len(self._slots) > self._window:
+                        del self._slots[:len(self._slots) - self._window]
+
+    def recent(self, seconds: int) -> int:
+        since = int(time.monotonic()) - seconds
+        with self._lock:
+            return sum(n for s, n in self._slots if s > since)
+
+    def samples(self, name: str, labels: str):
+        yield name, labels, self.value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, fn=None):
+        self.value = 0.0
+        self.fn = fn  # 있으면 긁어 갈 때 불러서 값을 얻는다
+
+    def set(self, v: float):
+        self.value = v
+
+    def samples(self, name: str, labels: str):
+        yield name, labels, self.fn() if self.fn else self.value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, v: float):
+        i = bisect_left(self.buckets, v)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += v
+
+    def samples(self, name: str, labels: str):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        sep = "," if labels else ""
+        acc = 0
+        for le, c in zip(self.buckets + ("+Inf",), counts):
+            acc += c
+            yield f"{name}_bucket", f'{labels}{sep}le="{le}"', acc
+        yield f"{name}_sum", labels, total
+        yield f"{name}_count", labels, acc
+
+
+# =========================
+# 레지스트리
+# =========================
+# 이름 → (종류, 설명, {라벨 문자열: 지표}). 같은 이름 + 라벨이면 같은 지표를 돌려준다 (rerun마다 불려도 된다)
+_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _get(cls, name: str, help_: str, labels: dict, make):
+    key = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    with _REGISTRY_LOCK:
+        kind, _, children = _REGISTRY.setdefault(name, (cls.kind, help_, {}))
+        if kind != cls.kind:
+            raise ValueError(f"지표 종류가 달라요: {name} ({kind})")
+        m = children.get(key)
+        if m is None:
+            m = children[key] = make()
+        return m
+
+def counter(name: str, help_: str = "", window: int = 0, **labels) -> Counter:
+    return _get(Counter, name, help_, labels, lambda: Counter(window))
+
+def gauge(name: str, help_: str = "", fn=None, **labels) -> Gauge:
+    g = _get(Gauge, name, help_, labels, lambda: Gauge(fn))
+    if fn is not None:
+        g.fn = fn
+    return g
+
+def histogram(name: str, help_: str = "", buckets: tuple = LATENCY_BUCKETS, **labels) -> Histogram:
+    return _get(Histogram, name, help_, labels, lambda: Histogram(buckets))
+
+def timed(name: str, help_: str = "", **labels):
+    # 함수 실행 시간(초)을 히스토그램에. 예외로 끝나도 잰다
+    hist = histogram(name, help_, **labels)
+
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - t)
+        return wrapper
+    return deco
+
+
+def _fmt(v) -> str:
+    return str(v) if isinstance(v, int) else repr(float(v))
+
+def render() -> str:
+    # Prometheus 텍스트 형식 0.0.4
+    with _REGISTRY_LOCK:
+        items = [(name, kind, help_, list(children.items())) for name, (kind, help_, children) in _REGISTRY.items()]
+    out = []
+    for name, kind, help_, children in sorted(items):
+        if help_:
+            out.append(f"# HELP {name} {help_}")
+        out.append(f"# TYPE {name} {kind}")
+        for labels, m in children:
+            try:
+                for sample, lab, v in m.samples(name, labels):
+                    out.append(f"{sample}{{{lab}}} {_fmt(v)}" if lab else f"{sample} {_fmt(v)}")
+            except Exception:
+                continue  # 게이지 함수 하나가 실패해도 나머지는 내보낸다
+    return "\n".join(out) + "\n"
+
+
+# =========================
+# 앱 지표
+# =========================
+SCRIPT_RUNS = counter("dw_script_runs_total", "스크립트 실행 수 (전체 rerun + 대화 영역 fragment rerun)", window=60)
+JOURNALS = counter("dw_journals_completed_total", "저장까지 끝난 하루 기록 수", window=3600)
+_SESSIONS = {}  # 세션 → 마지막 실행 시각
+_SESSIONS_LOCK = threading.Lock()
+_PRUNED = {"at": 0.0}
+
+
+def _prune(now: float):
+    # _SESSIONS_LOCK 안에서 호출. 마지막 실행이 SESSION_TTL보다 오래된 세션을 뺀다
+    cutoff = now - SESSION_TTL
+    for s in [s for s, t in _SESSIONS.items() if t < cutoff]:
+        del _SESSIONS[s]
+    _PRUNED["at"] = now
+
+def touch_session(session: str):
+    SCRIPT_RUNS.inc()
+    if not (PORT or DUMP_PATH):
+        return  # 내보내지 않으면 활성 세션 수를 볼 일도 없다
+    now = time.monotonic()
+    with _SESSIONS_LOCK:
+        _SESSIONS[session] = now
+        # 긁어 가는 쪽이 없어도 끝난 세션이 쌓이지 않게 TTL마다 한 번 정리
+        if now - _PRUNED["at"] > SESSION_TTL:
+            _prune(now)
+
+def active_sessions() -> int:
+    with _SESSIONS_LOCK:
+        _prune(time.monotonic())
+        return len(_SESSIONS)
+
+
+_DISK = {"at": None, "bytes": 0}
+
+
+def store_bytes(data_dir: str) -> int:
+    # 기록 파일(JSONL / SQLite + WAL) 크기 합. 사용자 파티션까지 훑으니 DISK_TTL 동안 재사용
+    now = time.monotonic()
+    if _DISK["at"] is not None and now - _DISK["at"] < DISK_TTL:
+        return _DISK["bytes"]
+    total = 0
+    for d in (data_dir, *iter_user_dirs(data_dir)):
+        for name in (ENTRIES_FILENAME, DB_FILENAME, DB_FILENAME + "-wal"):
+            try:
+                total += os.path.getsize(os.path.join(d, name))
+            except OSError:
+                pass
+    _DISK.update(at=now, bytes=total)
+    return total
+
+
+# =========================
+# 내보내기 (HTTP / 파일)
+# =========================
+_STARTED = False
+_START_LOCK = threading.Lock()
+
+
+def _serve(host: str, port: int):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer((host, port), Handler).serve_forever()
+
+def _dump_loop(path: str, interval: float):
+    while True:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            atomic_write_text(path, render())
+        except OSError:
+            pass
+        time.sleep(interval)
+
+def start(data_dir: str):
+    # 프로세스에서 한 번만 (rerun마다 불려도 된다). 둘 다 꺼져 있으면 아무것도 하지 않는다
+    global _STARTED
+    if _STARTED or not (PORT or DUMP_PATH):
+        return
+    with _START_LOCK:
+        if _STARTED:
+            return
+        _STARTED = True
+    gauge("dw_active_sessions", f"최근 {SESSION_TTL:g}초 안에 실행된 세션 수", fn=active_sessions)
+    gauge("dw_script_runs_last_minute", "최근 1분 동안의 스크립트 실행 수", fn=lambda: SCRIPT_RUNS.recent(60))
+    gauge("dw_journals_completed_last_hour", "최근 1시간 동안 끝난 기록 수", fn=lambda: JOURNALS.recent(3600))
+    gauge("dw_store_bytes", "기록 저장소 파일 크기 합 (바이트)", fn=lambda: store_bytes(data_dir))
+    if PORT:
+        threading.Thread(target=_serve, args=(HOST, PORT), name="dw-metrics-http", daemon=True).start()
+    if DUMP_PATH:
+        threading.Thread(target=_dump_loop, args=(DUMP_PATH, DUMP_INTERVAL), name="dw-metrics-dump", daemon=True).start()
@@ -0,0 +1,145 @@
+# profiling.py — rerun 구간별 시간 재기 (DW_PROFILE=1일 때만)
+# 스크립트 한 번 실행(전체 rerun 또는 대화 영역 fragment rerun)을 run 하나로 묶고,
+# 그 안에서 span/timed로 감싼 구간의 시간을 더해 JSONL 트레이스에 한 줄씩 남긴다.
+# 꺼져 있으면 timed는 함수를 그대로 돌려주고 span은 아무것도 하지 않는다.
+
+import os
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+
+ENABLED = os.environ.get("DW_PROFILE", "0") == "1"
+TRACE_PATH = os.environ.get("DW_PROFILE_TRACE", os.path.join("data", "profile_trace.jsonl"))
+TRACE_MAX_BYTES = int(os.environ.get("DW_PROFILE_TRACE_MB", "16")) * 1024 * 1024  # 넘으면 .1로 넘기고 새로 쓴다
+HISTORY = int(os.environ.get("DW_PROFILE_HISTORY", "50"))  # 패널에 보여 줄 최근 rerun 수
+
+_NOOP = nullcontext()
+_LOCAL = threading.local()   # Streamlit은 세션마다 스크립트 스레드가 따로라 run도 스레드별
+_TRACE_LOCK = threading.Lock()
+
+
+# =========================
+# run / span
+# =========================
+def start_run(kind: str = "script", session: str = "") -> bool:
+    # 이미 진행 중인 run이 있으면(전체 rerun 안의 fragment) 새로 만들지 않고 False
+    if not ENABLED:
+        return False
+    if getattr(_LOCAL, "run", None) is not None:
+        if kind != "script":
+            return False
+        # st.rerun()/st.stop()으로 끝나지 못한 예전 run
+        finish_run(interrupted=True)
+    _LOCAL.run = {"kind": kind, "session": session, "ts": time.time(), "t0": time.perf_counter(), "phases": {}}
+    return True
+
+def finish_run(interrupted: bool = False) -> dict | None:
+    run = getattr(_LOCAL, "run", None)
+    if run is None:
+        return None
+    _LOCAL.run = None
+    record = {
+        "ts": round(run.pop("ts"), 3),
+        "kind": run["kind"],
+        "session": run["session"],
+        "total_ms": round((time.perf_counter() - run.pop("t0")) * 1000, 2),
+        "phases": {k: round(v, 2) for k, v in run["phases"].items()},
+    }
+    if interrupted:
+        record["interrupted"] = True
+    _write_trace(record)
+    return record
+
+@contextmanager
+def _span(name: str):
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        run = getattr(_LOCAL, "run", None)
+        if run is not None:
+            # 한 run 안에서 여러 번 불리면 더한다
+            run["phases"][name] = run["phases"].get(name, 0.0) + (time.perf_counter() - t) * 1000
+
+def span(name: str):
+    return _span(name) if ENABLED else _NOOP
+
+def timed(name: str):
+    # 함수 전체를 구간 하나로. 꺼져 있으면 함수를 그대로 돌려준다 (호출마다 드는 비용 없음)
+    def deco(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+# =========================
+# 트레이스 파일
+# =========================
+def _write_trace(record: dict):
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    try:
+        with _TRACE_LOCK:
+            os.makedirs(os.path.dirname(TRACE_PATH) or ".", exist_ok=True)
+            if os.path.exists(TRACE_PATH) and os.path.getsize(TRACE_PATH) > TRACE_MAX_BYTES:
+                os.replace(TRACE_PATH, TRACE_PATH + ".1")
+            with open(TRACE_PATH, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError:
+        pass  # 재는 쪽 실패로 앱이 멈추지 않게
+
+def read_trace(path: str = TRACE_PATH, limit: int = HISTORY, block: int = 64 * 1024) -> list[dict]:
+    # 파일 끝에서부터 블록 단위로 거꾸로 읽어 마지막 limit줄만 (파일이 TRACE_MAX_BYTES까지 커져도 읽는 양은 그대로)
+    try:
+        with open(path, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            data = b""
+            while pos > 0 and data.count(b"\n") <= limit:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+    except FileNotFoundError:
+        return []
+    lines = data.split(b"\n")
+    if pos > 0:
+        lines = lines[1:]  # 블록 경계에서 잘린 앞줄
+    runs = []
+    for line in lines:
+        try:
+            run = json.loads(line)
+        except ValueError:
+            continue  # 빈 줄 / 쓰다 만 줄
+        if isinstance(run, dict) and "total_ms" in run:
+            runs.append(run)
+    return runs[-limit:]
+
+
+# =========================
+# 요약
+# =========================
+def percentile(values: list[float], q: float) -> float:
+    # 가장 가까운 순위 (값이 몇십 개라 보간하지 않는다)
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[max(0, math.ceil(q / 100 * len(s)) - 1)]
+
+def summarize(runs: list[dict]) -> list[dict]:
+    # 구간별 (호출된 run 수, p50, p95, 최대). 전체 시간이 맨 위, 나머지는 p95가 큰 순서
+    by_phase = {"(전체)": [r["total_ms"] for r in runs]}
+    for r in runs:
+        for k, v in r["phases"].items():
+            by_phase.setdefault(k, []).append(v)
+    rows = [{"구간": k, "runs": len(v), "p50 ms": percentile(v, 50), "p95 ms": percentile(v, 95), "max ms": max(v)}
+            for k, v in by_phase.items() if v]
+    return rows[:1] + sorted(rows[1:], key=lambda r: -r["p95 ms"])
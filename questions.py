@@ -0,0 +1,227 @@
+# questions.py — 스페셜 질문 스케줄 (미리 짜 둔 무반복 일정)
+# 미리 보기: python questions.py plan --days 30
+
+import os
+import json
+import heapq
+import hashlib
+import argparse
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+
+from storage import atomic_write_text, file_lock
+from selection import stable_choice, stable_shuffle
+
+
+SPECIAL_QUESTIONS = [
+    "오늘 하루를 색으로 표현한다면 어떤 색인가요?",
+    "오늘 하루가 영화라면 제목은 무엇인가요?",
+    "오늘 하루를 이모지 세 개로 표현한다면 무엇인가요?",
+    "오늘 기분을 음식으로 표현한다면 무엇인가요?",
+    "오늘 하루가 카페라면 분위기는 어떤가요?",
+    "오늘 하루를 광고 문구로 만든다면 무엇인가요?",
+    "오늘 하루가 선물이라면 포장지는 어떤 모습인가요?",
+    "오늘 하루를 한 컷 만화로 그린다면 어떤 장면인가요?",
+    "오늘 하루에 제목을 붙인다면 어떤 제목이 어울리나요?",
+    "오늘 가장 마음에 남은 말 한마디가 있다면 무엇인가요?",
+    "오늘 나를 가장 지탱해준 것은 무엇이었나요?",
+    "오늘 가장 나답다고 느낀 순간은 언제였나요?",
+    "오늘의 나에게 점수를 준다면 몇 점인가요?",
+    "오늘은 어떤 감정이 가장 오래 머물렀나요?",
+    "오늘 내가 가장 잘한 선택은 무엇이었나요?",
+    "오늘 하루가 한 장의 사진이라면 어떤 장면인가요?",
+    "오늘의 나는 어떤 날씨 같았나요?",
+    "오늘 내 마음을 가장 잘 표현하는 노래 제목은 무엇인가요?",
+    "오늘 가장 후회되는 순간이 있다면 무엇인가요?",
+    "오늘 가장 감사했던 순간은 무엇이었나요?",
+    "오늘 하루를 한 문장으로 요약한다면?",
+    "오늘 내가 나를 칭찬해주고 싶은 이유는 무엇인가요?",
+    "오늘 내가 놓치고 싶지 않은 순간은 무엇인가요?",
+    "오늘은 어떤 사람으로 기억되고 싶나요?",
+    "오늘 나를 가장 흔든 사건은 무엇이었나요?",
+    "오늘은 어떤 색감의 하루였나요? (파스텔/모노톤/네온 등)",
+    "오늘 내 마음에 가장 가까운 단어는 무엇인가요?",
+    "오늘 하루를 물건 하나로 표현한다면 무엇인가요?",
+    "오늘 하루가 여행지라면 어디일까요?",
+    "오늘 하루를 만약 그림으로 그린다면 어떤 스타일일까요?",
+    "오늘 내가 더 잘하고 싶었던 것은 무엇인가요?",
+    "오늘 내가 가장 많이 했던 생각은 무엇인가요?",
+    "오늘 나를 웃게 만든 건 무엇이었나요?",
+    "오늘 하루는 어떤 향이 날까요?",
+    "오늘의 나에게 필요한 한마디는 무엇인가요?",
+    "오늘 하루를 만약 일기 제목으로 붙이면?",
+    "오늘은 어떤 순간이 가장 뿌듯했나요?",
+    "오늘 하루는 어떤 감정으로 시작했고 어떤 감정으로 끝났나요?",
+    "오늘은 어떤 순간이 가장 나를 위로했나요?",
+    "오늘 하루를 다시 산다면 가장 먼저 바꾸고 싶은 건 무엇인가요?",
+]
+
+SCHEDULE_FILENAME = "special_schedule.json"
+HORIZON_DAYS = 400   # 한 번에 1년 이상 미리 짠다
+MIN_GAP = 14         # 같은 질문은 최소 14일 안에 다시 나오지 않는다
+
+
+@lru_cache(maxsize=16)
+def _digest(pool: tuple) -> str:
+    return hashlib.sha1("\n".join(pool).encode("utf-8")).hexdigest()
+
+def pool_hash(pool: list[str]) -> str:
+    # 풀마다 한 번만 해시한다 (질문 문자열은 해시값을 기억하고 있어서 튜플 키는 싸다)
+    return _digest(tuple(pool))
+
+
+# =========================
+# 스케줄 생성
+# =========================
+def build_schedule(pool_size: int, days: int, min_gap: int = MIN_GAP, seed: str = "",
+                   recent: list[int] | None = None) -> list[int]:
+    # 섞은 순열을 차례로 이어 붙이되, 최근 min_gap일 안에 나온 질문은 힙에 미뤄 두었다가
+    # 다시 나와도 되는 날이 되면 꺼낸다. 질문 수 N > min_gap이면 항상 가능하고 O(days log min_gap).
+    if pool_size <= 0:
+        return []
+    gap = min(min_gap, pool_size - 1)
+
+    # recent: 시작일 직전의 질문들 (오래된 것 → 어제 순서)
+    last_used = {}
+    for i, q in enumerate(recent or []):
+        last_used[q] = i - len(recent)
+
+    out = []
+    cycle = 0
+    order = []
+    deferred = []  # (다시 나와도 되는 날, 질문)
+    while len(out) < days:
+        day = len(out)
+        if deferred and deferred[0][0] <= day:
+            q = heapq.heappop(deferred)[1]
+        else:
+            if not order:
+                order = stable_shuffle(range(pool_size), seed, cycle)
+                order.reverse()
+                cycle += 1
+            q = order.pop()
+            if q in last_used and day - last_used[q] <= gap:
+                heapq.heappush(deferred, (last_used[q] + gap + 1, q))
+                continue
+        last_used[q] = day
+        out.append(q)
+    return out
+
+
+# =========================
+# 스케줄 저장/조회
+# =========================
+# data_dir → 스케줄. 오늘의 질문은 이 메모리 조회 한 번 (읽기 경로에서 파일을 쓰지 않는다)
+_SCHEDULES = {}
+_SCHEDULES_LOCK = threading.Lock()
+
+
+def _schedule_path(data_dir: str) -> str:
+    return os.path.join(data_dir, SCHEDULE_FILENAME)
+
+
+def _load_file(data_dir: str):
+    try:
+        with open(_schedule_path(data_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _lookup(sched, digest: str, today: date):
+    if not sched or sched.get("pool_hash") != digest:
+        return None
+    i = (today - date.fromisoformat(sched["start"])).days
+    if 0 <= i < len(sched["questions"]):
+        return sched["questions"][i]
+    return None
+
+
+def _before_start(sched, digest: str, today: date) -> bool:
+    return bool(sched) and sched.get("pool_hash") == digest and today < date.fromisoformat(sched["start"])
+
+def past_question(pool: list[str], digest: str, today: date) -> str:
+    # 일정 시작 전 날짜 (지난 날 기록 쓰기): 일정을 다시 짜면 앞으로 나갈 질문이 모두 바뀌므로 날짜 해시로 고른다
+    return stable_choice(pool, digest, today.isoformat())
+
+
+def regenerate(data_dir: str, pool: list[str], today: date,
+               horizon: int = HORIZON_DAYS, min_gap: int = MIN_GAP) -> dict:
+    # 질문 풀이 바뀌었거나 일정이 끝났을 때만 호출된다 (호출하는 쪽이 file_lock을 잡고 있어야 함).
+    # 바로 전 min_gap일 동안 나간 질문은 이어서 피하도록 넘겨준다.
+    old = _load_file(data_dir)
+    recent = []
+    if old:
+        old_pool = old.get("pool") or []
+        index = {q: i for i, q in enumerate(pool)}
+        for k in range(min_gap, 0, -1):
+            day = today - timedelta(days=k)
+            i = (day - date.fromisoformat(old["start"])).days
+            if 0 <= i < len(old["questions"]) and old["questions"][i] < len(old_pool):
+                q = index.get(old_pool[old["questions"][i]])
+                if q is not None:
+                    recent.append(q)
+
+    digest = pool_hash(pool)
+    sched = {
+        "pool_hash": digest,
+        "pool": pool,
+        "start": today.isoformat(),
+        "min_gap": min_gap,
+        "questions": build_schedule(len(pool), horizon, min_gap, seed=digest, recent=recent),
+    }
+    os.makedirs(data_dir, exist_ok=True)
+    atomic_write_text(_schedule_path(data_dir), json.dumps(sched, ensure_ascii=False))
+    return sched
+
+
+def question_for(data_dir: str, today: str, pool: list[str] = SPECIAL_QUESTIONS) -> str:
+    today_ = date.fromisoformat(today)
+    digest = pool_hash(pool)
+    key = os.path.abspath(data_dir)
+
+    with _SCHEDULES_LOCK:
+        sched = _SCHEDULES.get(key)
+    i = _lookup(sched, digest, today_)
+    if i is not None:
+        return pool[i]
+    if _before_start(sched, digest, today_):
+        return past_question(pool, digest, today_)
+
+    # 메모리에 없으면 파일, 그래도 안 맞으면 (다른 프로세스와 겹치지 않게 잠그고) 새로 짠다.
+    # 새로 짜는 건 풀이 바뀌었거나 일정이 끝났을 때뿐 (지난 날짜 때문에 공유 일정을 바꾸지 않는다)
+    with file_lock(_schedule_path(data_dir)):
+        sched = _load_file(data_dir)
+        i = _lookup(sched, digest, today_)
+        if i is None and not _before_start(sched, digest, today_):
+            sched = regenerate(data_dir, pool, today_)
+            i = _lookup(sched, digest, today_)
+    with _SCHEDULES_LOCK:
+        _SCHEDULES[key] = sched
+    return pool[i] if i is not None else past_question(pool, digest, today_)
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="questions.py", description="스페셜 질문 일정 미리 보기")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_plan = sub.add_parser("plan", help="앞으로의 질문 일정을 출력합니다")
+    p_plan.add_argument("--data-dir", default="data")
+    p_plan.add_argument("--start", default=date.today().isoformat())
+    p_plan.add_argument("--days", type=int, default=30)
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "plan":
+        start = date.fromisoformat(args.start)
+        for k in range(args.days):
+            d = (start + timedelta(days=k)).isoformat()
+            print(d, question_for(args.data_dir, d))
+
+
+if __name__ == "__main__":
+    main()
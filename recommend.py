@@ -0,0 +1,112 @@
+# recommend.py — 기록을 기억하는 노래 추천
+# 오늘의 태그 구성 + 최근 기분 흐름 + 최근에 들은 곡 피하기를 카탈로그 전체에 한 번에(벡터로) 점수 매긴다.
+# numpy가 없으면 예전처럼 태그 하나에서 고른다.
+
+import os
+import threading
+import weakref
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성
+    np = None
+
+from tagger import TAGS, DEFAULT_TAG, default_tagger
+from selection import stable_hash
+
+
+TREND_DAYS = int(os.environ.get("DW_TREND_DAYS", "7"))        # 기분 흐름을 볼 기간
+NO_REPEAT_DAYS = int(os.environ.get("DW_NO_REPEAT_DAYS", "14"))  # 이 기간에 나온 곡은 다시 고르지 않는다
+
+TODAY_WEIGHT = 0.7    # 오늘 답변에서 나온 태그 구성
+TREND_WEIGHT = 0.3    # 최근 기분 흐름
+JITTER = 0.05         # 같은 점수대 곡들 사이를 (사용자, 날짜)로 고정된 값으로 흩어 놓는다
+REPEAT_PENALTY = 1.0  # 최근 곡은 맞는 태그의 다른 곡보다 뒤, 안 맞는 태그의 곡보다는 앞
+
+
+# =========================
+# 태그 구성
+# =========================
+def tag_mix(ranked: list[tuple[str, float]], trend: dict) -> dict:
+    # 오늘: 순위의 역수 (사전 가중치는 단계별로 크기가 달라서 값 대신 순위만 쓴다)
+    today = {tag: 1.0 / (r + 1) for r, (tag, _) in enumerate(ranked)} or {DEFAULT_TAG: 1.0}
+
+    # 흐름: 최근 기분마다 가장 가까운 태그에 그 기분이 나온 횟수만큼
+    tagger = default_tagger()
+    recent = {}
+    for mood, n in trend.items():
+        top = tagger.rank(mood or "")
+        if top:
+            recent[top[0][0]] = recent.get(top[0][0], 0) + n
+
+    mix = {}
+    for weight, part in ((TODAY_WEIGHT, today), (TREND_WEIGHT, recent)):
+        total = sum(part.values())
+        for tag, v in part.items():
+            mix[tag] = mix.get(tag, 0.0) + weight * v / total
+    return mix
+
+
+# =========================
+# 카탈로그 특징 (카탈로그 핸들마다 한 번)
+# =========================
+# Catalog → (행별 태그 번호, 정렬된 곡 키, 그 정렬 순서). 카탈로그가 다시 열리면 예전 핸들과 함께 사라진다.
+_FEATURES = weakref.WeakKeyDictionary()
+_FEATURES_LOCK = threading.Lock()
+
+
+def _features(cat):
+    with _FEATURES_LOCK:
+        feats = _FEATURES.get(cat)
+    if feats is not None:
+        return feats
+
+    # 태그는 행 범위로 채우고, 곡 키는 파일의 u64 열을 복사 없이 그대로 본다
+    tag_ids = np.full(len(cat), len(TAGS), dtype=np.int8)
+    for tag, (start, end) in cat.tags.items():
+        if tag in TAGS:
+            tag_ids[start:end] = TAGS.index(tag)
+    keys = np.frombuffer(cat.buffer, dtype="<u8", count=len(cat), offset=cat.keys_offset)
+    order = np.argsort(keys, kind="stable")
+
+    with _FEATURES_LOCK:
+        return _FEATURES.setdefault(cat, (tag_ids, keys[order], order))
+
+
+def _rows_with_keys(sorted_keys, order, recent: set[int]):
+    # 최근 곡 수만큼 이분 탐색 (카탈로그 전체를 훑지 않는다)
+    q = np.fromiter(recent, dtype=np.uint64, count=len(recent))
+    lo = np.searchsorted(sorted_keys, q, side="left")
+    hi = np.searchsorted(sorted_keys, q, side="right")
+    return np.concatenate([order[a:b] for a, b in zip(lo, hi)] + [order[:0]])
+
+
+# =========================
+# 추천
+# =========================
+def score(cat, mix: dict, recent: set[int], *key):
+    tag_ids, sorted_keys, order = _features(cat)
+    # 카탈로그에 없는 태그 번호(len(TAGS))는 0점
+    weights = np.array([mix.get(t, 0.0) for t in TAGS] + [0.0])
+    tw = weights[tag_ids]
+
+    rng = np.random.default_rng(stable_hash(*key))
+    s = tw + JITTER * rng.random(len(cat))
+    if recent:
+        s[_rows_with_keys(sorted_keys, order, recent)] -= REPEAT_PENALTY
+    # 오늘과 상관없는 태그는 다른 곡이 하나도 없을 때만
+    s[tw <= 0] = -np.inf
+    return s
+
+
+def recommend(cat, ranked: list[tuple[str, float]], trend: dict, recent: set[int], *key) -> dict | None:
+    if len(cat) == 0:
+        return None
+    if np is None:
+        return cat.pick(ranked[0][0] if ranked else DEFAULT_TAG, *key)
+
+    s = score(cat, tag_mix(ranked, trend), recent, *key)
+    i = int(np.argmax(s))
+    if s[i] == -np.inf:
+        return cat.pick(DEFAULT_TAG, *key)
+    return cat.row(i)
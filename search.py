@@ -0,0 +1,298 @@
+# search.py — 기록 검색 (글자 n-gram 역색인)
+# best_moment / growth / one_word / special_answer를 한 글자·두 글자씩 잘라 색인한다 (띄어쓰기·조사와 상관없이 "발표"가 "발표를"에 걸린다).
+# 색인은 사용자 파티션마다 메모리에 하나, 저장할 때마다 그 기록만 더하고(append_entry / writer의 쓰기 경로),
+# 다른 프로세스가 써서 저장소 버전이 어긋나면 다음 검색 때 다시 만든다.
+# 만든 색인은 daily_aggregates.json처럼 저장소 옆(search_index.bin)에 남겨서, 재시작이나 LRU로 내려간 뒤에도
+# 저장소 버전이 같으면 다시 만들지 않고 읽어 온다. 저장 뒤 증분은 조금 모았다가 뒤에서 파일에 쓴다.
+
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from storage import entry_date, dedupe_key, lru_put, atomic_write_bytes
+
+
+FIELDS = ("best_moment", "growth", "one_word", "special_answer")
+FIELD_LABELS = {"best_moment": "가장 좋았던 순간", "growth": "성장", "one_word": "한 단어", "special_answer": "스페셜 질문"}
+MAX_INDEXES = int(os.environ.get("DW_SEARCH_MAX_INDEXES", "16"))  # 메모리에 둘 파티션 색인 수
+COMPACT_RATIO = 0.25  # 지워진(덮어쓴) 문서가 이 비율을 넘으면 다시 만든다
+INDEX_FILENAME = "search_index.bin"
+INDEX_FORMAT = 1
+SAVE_DELAY = float(os.environ.get("DW_SEARCH_SAVE_DELAY", "30"))  # 증분을 파일에 쓰기 전에 모으는 시간(초)
+
+_WORD = re.compile(r"\w+")
+
+
+# =========================
+# 토큰
+# =========================
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+def grams(text: str) -> set[str]:
+    # 글자 하나 + 이어진 두 글자 (한 글자 검색어 "밤"도 색인으로 바로 찾는다)
+    out = set()
+    for w in _WORD.findall(normalize(text)):
+        out.update(w)
+        out.update(w[i:i + 2] for i in range(len(w) - 1))
+    return out
+
+def term_grams(term: str) -> list[str]:
+    if len(term) == 1:
+        return [term]
+    return [term[i:i + 2] for i in range(len(term) - 1)]
+
+def entry_text(entry: dict) -> dict:
+    a = entry.get("answers") or {}
+    return {f: a.get(f) or "" for f in FIELDS}
+
+def query_terms(query: str) -> list[str]:
+    return _WORD.findall(normalize(query))
+
+
+# =========================
+# 색인
+# =========================
+class SearchIndex:
+    def __init__(self, source: str):
+        self.source = source  # 색인한 시점의 저장소 버전
+        self.docs = []        # 문서 번호 → (키, id 없는 옛 기록이면 기록 자체) / 지워졌으면 None
+        self.by_key = {}      # 키 → 문서 번호
+        self.postings = {}    # gram → 문서 번호 배열 (추가 순서라 항상 오름차순)
+        self.deleted = 0
+
+    def add(self, entry: dict):
+        key = dedupe_key(entry)
+        old = self.by_key.get(key)
+        if old is not None:
+            # 같은 기록을 다시 쓰면 예전 문서는 지운 표시만 하고 새 번호로 넣는다
+            self.docs[old] = None
+            self.deleted += 1
+        n = len(self.docs)
+        self.docs.append((key, None if entry.get("id") else entry))
+        self.by_key[key] = n
+        for g in grams("\n".join(entry_text(entry).values())):
+            p = self.postings.get(g)
+            if p is None:
+                p = self.postings[g] = array("I")
+            p.append(n)
+
+    def needs_compaction(self) -> bool:
+        return self.deleted > 1000 and self.deleted > COMPACT_RATIO * len(self.docs)
+
+    def recent_candidates(self, terms: list[str]):
+        # 문서 번호는 날짜 순이라, 가장 짧은 목록을 뒤에서부터 훑으며 나머지 목록에 있는지 이분 탐색.
+        # 최근 결과 몇 개만 필요하니 교집합 전체를 만들지 않는다.
+        lists = [self.postings.get(g) for t in terms for g in term_grams(t)]
+        if not lists or any(not p for p in lists):
+            return
+        lists.sort(key=len)
+        head, rest = lists[0], lists[1:]
+        for i in range(len(head) - 1, -1, -1):
+            n = head[i]
+            if self.docs[n] is not None and all(_contains(p, n) for p in rest):
+                yield n
+
+
+def _contains(arr, n: int) -> bool:
+    j = bisect_left(arr, n)
+    return j < len(arr) and arr[j] == n
+
+
+def build(entries: list[dict], source: str) -> SearchIndex:
+    # 날짜 순으로 번호를 매긴다 (그 뒤로 저장되는 기록은 보통 오늘 날짜라 뒤에 붙어도 순서가 유지된다)
+    idx = SearchIndex(source)
+    for e in sorted(entries, key=entry_date):
+        idx.add(e)
+    return idx
+
+
+# =========================
+# 파일 (첫 줄 JSON 머리 + 문서 번호 배열을 이어 붙인 바이트)
+# =========================
+def _index_path(data_dir: str) -> str:
+    return os.path.join(data_dir, INDEX_FILENAME)
+
+def dump(idx: SearchIndex) -> bytes:
+    grams = list(idx.postings.items())
+    head = {"format": INDEX_FORMAT, "source": idx.source, "deleted": idx.deleted,
+            "itemsize": array("I").itemsize, "byteorder": sys.byteorder,
+            "docs": idx.docs, "grams": [[g, len(p)] for g, p in grams]}
+    return b"".join([json.dumps(head, ensure_ascii=False).encode("utf-8"), b"\n",
+                     *(p.tobytes() for _, p in grams)])
+
+def load_file(data_dir: str):
+    # 없거나 형식이 다르거나 깨졌으면 None (다시 만들면 된다)
+    try:
+        with open(_index_path(data_dir), "rb") as f:
+            data = f.read()
+        cut = data.index(b"\n")
+        head = json.loads(data[:cut])
+        if (head.get("format") != INDEX_FORMAT or head["itemsize"] != array("I").itemsize
+                or head["byteorder"] != sys.byteorder):
+            return None
+        idx = SearchIndex(head["source"])
+        idx.deleted = head["deleted"]
+        idx.docs = [tuple(d) if d else None for d in head["docs"]]
+        idx.by_key = {d[0]: n for n, d in enumerate(idx.docs) if d}
+        view, pos = memoryview(data), cut + 1
+        for g, count in head["grams"]:
+            end = pos + count * head["itemsize"]
+            p = idx.postings[g] = array("I")
+            p.frombytes(view[pos:end])
+            pos = end
+        if pos != len(data):
+            return None
+        return idx
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def save_file(data_dir: str, idx: SearchIndex):
+    try:
+        atomic_write_bytes(_index_path(data_dir), dump(idx))
+    except OSError:
+        pass  # 파일은 다시 만들 수 있는 사본이라 못 써도 검색은 된다
+
+
+# =========================
+# 파티션별 색인 (프로세스 전체 공유)
+# =========================
+_INDEXES = OrderedDict()
+_INDEX_LOCKS = {}
+_DIRTY = {}  # 파티션 → 아직 파일에 쓰지 않은 증분이 있는 색인
+_LOCK = threading.Lock()
+_SAVER = None
+
+
+def _key_lock(key: str) -> threading.Lock:
+    with _LOCK:
+        return _INDEX_LOCKS.setdefault(key, threading.Lock())
+
+def load(store) -> SearchIndex:
+    # 메모리 → 파일 → 재구성 순서. 저장소 버전이 다르면 낡은 것으로 보고 다음 단계로
+    key = os.path.abspath(store.data_dir)
+    with _key_lock(key):
+        with _LOCK:
+            idx = _INDEXES.get(key)
+        version = store.version()
+        if idx is None or idx.source != version or idx.needs_compaction():
+            idx = load_file(key)
+            if idx is None or idx.source != version or idx.needs_compaction():
+                idx = build(store.read_all(), version)
+                save_file(key, idx)
+        with _LOCK:
+            lru_put(_INDEXES, key, idx, MAX_INDEXES)
+        return idx
+
+def flush_dirty():
+    # 모아 둔 증분을 파일에 쓴다 (뒤의 저장 스레드 / 프로세스 종료 때)
+    with _LOCK:
+        dirty = list(_DIRTY.items())
+        _DIRTY.clear()
+    for key, idx in dirty:
+        with _key_lock(key):
+            data = dump(idx)
+        try:
+            atomic_write_bytes(_index_path(key), data)
+        except OSError:
+            pass
+
+def _save_loop():
+    while True:
+        time.sleep(SAVE_DELAY)
+        flush_dirty()
+
+def _mark_dirty(key: str, idx: SearchIndex):
+    global _SAVER
+    with _LOCK:
+        _DIRTY[key] = idx
+        if _SAVER is None:
+            _SAVER = threading.Thread(target=_save_loop, name="dw-search-save", daemon=True)
+            _SAVER.start()
+            atexit.register(flush_dirty)
+
+def record(store, before: str, after: str, entries: list[dict]):
+    # 쓰기 경로에서 호출 (저장 직후). before → after 사이에 들어간 게 이 기록들뿐일 때:
+    # 메모리 색인이 저장 직전 버전이면 그 기록만 더하고, 아니면 다음 검색 때 다시 만든다.
+    key = os.path.abspath(store.data_dir)
+    with _key_lock(key):
+        with _LOCK:
+            idx = _INDEXES.get(key)
+        if idx is None or idx.source != before:
+            return
+        for e in entries:
+            idx.add(e)
+        idx.source = after
+    _mark_dirty(key, idx)
+
+
+def invalidate(store):
+    key = os.path.abspath(store.data_dir)
+    with _LOCK:
+        _INDEXES.pop(key, None)
+        _DIRTY.pop(key, None)
+
+
+# =========================
+# 검색
+# =========================
+def _match(entry: dict, terms: list[str]):
+    # gram이 모두 있어도 이어져 있지 않을 수 있으니 실제 글에서 확인. 처음 걸린 항목을 돌려준다.
+    texts = {f: normalize(t) for f, t in entry_text(entry).items()}
+    first = None
+    for t in terms:
+        hit = next((f for f in FIELDS if t in texts[f]), None)
+        if hit is None:
+            return None
+        first = first or hit
+    return first
+
+def search(store, query: str, limit: int = 20, extra: list[dict] = ()) -> list[tuple[dict, str]]:
+    # (기록, 걸린 항목) 최근 날짜부터. extra: 아직 저장 안 된(write-behind) 기록
+    terms = query_terms(query)
+    if not terms:
+        return []
+    idx = load(store)
+
+    out, seen = [], set()
+    for e in sorted(extra, key=entry_date, reverse=True):
+        f = _match(e, terms)
+        if f:
+            out.append((e, f))
+            seen.add(dedupe_key(e))
+
+    for n in idx.recent_candidates(terms):
+        if len(out) >= limit:
+            break
+        key, legacy = idx.docs[n]
+        if key in seen:
+            continue
+        e = legacy or store.get(key)
+        f = _match(e, terms) if e else None
+        if f:
+            out.append((e, f))
+    return out[:limit]
+
+def snippet(text: str, query: str, width: int = 40) -> str:
+    # 처음 걸린 자리 앞뒤로 잘라서 보여 준다. 정규화(NFKC)는 길이를 바꿀 수 있으니(전각·호환 자모·합자)
+    # 글자마다 정규화해서 찾고, 찾은 자리를 원래 글의 글자 위치로 되돌려 자른다
+    terms = query_terms(query)
+    starts, parts, n = [], [], 0
+    for ch in text:
+        starts.append(n)
+        parts.append(normalize(ch))
+        n += len(parts[-1])
+    low = "".join(parts)
+    hit = min((low.find(t) for t in terms if t in low), default=0)
+    pos = bisect_right(starts, hit) - 1 if starts else 0
+    start = max(0, pos - width // 3)
+    s = text[start:start + width].replace("\n", " ")
+    return ("…" if start else "") + s + ("…" if start + width < len(text) else "")
@@ -0,0 +1,23 @@
+# selection.py — 공유 상태 없는 결정적 선택
+# random.seed()로 프로세스 전역 RNG를 건드리지 않고, 키를 해시해서 고른다.
+# 같은 키면 어느 스레드/프로세스에서든 항상 같은 결과.
+
+import hashlib
+
+
+def stable_hash(*key) -> int:
+    data = "\x1f".join(str(k) for k in key).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+def stable_index(n: int, *key) -> int:
+    return stable_hash(*key) % n
+
+
+def stable_choice(seq, *key):
+    return seq[stable_index(len(seq), *key)]
+
+
+def stable_shuffle(seq, *key) -> list:
+    # 원소마다 (키, 위치)를 해시한 값으로 정렬 = 키로 고정된 순열
+    return [x for _, x in sorted((stable_hash(*key, i), x) for i, x in enumerate(seq))]
@@ -0,0 +1,635 @@
+# storage.py — Daily Weaver 기록 저장소 (SQLite / JSONL)
+# 마이그레이션: python storage.py migrate --data-dir data
+# 중복 정리:   python storage.py compact --data-dir data
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import argparse
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 안에서만 잠근다
+    fcntl = None
+
+
+# =========================
+# 설정
+# =========================
+BACKENDS = ("sqlite", "jsonl")
+DEFAULT_BACKEND = os.environ.get("DW_STORAGE_BACKEND", "sqlite")
+
+ENTRIES_FILENAME = "entries.jsonl"
+DB_FILENAME = "entries.sqlite3"
+PROFILE_FILENAME = "profile.json"
+
+# 프로세스가 동시에 붙잡고 있을 사용자 파티션 수 (저장소/캐시 LRU 상한)
+MAX_OPEN_PARTITIONS = int(os.environ.get("DW_MAX_OPEN_PARTITIONS", "256"))
+
+
+def entry_date(e: dict) -> str:
+    # 날짜 인덱스 키: "YYYY-MM-DD" (ISO 문자열이라 사전순 비교 = 날짜 비교)
+    return str(e.get("date") or "")[:10]
+
+
+def lru_put(cache: OrderedDict, key, value, limit: int = MAX_OPEN_PARTITIONS):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > limit:
+        cache.popitem(last=False)
+
+
+# =========================
+# 안전한 쓰기: 파일별 advisory lock + 원자적 교체
+# =========================
+# 잠금은 파일마다 따로 걸기 때문에 서로 다른 파일(다른 사용자)끼리는 기다리지 않는다.
+_THREAD_LOCKS = {}
+_THREAD_LOCKS_GUARD = threading.Lock()
+
+
+def _thread_lock(path: str) -> threading.Lock:
+    with _THREAD_LOCKS_GUARD:
+        return _THREAD_LOCKS.setdefault(path, threading.Lock())
+
+
+@contextmanager
+def file_lock(path: str):
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    if fcntl is None:
+        with _thread_lock(os.path.abspath(lock_path)):
+            yield
+        return
+
+    # flock은 열린 파일마다 걸리므로 같은 프로세스의 다른 스레드끼리도 서로 막아준다
+    with open(lock_path, "a") as lf:
+        fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    # 임시 파일에 다 쓰고 fsync한 뒤 교체: 읽는 쪽은 항상 예전 파일이나 새 파일 중 하나를 본다
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def atomic_write_text(path: str, text: str):
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_json(path: str, obj, indent: int | None = 2):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    text = json.dumps(obj, ensure_ascii=False, indent=indent)
+    with file_lock(path):
+        atomic_write_text(path, text)
+
+
+# =========================
+# 사용자 파티션
+# =========================
+# data/users/ab/cd/<sha1(user_id)>/ — 두 단계 256×256 팬아웃이라
+# 10만 명이어도 디렉터리 하나에 몇 개 안 들어간다.
+USERS_DIRNAME = "users"
+
+
+def user_data_dir(base_dir: str, user_id: str) -> str:
+    digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+    return os.path.join(base_dir, USERS_DIRNAME, digest[:2], digest[2:4], digest)
+
+
+def iter_user_dirs(base_dir: str):
+    root = os.path.join(base_dir, USERS_DIRNAME)
+    if not os.path.isdir(root):
+        return
+    for a in sorted(os.listdir(root)):
+        for b in sorted(os.listdir(os.path.join(root, a))):
+            for leaf in sorted(os.listdir(os.path.join(root, a, b))):
+                yield os.path.join(root, a, b, leaf)
+
+
+# =========================
+# JSONL 꼬리 읽기 캐시 (프로세스 전체 공유)
+# =========================
+# path → {"ino", "size", "mtime", "offset", "entries", "ids", "snapshot", "bad"}
+# 모든 Streamlit 세션이 같은 프로세스에서 돌기 때문에 한 번 파싱한 줄은 다시 파싱하지 않는다.
+# 읽는 쪽에는 파일이 바뀔 때만 새로 만드는 튜플(snapshot)을 그대로 건넨다. 기록 dict도 모든 세션이 함께 쓰므로 고치지 말 것.
+_TAIL_CACHE = OrderedDict()
+_TAIL_LOCK = threading.Lock()
+
+
+def _new_cache(ino: int) -> dict:
+    return {"ino": ino, "size": 0, "mtime": 0, "offset": 0, "entries": [], "ids": {}, "snapshot": (), "bad": 0}
+
+
+def _add_entry(c: dict, e: dict):
+    # 같은 id가 다시 나오면 업서트: 처음 자리에 마지막 내용을 둔다
+    eid = e.get("id")
+    if eid and eid in c["ids"]:
+        c["entries"][c["ids"][eid]] = e
+        return
+    if eid:
+        c["ids"][eid] = len(c["entries"])
+    c["entries"].append(e)
+
+
+def _parse_lines(chunk: bytes, c: dict) -> int:
+    # 완성된 줄만 파싱하고, 소비한 바이트 수를 돌려준다 (쓰는 중인 마지막 줄은 다음에).
+    # 찢어지거나 깨진 줄(쓰다 죽은 프로세스 등)은 건너뛰고 c["bad"]에 센다: 그 뒤 기록까지 못 읽게 되지 않도록
+    end = chunk.rfind(b"\n")
+    if end < 0:
+        return 0
+    for line in chunk[:end].split(b"\n"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            e = json.loads(line)
+        except ValueError:
+            e = None
+        if isinstance(e, dict):
+            _add_entry(c, e)
+        else:
+            c["bad"] += 1
+    return end + 1
+
+
+def _refresh_jsonl_cache(path: str):
+    try:
+        stt = os.stat(path)
+    except FileNotFoundError:
+        with _TAIL_LOCK:
+            _TAIL_CACHE.pop(path, None)
+        return None
+
+    with _TAIL_LOCK:
+        c = _TAIL_CACHE.get(path)
+
+        # 잘림/교체(로테이션)/제자리 수정 → 전체 다시 읽기
+        if (c is None or c["ino"] != stt.st_ino or stt.st_size < c["offset"]
+                or (stt.st_size == c["size"] and stt.st_mtime_ns != c["mtime"])):
+            c = _new_cache(stt.st_ino)
+
+        if stt.st_size != c["offset"]:
+            with open(path, "rb") as f:
+                f.seek(c["offset"])
+                chunk = f.read()
+            c["offset"] += _parse_lines(chunk, c)
+            c["snapshot"] = None
+
+        c["size"] = stt.st_size
+        c["mtime"] = stt.st_mtime_ns
+        lru_put(_TAIL_CACHE, path, c)
+        return c
+
+
+def read_jsonl_cached(path: str) -> tuple[dict, ...]:
+    # 읽기 전용 튜플 (rerun마다 복사하지 않는다)
+    c = _refresh_jsonl_cache(path)
+    if c is None:
+        return ()
+    with _TAIL_LOCK:
+        if c["snapshot"] is None:
+            c["snapshot"] = tuple(c["entries"])
+        return c["snapshot"]
+
+
+def merge_entries(entries: list[dict], extra: list[dict]) -> list[dict]:
+    # 아직 디스크에 안 내려간 기록을 덧씌운다 (같은 id는 교체)
+    if not extra:
+        return entries
+    out = list(entries)
+    pos = {e.get("id"): i for i, e in enumerate(out) if e.get("id")}
+    for e in extra:
+        i = pos.get(e.get("id")) if e.get("id") else None
+        if i is None:
+            out.append(e)
+        else:
+            out[i] = e
+    return out
+
+
+# 이 앱이 쓰는 줄은 {"id": ..., "date": ...}로 시작한다 (app / importer / synth 모두 그 순서로 만든다).
+# 줄 맨 앞에 맞춰 보므로 안쪽 객체의 "id"와 헷갈리지 않는다. 안 맞는 줄만 통째로 파싱한다.
+_LINE_HEAD = re.compile(rb'\{"id": "((?:[^"\\]|\\.)*)", "date": "([^"\\]+)"')
+
+
+def _line_head(raw: bytes):
+    # (id, 날짜) — 기록이 아닌 줄이면 None
+    m = _LINE_HEAD.match(raw)
+    if m:
+        eid, d = m.groups()
+        eid = json.loads(b'"' + eid + b'"') if b"\\" in eid else eid.decode("utf-8")
+        return eid, d[:10].decode("utf-8")
+    try:
+        e = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(e, dict):
+        return None
+    return e.get("id"), entry_date(e)
+
+
+# =========================
+# JSONL 백엔드
+# =========================
+class JsonlEntryStore:
+    backend = "jsonl"
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, ENTRIES_FILENAME)
+
+    def append(self, entry: dict):
+        os.makedirs(self.data_dir, exist_ok=True)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        # 한 줄을 한 번의 write로, 다른 세션/프로세스와 섞이지 않게 잠근 채로
+        with file_lock(self.path):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def upsert(self, entry: dict):
+        # 추가 전용 파일이라 줄을 덧붙이고, 읽을 때 같은 id는 마지막 줄로 합친다
+        self.append(entry)
+
+    def upsert_many(self, entries, fsync: bool = False):
+        # 그룹 커밋: 여러 줄을 잠금 한 번, fsync 한 번으로. entries는 제너레이터여도 된다
+        # (대량 가져오기: 1MB씩 모아 쓰므로 전체를 메모리에 올리지 않는다)
+        os.makedirs(self.data_dir, exist_ok=True)
+        with file_lock(self.path):
+            with open(self.path, "a", encoding="utf-8") as f:
+                buf, size = [], 0
+                for e in entries:
+                    line = json.dumps(e, ensure_ascii=False) + "\n"
+                    buf.append(line)
+                    size += len(line)
+                    if size >= 1 << 20:
+                        f.write("".join(buf))
+                        buf, size = [], 0
+                if buf:
+                    f.write("".join(buf))
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def get(self, entry_id: str):
+        c = _refresh_jsonl_cache(os.path.abspath(self.path))
+        if c is None:
+            return None
+        with _TAIL_LOCK:
+            i = c["ids"].get(entry_id)
+            return c["entries"][i] if i is not None else None
+
+    def read_all(self) -> tuple[dict, ...]:
+        return read_jsonl_cached(os.path.abspath(self.path))
+
+    def version(self) -> str:
+        # 파일이 바뀌면 달라지는 값 (파생 데이터가 낡았는지 판단할 때 쓴다)
+        try:
+            stt = os.stat(self.path)
+        except FileNotFoundError:
+            return "jsonl:0"
+        return f"jsonl:{stt.st_ino}:{stt.st_size}:{stt.st_mtime_ns}"
+
+    def read_range(self, start: str, end: str) -> list[dict]:
+        # JSONL은 인덱스가 없어서 전체를 훑는다 (공유 튜플을 그대로 훑고 걸린 것만 담는다)
+        return [e for e in self.read_all() if start <= entry_date(e) <= end and entry_date(e)]
+
+    def iter_range(self, start: str | None = None, end: str | None = None):
+        # 캐시에 올리지 않고 파일을 두 번 읽는다 (내보내기처럼 전체를 한 번 훑는 용도).
+        # 1) 줄 머리에서 id와 날짜만 꺼내 id마다 마지막 줄 위치를 기억 (범위 밖이면 -1)
+        # 2) 범위 안의 줄만 찾아가서 파싱 → 메모리는 id 수만큼만, 순서는 파일 순서.
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            last, loose = {}, []  # id → 위치 / id 없는 예전 기록의 위치
+            pos = 0
+            for raw in f:
+                here, pos = pos, pos + len(raw)
+                if not raw.endswith(b"\n") or not raw.strip():
+                    continue
+                head = _line_head(raw)
+                if head is None:
+                    continue
+                eid, d = head
+                keep = not ((start and d < start) or (end and d > end))
+                if eid:
+                    last[eid] = here if keep else -1
+                elif keep:
+                    loose.append(here)
+
+            for here in sorted([p for p in last.values() if p >= 0] + loose):
+                f.seek(here)
+                try:
+                    e = json.loads(f.readline())
+                except ValueError:
+                    continue
+                if isinstance(e, dict):
+                    yield e
+
+
+# =========================
+# SQLite 백엔드 (date 인덱스)
+# =========================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry_id   TEXT,
+    date       TEXT NOT NULL,
+    created_at TEXT,
+    body       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# 같은 entry_id는 자리를 유지한 채 내용만 갈아 끼운다 (id 없는 예전 기록은 그냥 추가)
+UPSERT_SQL = """
+INSERT INTO entries(entry_id, date, created_at, body) VALUES (?, ?, ?, ?)
+ON CONFLICT(entry_id) DO UPDATE SET
+    date = excluded.date, created_at = excluded.created_at, body = excluded.body
+"""
+
+
+class SqliteEntryStore:
+    backend = "sqlite"
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, DB_FILENAME)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Streamlit 세션은 스레드마다 돌아가므로 연결도 스레드별로 둔다
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(self.data_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            # entry_id 이전에 만든 DB는 컬럼을 붙인다
+            cols = [r[1] for r in conn.execute("PRAGMA table_info(entries)")]
+            if "entry_id" not in cols:
+                conn.execute("ALTER TABLE entries ADD COLUMN entry_id TEXT")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_entry_id ON entries(entry_id)")
+            self._local.conn = conn
+        return conn
+
+    def _row(self, e: dict) -> tuple:
+        return (e.get("id"), entry_date(e), e.get("created_at"), json.dumps(e, ensure_ascii=False))
+
+    def _bump_version(self, conn: sqlite3.Connection):
+        # 쓰기와 같은 트랜잭션 안에서 버전을 올린다
+        conn.execute(
+            "INSERT INTO meta(key, value) VALUES ('version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def append(self, entry: dict):
+        # JSONL과 같은 약속: 같은 id를 다시 쓰면 업서트 (entry_id 유니크 인덱스에 부딪히지 않게)
+        self.upsert(entry)
+
+    def append_many(self, entries: list[dict]):
+        conn = self._conn()
+        with conn:
+            conn.executemany(UPSERT_SQL, (self._row(e) for e in entries))
+            self._bump_version(conn)
+
+    def upsert(self, entry: dict):
+        conn = self._conn()
+        with conn:
+            conn.execute(UPSERT_SQL, self._row(entry))
+            self._bump_version(conn)
+
+    def upsert_many(self, entries, fsync: bool = False):
+        # 그룹 커밋: 트랜잭션 하나. fsync=True면 이 커밋은 디스크까지 내려간다 (entries는 제너레이터여도 된다)
+        conn = self._conn()
+        conn.execute("PRAGMA synchronous=FULL" if fsync else "PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.executemany(UPSERT_SQL, (self._row(e) for e in entries))
+            self._bump_version(conn)
+
+    def get(self, entry_id: str):
+        row = self._conn().execute("SELECT body FROM entries WHERE entry_id = ?", (entry_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def version(self) -> str:
+        return f"sqlite:{self.get_meta('version') or 0}"
+
+    def read_all(self) -> list[dict]:
+        cur = self._conn().execute("SELECT body FROM entries ORDER BY seq")
+        return [json.loads(body) for (body,) in cur]
+
+    def read_range(self, start: str, end: str) -> list[dict]:
+        cur = self._conn().execute(
+            "SELECT body FROM entries WHERE date BETWEEN ? AND ? AND date != '' ORDER BY date, seq",
+            (start, end),
+        )
+        return [json.loads(body) for (body,) in cur]
+
+    def iter_range(self, start: str | None = None, end: str | None = None, batch: int = 500):
+        # 날짜 조건은 SQL로 내려 보내고(date 인덱스), 결과는 batch개씩만 들고 있는다.
+        # 범위를 주지 않으면 날짜 없는 예전 기록까지 전부.
+        where, args = [], []
+        if start:
+            where.append("date >= ?")
+            args.append(start)
+        if end:
+            where.append("date <= ?")
+            args.append(end)
+        if start or end:
+            where.append("date != ''")
+        sql = "SELECT body FROM entries" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY date, seq"
+        # 읽는 동안 다른 쓰기와 섞이지 않도록 전용 연결로 (WAL이라 쓰는 쪽을 막지 않는다)
+        self._conn()  # 스키마 보장
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            cur = conn.execute(sql, args)
+            while True:
+                rows = cur.fetchmany(batch)
+                if not rows:
+                    break
+                for (body,) in rows:
+                    yield json.loads(body)
+        finally:
+            conn.close()
+
+    def get_meta(self, key: str):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+
+# =========================
+# JSONL → SQLite 마이그레이션 (1회)
+# =========================
+def migrate_jsonl_to_sqlite(data_dir: str, force: bool = False) -> int:
+    src = JsonlEntryStore(data_dir)
+    dst = SqliteEntryStore(data_dir)
+
+    if dst.get_meta("migrated_from_jsonl") and not force:
+        return 0
+
+    entries = src.read_all()
+    if force:
+        with dst._conn() as conn:
+            conn.execute("DELETE FROM entries")
+            dst._bump_version(conn)
+    dst.append_many(entries)
+    dst.set_meta("migrated_from_jsonl", str(len(entries)))
+    return len(entries)
+
+
+# =========================
+# 중복 정리 (오프라인)
+# =========================
+def dedupe_key(e: dict) -> str:
+    # id가 있으면 id, 없던 시절 기록은 created_at을 뺀 내용이 같으면 같은 기록으로 본다
+    if e.get("id"):
+        return e["id"]
+    rest = {k: v for k, v in e.items() if k not in ("id", "created_at")}
+    digest = hashlib.sha1(json.dumps(rest, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+    return "legacy-" + digest[:16]
+
+
+def compact_entries(entries: list[dict]) -> list[dict]:
+    # 처음 나온 자리를 지키고, id가 있던 기록은 마지막 내용으로 덮는다
+    out, seen = [], {}
+    for e in entries:
+        k = dedupe_key(e)
+        if k in seen:
+            if e.get("id"):
+                out[seen[k]] = e
+            continue
+        seen[k] = len(out)
+        out.append(e if e.get("id") else {"id": k, **e})
+    return out
+
+
+def compact_jsonl(data_dir: str) -> tuple[int, int]:
+    path = os.path.join(data_dir, ENTRIES_FILENAME)
+    if not os.path.exists(path):
+        return 0, 0
+
+    with file_lock(path):
+        raw = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    raw.append(json.loads(line))
+        kept = compact_entries(raw)
+        atomic_write_text(path, "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in kept))
+    return len(raw), len(kept)
+
+
+def compact_sqlite(data_dir: str) -> tuple[int, int]:
+    store = SqliteEntryStore(data_dir)
+    conn = store._conn()
+    rows = conn.execute("SELECT seq, body FROM entries ORDER BY seq").fetchall()
+
+    seen = set()
+    drop, assign = [], []
+    for seq, body in rows:
+        e = json.loads(body)
+        k = dedupe_key(e)
+        if k in seen:
+            drop.append((seq,))
+            continue
+        seen.add(k)
+        if not e.get("id"):
+            assign.append((k, json.dumps({"id": k, **e}, ensure_ascii=False), seq))
+
+    with conn:
+        conn.executemany("DELETE FROM entries WHERE seq = ?", drop)
+        conn.executemany("UPDATE entries SET entry_id = ?, body = ? WHERE seq = ?", assign)
+        store._bump_version(conn)
+    conn.execute("VACUUM")
+    return len(rows), len(rows) - len(drop)
+
+
+# =========================
+# 저장소 레지스트리 (프로세스 전체 공유)
+# =========================
+_STORES = OrderedDict()
+_STORES_LOCK = threading.Lock()
+
+
+def open_store(data_dir: str, backend: str | None = None):
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 저장소 백엔드: {backend} (가능: {', '.join(BACKENDS)})")
+
+    key = (os.path.abspath(data_dir), backend)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            if backend == "sqlite":
+                store = SqliteEntryStore(data_dir)
+                # 기존 entries.jsonl이 있으면 처음 열 때 한 번만 옮겨온다
+                if os.path.exists(os.path.join(data_dir, ENTRIES_FILENAME)):
+                    migrate_jsonl_to_sqlite(data_dir)
+            else:
+                store = JsonlEntryStore(data_dir)
+        # 오래 안 쓴 파티션은 닫는다 (스레드별 SQLite 연결도 함께 정리됨)
+        lru_put(_STORES, key, store)
+    return store
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="storage.py", description="Daily Weaver 기록 저장소 도구")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_mig = sub.add_parser("migrate", help="entries.jsonl을 SQLite로 옮깁니다")
+    p_mig.add_argument("--data-dir", default="data")
+    p_mig.add_argument("--force", action="store_true", help="이미 옮겼어도 다시 옮깁니다")
+
+    p_cmp = sub.add_parser("compact", help="중복 기록을 지우고 id가 없는 기록에 id를 붙입니다")
+    p_cmp.add_argument("--data-dir", default="data")
+    p_cmp.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND)
+    p_cmp.add_argument("--all-users", action="store_true", help="data/users/ 아래 모든 사용자 파티션을 정리합니다")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "migrate":
+        n = migrate_jsonl_to_sqlite(args.data_dir, force=args.force)
+        print(f"{n}개 기록을 {os.path.join(args.data_dir, DB_FILENAME)}로 옮겼어요.")
+
+    if args.cmd == "compact":
+        compact = compact_sqlite if args.backend == "sqlite" else compact_jsonl
+        dirs = list(iter_user_dirs(args.data_dir)) if args.all_users else [args.data_dir]
+        for d in dirs:
+            before, after = compact(d)
+            print(f"{d}: {before}개 → {after}개 ({before - after}개 중복 제거)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# tagger.py — 기분/단어 → 노래 태그 분류기
+# 키워드 사전 전체를 Aho-Corasick 자동자 하나로 컴파일해서, 텍스트를 한 번만 훑고 모든 태그 점수를 낸다.
+
+import os
+import csv
+import threading
+from collections import deque
+
+
+TAGS = ("comfort", "sentimental", "energetic", "reset", "focus", "chill")
+DEFAULT_TAG = "chill"
+
+# (키워드, 태그, 가중치)
+# 가중치 단계(10000/1000/100/10)는 예전 규칙의 우선순위를 그대로 옮긴 것:
+# 위 단계 키워드 하나가 아래 단계 키워드를 전부 합친 것보다 커서, 지금 사전으로는 결과가 예전과 같다.
+DEFAULT_LEXICON = [
+    ("우울", "comfort", 10000), ("슬픔", "comfort", 10000), ("침잠", "comfort", 10000), ("벅참", "comfort", 10000),
+    ("감성", "sentimental", 1000), ("따뜻함", "sentimental", 1000), ("출렁임", "sentimental", 1000), ("밤", "sentimental", 1000),
+    ("열정", "energetic", 100), ("긴장", "energetic", 100), ("맑음", "energetic", 100),
+    ("냉정", "reset", 10), ("무덤덤", "reset", 10), ("리셋", "reset", 10),
+]
+
+# 활동은 텍스트 키워드가 하나도 없을 때의 보조 신호 (최대 합계가 가장 작은 키워드 가중치보다 작다)
+ACTIVITY_WEIGHTS = {
+    "공부": ("focus", 4), "업무": ("focus", 4),
+    "휴식": ("chill", 2), "회복": ("chill", 2),
+}
+
+# 추가 사전: 탭 구분 "키워드<TAB>태그<TAB>가중치" 파일
+LEXICON_PATH = os.environ.get("DW_TAG_LEXICON")
+
+
+def load_lexicon(path: str) -> list[tuple[str, str, float]]:
+    out = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f, delimiter="\t"):
+            if not row or row[0].startswith("#"):
+                continue
+            keyword, tag = row[0].strip(), row[1].strip()
+            if tag not in TAGS:
+                raise ValueError(f"알 수 없는 태그: {tag} ({path})")
+            out.append((keyword, tag, float(row[2]) if len(row) > 2 else 1.0))
+    return out
+
+
+# =========================
+# Aho-Corasick 자동자
+# =========================
+class Tagger:
+    def __init__(self, lexicon: list[tuple[str, str, float]]):
+        # 노드마다: 다음 글자 → 노드 번호, 실패 링크, 이 노드에서 끝나는 키워드 번호들
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        self.keywords = []  # 번호 → (태그, 가중치)
+
+        for keyword, tag, weight in lexicon:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            node = 0
+            for ch in keyword:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(len(self.keywords))
+            self.keywords.append((tag, weight))
+
+        # BFS로 실패 링크를 잇고, 실패 쪽 출력도 미리 합쳐 둔다
+        q = deque(self.goto[0].values())
+        while q:
+            node = q.popleft()
+            for ch, nxt in self.goto[node].items():
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+                q.append(nxt)
+
+    def matches(self, text: str) -> set[int]:
+        # 텍스트를 한 번 훑어서 등장한 키워드 번호 (같은 키워드는 한 번만 센다)
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+    def score(self, text: str, activities: list[str] = ()) -> dict:
+        scores = {}
+        for k in self.matches(text.lower()):
+            tag, weight = self.keywords[k]
+            scores[tag] = scores.get(tag, 0) + weight
+        for a in set(activities or ()):
+            if a in ACTIVITY_WEIGHTS:
+                tag, weight = ACTIVITY_WEIGHTS[a]
+                scores[tag] = scores.get(tag, 0) + weight
+        return scores
+
+    def rank(self, text: str, activities: list[str] = ()) -> list[tuple[str, float]]:
+        # 점수 내림차순, 같으면 TAGS 순서 (예전 if 사슬의 순서)
+        scores = self.score(text, activities)
+        return sorted(scores.items(), key=lambda kv: (-kv[1], TAGS.index(kv[0])))
+
+
+# =========================
+# 기본 분류기 (프로세스 전체 공유)
+# =========================
+_DEFAULT = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_tagger() -> Tagger:
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            lexicon = list(DEFAULT_LEXICON)
+            if LEXICON_PATH:
+                lexicon += load_lexicon(LEXICON_PATH)
+            _DEFAULT = Tagger(lexicon)
+        return _DEFAULT
+
+
+def rank_tags(mood_text: str, activities: list[str], one_word: str) -> list[tuple[str, float]]:
+    return default_tagger().rank(f"{mood_text} {one_word}", activities)
+
+
+def infer_tag(mood_text: str, activities: list[str], one_word: str) -> str:
+    ranked = rank_tags(mood_text, activities, one_word)
+    return ranked[0][0] if ranked else DEFAULT_TAG
@@ -0,0 +1,5 @@
+# 저장소 루트의 모듈(storage, thumbs, llm …)을 그대로 가져오도록 (benchmarks/와 같은 방식)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,21 @@
+# 고정된 비교 기준 (테스트 픽스처): 사전 기반 분류기 이전 app.py의 if 사슬을 그대로 얼려 둔 것.
+# 앱 규칙을 바꿀 때 고치는 코드가 아니다. DEFAULT_LEXICON이 예전 결과를 그대로 내는지 확인하는 데만 쓴다
+# (tests/test_tagger.py, benchmarks/bench_tagger.py).
+
+
+def frozen_legacy_infer_tag(mood_text: str, activities: list[str], one_word: str) -> str:
+    text = f"{mood_text} {one_word}".lower()
+
+    if any(k in text for k in ["우울", "슬픔", "침잠", "벅참"]):
+        return "comfort"
+    if any(k in text for k in ["감성", "따뜻함", "출렁임", "밤"]):
+        return "sentimental"
+    if any(k in text for k in ["열정", "긴장", "맑음"]):
+        return "energetic"
+    if any(k in text for k in ["냉정", "무덤덤", "리셋"]):
+        return "reset"
+    if ("공부" in activities) or ("업무" in activities):
+        return "focus"
+    if ("휴식" in activities) or ("회복" in activities):
+        return "chill"
+    return "chill"
@@ -0,0 +1,76 @@
+# llm.py — 로컬 OpenAI 호환 스텁(serve_stub)으로 마무리 메시지 스트리밍 확인
+import html
+import time
+import socket
+import threading
+
+import pytest
+
+import llm
+
+pytest.importorskip("openai")
+
+ANSWERS = {"one_word": "기록", "best_moment": "산책"}
+FALLBACK = "(템플릿)"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_stub(reply: str, delay: float) -> str:
+    port = free_port()
+    threading.Thread(target=llm.serve_stub, args=(port, reply, delay), daemon=True).start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.02)
+    return f"http://127.0.0.1:{port}/v1"
+
+@pytest.fixture
+def use(monkeypatch):
+    # base_url / timeout마다 클라이언트를 새로 만든다
+    def configure(base_url: str, timeout: float = 5.0):
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+        monkeypatch.setattr(llm, "LLM_MODE", "auto")
+        monkeypatch.setattr(llm, "TIMEOUT", timeout)
+        monkeypatch.setattr(llm, "_CLIENT", None)
+    return configure
+
+def run(data_dir) -> list[str]:
+    return list(llm.stream_closing(str(data_dir), "친한친구", "민지", ANSWERS, FALLBACK))
+
+
+def test_streams_text_and_caches_it(tmp_path, use):
+    reply = "오늘은 **기록**이 <빛난> 하루!"
+    use(start_stub(reply, 0.001))
+    out = run(tmp_path)
+    assert len(out) > 2                       # 글자가 오는 대로 조금씩
+    assert out[-1] == html.escape(reply)      # 말풍선에 들어가므로 이스케이프
+    assert llm.cached(str(tmp_path), llm.cache_key("친한친구", "민지", ANSWERS)) == reply
+
+def test_disk_cache_hit_skips_the_server(tmp_path, use):
+    use(f"http://127.0.0.1:{free_port()}/v1")  # 닿지 않는 주소: 요청하면 실패한다
+    llm.remember(str(tmp_path), llm.cache_key("친한친구", "민지", ANSWERS), "캐시된 <문장>")
+    assert run(tmp_path) == [html.escape("캐시된 <문장>")]
+
+def test_stalled_stream_falls_back_within_timeout(tmp_path, use):
+    # 글자마다 0.45초씩 멈춘다: 읽기 하나하나는 timeout(1초) 안이지만 전체로는 넘는다
+    use(start_stub("느리게 오는 답장", 0.45), timeout=1.0)
+    t = time.monotonic()
+    out = run(tmp_path)
+    assert out[-1] == FALLBACK
+    assert time.monotonic() - t < 1.3         # 청크가 올 때가 아니라 DW_LLM_TIMEOUT이 되는 순간 끊는다
+    assert llm.cached(str(tmp_path), llm.cache_key("친한친구", "민지", ANSWERS)) is None
+
+def test_unreachable_base_url_falls_back(tmp_path, use):
+    use(f"http://127.0.0.1:{free_port()}/v1", timeout=1.0)
+    assert run(tmp_path) == [FALLBACK]
+
+def test_disabled_without_api_key(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert run(tmp_path) == [FALLBACK]
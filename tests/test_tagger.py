@@ -0,0 +1,21 @@
+# tagger.py — 기본 사전이 예전 if 사슬과 같은 태그를 내는지 (앱의 선택지로 만든 입력 전부)
+from itertools import combinations
+
+from core import EMOJI_OPTIONS, ACTIVITIES
+from tagger import DEFAULT_LEXICON, infer_tag
+from legacy_tagger_fixture import frozen_legacy_infer_tag
+
+WORDS = ["", "평범", "커피"] + [kw for kw, _, _ in DEFAULT_LEXICON]
+
+
+def test_default_lexicon_matches_frozen_legacy_rules():
+    moods = [f"{emoji} {mood}" for emoji, mood in EMOJI_OPTIONS]
+    acts = [[]] + [[a] for a in ACTIVITIES] + [list(p) for p in combinations(ACTIVITIES, 2)]
+    for mood in moods:
+        for a in acts:
+            for word in WORDS:
+                assert infer_tag(mood, a, word) == frozen_legacy_infer_tag(mood, a, word), (mood, a, word)
+
+def test_two_keywords_in_one_word():
+    # 앞 단계 키워드가 이긴다 (가중치 단계 = 예전 우선순위)
+    assert infer_tag("🙂 평온", [], "리셋 밤") == frozen_legacy_infer_tag("🙂 평온", [], "리셋 밤") == "sentimental"
@@ -0,0 +1,89 @@
+# thumbs.py — 로컬 이미지(PIL로 만든 파일)로 썸네일 캐시 확인
+import os
+import time
+
+import pytest
+
+import thumbs
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbs, "THUMB_DIR", str(tmp_path / "thumbs"))
+    monkeypatch.setattr(thumbs, "_USAGE", None)
+    monkeypatch.setattr(thumbs, "_FAILED", thumbs.OrderedDict())
+    return tmp_path
+
+def make_image(path, size=(900, 600), color="tomato"):
+    Image.new("RGB", size, color).save(path)
+    return str(path)
+
+
+def test_miss_writes_square_thumbnail(cache):
+    src = make_image(cache / "cover.png")
+    path = thumbs.ensure_thumb(src)
+    assert path == thumbs.thumb_path(src)
+    with Image.open(path) as im:
+        assert im.size == (thumbs.THUMB_SIZE, thumbs.THUMB_SIZE) == (280, 280)
+        assert im.format == "JPEG"
+
+def test_hit_returns_cached_file_without_rendering(cache, monkeypatch):
+    src = make_image(cache / "cover.png")
+    first = thumbs.ensure_thumb(src)
+    os.utime(first, (0, 0))
+
+    def fail(*args):
+        raise AssertionError("적중인데 다시 만들었어요")
+    monkeypatch.setattr(thumbs, "render", fail)
+    monkeypatch.setattr(thumbs, "_read_source", fail)
+    assert thumbs.ensure_thumb(src) == first
+    assert os.path.getmtime(first) > 0  # 적중하면 LRU 시각을 갱신한다
+
+def test_failed_source_is_not_retried(cache, monkeypatch):
+    bad = cache / "broken.jpg"
+    bad.write_bytes(b"not an image")
+    assert thumbs.ensure_thumb(str(bad)) is None
+
+    calls = []
+    monkeypatch.setattr(thumbs, "_read_source", lambda s: calls.append(s) or b"")
+    assert thumbs.ensure_thumb(str(bad)) is None
+    assert calls == []
+
+    # RETRY_AFTER가 지나면 다시 시도한다
+    thumbs._FAILED[str(bad)] = time.time() - thumbs.RETRY_AFTER - 1
+    assert thumbs.ensure_thumb(str(bad)) is None
+    assert calls == [str(bad)]
+
+def test_prune_drops_oldest_until_under_limit(cache):
+    paths = []
+    for i, color in enumerate(["red", "green", "blue", "yellow"]):
+        p = thumbs.ensure_thumb(make_image(cache / f"c{i}.png", color=color))
+        os.utime(p, (1000 + i, 1000 + i))  # c0이 가장 오래됨
+        paths.append(p)
+    sizes = [os.path.getsize(p) for p in paths]
+
+    limit = sum(sizes[1:]) + 1  # 가장 오래된 하나만 넘친다
+    removed, total = thumbs.prune(limit)
+    left = [os.path.exists(p) for p in paths]
+    assert removed >= 1 and not left[0] and left[-1]
+    assert total <= limit * 0.9 or removed == 0
+    assert total == sum(s for s, ok in zip(sizes, left) if ok)
+
+def test_writing_past_cache_bytes_prunes(cache, monkeypatch):
+    first = thumbs.ensure_thumb(make_image(cache / "a.png", color="red"))
+    os.utime(first, (1000, 1000))
+    monkeypatch.setattr(thumbs, "CACHE_BYTES", os.path.getsize(first) + 1)
+    second = thumbs.ensure_thumb(make_image(cache / "b.png", color="blue"))
+    assert not os.path.exists(first) and os.path.exists(second)
+
+def test_cover_src_does_not_wait_on_a_miss(cache):
+    src = make_image(cache / "cover.png")
+    assert thumbs.cover_src(src) == thumbs.sized_url(src)  # 만들기는 뒤에서
+    thumbs._pool().submit(lambda: None).result()  # 앞서 넣은 작업이 끝날 때까지
+    for _ in range(100):
+        if os.path.exists(thumbs.thumb_path(src)):
+            break
+        time.sleep(0.02)
+    assert thumbs.cover_src(src) == thumbs.thumb_url(src)
@@ -0,0 +1,265 @@
+# thumbs.py — 앨범 커버 썸네일 캐시
+# 900px 원본을 매번 내려받지 않도록, 140px 커버 자리에 맞는 썸네일을 한 번 만들어 static/thumbs/에 두고
+# Streamlit 정적 경로(app/static/...)로 내보낸다. (.streamlit/config.toml의 enableStaticServing)
+# 앱에서는 캐시에 없으면 기다리지 않고 원격 주소를 쓰고 뒤에서 만든다 (카탈로그 전체는 warm으로 미리).
+# 미리 만들기: python thumbs.py warm --catalog data/songs.dwcat
+
+import os
+import io
+import time
+import hashlib
+import argparse
+import threading
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # 선택 의존성
+    Image = None
+
+from storage import atomic_write_bytes, file_lock, lru_put
+
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+THUMB_DIR = os.path.join(STATIC_DIR, "thumbs")
+THUMB_URL = "app/static/thumbs"
+
+THUMB_SIZE = int(os.environ.get("DW_THUMB_SIZE", "280"))              # 140px 커버 × 2 (레티나)
+CACHE_BYTES = int(os.environ.get("DW_THUMB_CACHE_MB", "64")) * 1024 * 1024
+FETCH_TIMEOUT = float(os.environ.get("DW_THUMB_TIMEOUT", "5"))        # 초
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+RETRY_AFTER = 600  # 가져오기에 실패한 원본은 이 시간(초) 동안 다시 시도하지 않는다
+JPEG_QUALITY = 82
+MAX_TRACKED = 4096  # 원본별 잠금 / 실패 기록을 이만큼만 기억한다
+
+
+# =========================
+# 경로
+# =========================
+def thumb_name(source: str, size: int = THUMB_SIZE) -> str:
+    h = hashlib.sha1(f"{size}\x1f{source}".encode("utf-8")).hexdigest()
+    return f"{h[:2]}/{h}.jpg"
+
+def thumb_path(source: str, size: int = THUMB_SIZE) -> str:
+    return os.path.join(THUMB_DIR, thumb_name(source, size))
+
+def thumb_url(source: str, size: int = THUMB_SIZE) -> str:
+    return f"{THUMB_URL}/{thumb_name(source, size)}"
+
+
+def sized_url(source: str, size: int = THUMB_SIZE) -> str:
+    # Pillow가 없을 때: 크기를 주소로 고를 수 있는 CDN(Unsplash)이면 그 크기로 요청한다
+    parts = urlsplit(source)
+    if parts.hostname != "images.unsplash.com":
+        return source
+    q = dict(parse_qsl(parts.query))
+    q.update({"w": str(size), "h": str(size), "fit": "crop"})
+    return urlunsplit(parts._replace(query=urlencode(q)))
+
+
+# =========================
+# 만들기
+# =========================
+def _read_source(source: str) -> bytes:
+    if urlsplit(source).scheme in ("http", "https"):
+        req = urllib.request.Request(sized_url(source, max(THUMB_SIZE * 2, 600)),
+                                     headers={"User-Agent": "daily-weaver-thumbs"})
+        with urllib.request.urlopen(req, timeout=FETCH_TIMEOUT) as r:
+            data = r.read(MAX_SOURCE_BYTES + 1)
+    else:
+        with open(source, "rb") as f:
+            data = f.read(MAX_SOURCE_BYTES + 1)
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f"원본 이미지가 너무 커요: {source}")
+    return data
+
+def render(data: bytes, size: int = THUMB_SIZE) -> bytes:
+    # object-fit: cover와 같게 가운데를 정사각형으로 잘라서 줄인다
+    with Image.open(io.BytesIO(data)) as im:
+        im = ImageOps.exif_transpose(im)
+        im = ImageOps.fit(im.convert("RGB"), (size, size), Image.LANCZOS)
+        out = io.BytesIO()
+        im.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return out.getvalue()
+
+
+# =========================
+# 디스크 LRU
+# =========================
+# 적중하면 mtime을 갱신하고, 넘치면 mtime이 오래된 것부터 지운다.
+# 디렉터리 전체 크기는 프로세스마다 한 번 세고 그 뒤로는 더하기만 한다 (넘칠 때 다시 센다).
+_FAILED = OrderedDict()     # 원본 → 실패 시각
+_KEY_LOCKS = OrderedDict()
+_INFLIGHT = set()           # 뒤에서 만들고 있는 썸네일 경로
+_STATE_LOCK = threading.Lock()
+_USAGE = None
+_POOL = None
+
+
+def _key_lock(key: str) -> threading.Lock:
+    with _STATE_LOCK:
+        lock = _KEY_LOCKS.get(key) or threading.Lock()
+        lru_put(_KEY_LOCKS, key, lock, MAX_TRACKED)
+        return lock
+
+def _scan(root: str) -> list[tuple[float, int, str]]:
+    files = []
+    for d, _, names in os.walk(root):
+        for n in names:
+            if not n.endswith(".jpg"):
+                continue
+            p = os.path.join(d, n)
+            try:
+                s = os.stat(p)
+            except FileNotFoundError:
+                continue
+            files.append((s.st_mtime, s.st_size, p))
+    return files
+
+def prune(limit: int | None = None) -> tuple[int, int]:
+    # 한도의 90%까지 줄여서 매번 지우지 않게 한다. (지운 개수, 남은 바이트)
+    global _USAGE
+    limit = CACHE_BYTES if limit is None else limit
+    root = THUMB_DIR
+    removed = 0
+    with file_lock(os.path.join(root, "lru")):
+        files = sorted(_scan(root))
+        total = sum(s for _, s, _ in files)
+        if total > limit:
+            for _, size, p in files:
+                if total <= limit * 0.9:
+                    break
+                try:
+                    os.remove(p)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+    with _STATE_LOCK:
+        _USAGE = total
+    return removed, total
+
+def _account(nbytes: int):
+    global _USAGE
+    with _STATE_LOCK:
+        if _USAGE is None:
+            _USAGE = sum(s for _, s, _ in _scan(THUMB_DIR))
+        else:
+            _USAGE += nbytes
+        over = _USAGE > CACHE_BYTES
+    if over:
+        prune()
+
+
+def ensure_thumb(source: str, size: int = THUMB_SIZE) -> str | None:
+    # 썸네일 파일 경로 (만들 수 없으면 None)
+    path = thumb_path(source, size)
+    if os.path.exists(path):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        else:
+            return path
+    if Image is None:
+        return None
+    with _STATE_LOCK:
+        failed_at = _FAILED.get(source)
+    if failed_at and time.time() - failed_at < RETRY_AFTER:
+        return None
+
+    # 같은 원본을 여러 세션이 동시에 요청해도 한 번만 받아서 줄인다
+    with _key_lock(path):
+        if os.path.exists(path):
+            return path
+        try:
+            data = render(_read_source(source), size)
+        except Exception:
+            with _STATE_LOCK:
+                lru_put(_FAILED, source, time.time(), MAX_TRACKED)
+            return None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write_bytes(path, data)
+    _account(len(data))
+    return path
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _STATE_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dw-thumbs")
+        return _POOL
+
+def _background(source: str, size: int, path: str):
+    try:
+        ensure_thumb(source, size)
+    finally:
+        with _STATE_LOCK:
+            _INFLIGHT.discard(path)
+
+def cover_src(source: str, size: int = THUMB_SIZE) -> str:
+    # <img src>에 넣을 주소: 캐시된 썸네일 > 크기를 고른 CDN 주소 > 원본.
+    # 캐시에 없으면 기다리지 않고 CDN 주소를 돌려주고, 썸네일은 뒤에서 만들어 다음부터 쓴다.
+    if not source:
+        return source
+    path = thumb_path(source, size)
+    if os.path.exists(path):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        else:
+            return thumb_url(source, size)
+    if Image is not None:
+        with _STATE_LOCK:
+            submit = path not in _INFLIGHT
+            _INFLIGHT.add(path)
+        if submit:
+            _pool().submit(_background, source, size, path)
+    return sized_url(source, size)
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="thumbs.py", description="Daily Weaver 커버 썸네일 캐시 도구")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_warm = sub.add_parser("warm", help="커버 썸네일을 미리 만들어 둡니다")
+    p_warm.add_argument("sources", nargs="*", help="이미지 URL 또는 파일 경로")
+    p_warm.add_argument("--catalog", help="노래 카탈로그의 모든 cover_url")
+    p_warm.add_argument("--size", type=int, default=THUMB_SIZE)
+
+    sub.add_parser("prune", help="캐시 한도(DW_THUMB_CACHE_MB)를 넘는 오래된 썸네일을 지웁니다")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "warm":
+        if Image is None:
+            parser.error("Pillow가 필요해요: pip install pillow")
+        sources = list(args.sources)
+        if args.catalog:
+            from catalog import open_catalog
+            cat = open_catalog(args.catalog)
+            if cat is None:
+                parser.error(f"파일이 없어요: {args.catalog}")
+            sources += [cat.row(i)["cover_url"] for i in range(len(cat))]
+        ok = 0
+        for src in dict.fromkeys(s for s in sources if s):
+            if ensure_thumb(src, args.size):
+                ok += 1
+            else:
+                print(f"실패: {src}")
+        print(f"{ok}개 썸네일이 {THUMB_DIR}에 있어요.")
+
+    if args.cmd == "prune":
+        removed, total = prune()
+        print(f"{removed}개를 지웠어요. 남은 용량 {total / 1024 / 1024:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# writer.py — 기록 write-behind 큐 (그룹 커밋)
+# DW_WRITE_BEHIND=1 이면 append_entry는 큐에 넣고 바로 돌아가고,
+# 쓰기 스레드 하나가 모든 세션의 기록을 모아 한 번에 커밋한다.
+
+import os
+import atexit
+import threading
+import traceback
+from collections import OrderedDict
+
+import search
+import aggregates
+
+
+WRITE_BEHIND = os.environ.get("DW_WRITE_BEHIND", "0") == "1"
+FLUSH_INTERVAL = float(os.environ.get("DW_FLUSH_INTERVAL", "0.2"))  # 초
+RETRY_MIN, RETRY_MAX = 0.5, 30.0  # 커밋이 실패하면 이만큼(초)씩 두 배로 늘려 가며 쉬었다가 다시 시도
+FSYNC_POLICIES = ("batch", "never")
+FSYNC_POLICY = os.environ.get("DW_FSYNC", "batch")  # batch: 그룹 커밋마다 fsync / never: OS에 맡김
+
+
+class WriteBehindQueue:
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, fsync: str = FSYNC_POLICY):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"알 수 없는 fsync 정책: {fsync} (가능: {', '.join(FSYNC_POLICIES)})")
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        # 저장소 키 → (store, [entry, ...])
+        self._pending = OrderedDict()
+        self._cv = threading.Condition()
+        # 저장소별 잠금: 커밋 중에는 같은 저장소를 읽는 쪽이 "대기 중 + 디스크"를 어긋나게 보지 않도록
+        self._store_locks = {}
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="dw-write-behind", daemon=True)
+        self._thread.start()
+
+    def _key(self, store) -> tuple:
+        return (os.path.abspath(store.data_dir), store.backend)
+
+    def _store_lock(self, key: tuple) -> threading.Lock:
+        with self._cv:
+            return self._store_locks.setdefault(key, threading.Lock())
+
+    def submit(self, store, entry: dict):
+        with self._cv:
+            if self._closed:
+                raise RuntimeError("write-behind 큐가 이미 닫혔어요")
+            self._pending.setdefault(self._key(store), (store, []))[1].append(entry)
+            self._cv.notify()
+
+    def pending(self, store) -> list[dict]:
+        with self._cv:
+            item = self._pending.get(self._key(store))
+            return list(item[1]) if item else []
+
+    def consistent_read(self, store, fn):
+        # fn()의 결과와 대기 중 기록을 같은 시점으로 묶어서 돌려준다
+        with self._store_lock(self._key(store)):
+            return fn(), self.pending(store)
+
+    def _run(self):
+        retry = RETRY_MIN
+        while True:
+            with self._cv:
+                while not self._pending and not self._closed:
+                    self._cv.wait()
+                if self._closed and not self._pending:
+                    return
+            # 조금 기다렸다가 그 사이 들어온 기록까지 한 번에 커밋
+            if self.flush_interval > 0 and not self._closed:
+                with self._cv:
+                    self._cv.wait_for(lambda: self._closed, timeout=self.flush_interval)
+            if self.flush() or self._closed:
+                retry = RETRY_MIN
+            else:
+                # 실패한 배치가 남아 있으면 바로 다시 돌지 않는다 (DW_FLUSH_INTERVAL=0이어도 CPU를 태우지 않게)
+                with self._cv:
+                    self._cv.wait_for(lambda: self._closed, timeout=retry)
+                retry = min(retry * 2, RETRY_MAX)
+            if self._closed:
+                return
+
+    def flush(self) -> bool:
+        # 모든 배치를 커밋했으면 True
+        ok = True
+        with self._cv:
+            keys = list(self._pending)
+        for key in keys:
+            with self._store_lock(key):
+                with self._cv:
+                    store, batch = self._pending.get(key, (None, []))
+                    batch = list(batch)
+                if not batch:
+                    continue
+                try:
+                    before, after = aggregates.upsert_many_and_record(store, batch, fsync=(self.fsync == "batch"))
+                except Exception:
+                    # 실패한 배치는 대기열에 남겨 두고 다음 주기에 다시 시도
+                    traceback.print_exc()
+                    ok = False
+                    continue
+                try:
+                    search.record(store, before, after, batch)
+                except Exception:
+                    # 색인은 다시 만들 수 있는 사본: 커밋은 끝났으니 내려 두고 다음 검색 때 다시 만든다
+                    traceback.print_exc()
+                    search.invalidate(store)
+                # 커밋이 끝난 것만 대기열에서 뺀다 (그 사이 새로 들어온 건 남긴다)
+                with self._cv:
+                    rest = self._pending[key][1][len(batch):]
+                    if rest:
+                        self._pending[key] = (store, rest)
+                    else:
+                        del self._pending[key]
+        return ok
+
+    def close(self):
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+        self._thread.join()
+        self.flush()
+
+
+# =========================
+# 프로세스 전체 공유 큐
+# =========================
+_QUEUE = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def get_queue() -> WriteBehindQueue:
+    global _QUEUE
+    with _QUEUE_LOCK:
+        if _QUEUE is None:
+            _QUEUE = WriteBehindQueue()
+            # 서버가 내려갈 때 남은 기록을 모두 커밋
+            atexit.register(_QUEUE.close)
+        return _QUEUE